@@ -3,18 +3,35 @@ Stable Whisper Voice-to-Text Service - Main Application
 """
 import os
 import sys
-import tempfile
+import io
+import json
 import traceback
 import logging
 import requests
 from pathlib import Path
 from datetime import datetime
 
-from flask import Flask, request, jsonify
+from flask import Flask, Request, request, jsonify, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 
 from services.whisper_service import SimpleWhisperService
+from services.inference_server import RemoteWhisperService, RemoteAdmissionController, RemoteJobRegistry
+from services.streaming import StreamingDecoder, StreamingTranscriber, StreamSlots, StreamLimitError
+
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:
+    Sock = None
+from services.job_queue import TranscriptionJobQueue, QueueFullError, JOB_FAILED
+from services.load_governor import LoadGovernor, OverloadedError
+from services.audio_decoder import estimate_duration
+from services.decoding_profiles import DECODING_PROFILES
+from services.model_registry import ModelBudgetError
+from services.admission import AdmissionController, BacklogFullError
+from services.timings import StageTimer
+from services.transcript_cache import hash_audio
 
 # Configure logging
 logging.basicConfig(
@@ -30,13 +47,105 @@ def get_whisper_service():
     """Get or create the global Whisper service instance"""
     global _whisper_service
     if _whisper_service is None:
-        logger.info("Creating new Whisper service instance...")
-        _whisper_service = SimpleWhisperService()
+        if os.getenv('WHISPER_INFERENCE_SOCKET'):
+            # Gunicorn workers share the model owned by the inference server process
+            logger.info(f"Connecting to Whisper inference server at {os.getenv('WHISPER_INFERENCE_SOCKET')}...")
+            _whisper_service = RemoteWhisperService()
+        else:
+            logger.info("Creating new Whisper service instance...")
+            _whisper_service = SimpleWhisperService()
     return _whisper_service
 
+# Global job queue so every request shares the same bounded worker pool
+_job_queue = None
+
+def get_job_queue():
+    """Get or create the global transcription job queue"""
+    global _job_queue
+    if _job_queue is None:
+        logger.info("Creating transcription job queue...")
+        whisper_service = get_whisper_service()
+        # Behind the inference server, publish jobs there so a poll can reach any worker
+        registry = RemoteJobRegistry(whisper_service) if isinstance(whisper_service, RemoteWhisperService) else None
+        _job_queue = TranscriptionJobQueue(registry=registry)
+    return _job_queue
+
+# Global load governor guarding the synchronous transcription latency
+_load_governor = None
+
+def get_load_governor():
+    """Get or create the global load governor"""
+    global _load_governor
+    if _load_governor is None:
+        # Behind the inference server, project the wait from work admitted by every worker
+        shared = isinstance(get_whisper_service(), RemoteWhisperService)
+        _load_governor = LoadGovernor(get_admission_controller() if shared else get_job_queue())
+    return _load_governor
+
+# Global admission controller pricing uploads against the outstanding backlog
+_admission_controller = None
+
+def get_admission_controller():
+    """Get or create the global admission controller"""
+    global _admission_controller
+    if _admission_controller is None:
+        whisper_service = get_whisper_service()
+        if isinstance(whisper_service, RemoteWhisperService):
+            # Gunicorn workers share one model, so they share one ledger in the inference server
+            _admission_controller = RemoteAdmissionController(whisper_service)
+        else:
+            # The backlog drains through the inference lanes, not the (possibly larger) job worker pool
+            _admission_controller = AdmissionController(whisper_service.executor.lanes)
+    return _admission_controller
+
+# Global cap on concurrent WebSocket streams
+_stream_slots = None
+
+def get_stream_slots():
+    """Get or create the global streaming slot limiter"""
+    global _stream_slots
+    if _stream_slots is None:
+        _stream_slots = StreamSlots()
+    return _stream_slots
+
+def read_upload(file):
+    """Read an uploaded file into memory"""
+    filename = secure_filename(file.filename)
+    data = file.read()
+    logger.info(f"Read {len(data)} bytes from upload {filename}")
+    return filename, data
+
+def lookup_cached_transcript(whisper_service, data, language, task, model_size, profile):
+    """Hash an upload and look it up in the transcript cache, returning (audio_hash, result or None)"""
+    audio_hash = hash_audio(data)
+    try:
+        return audio_hash, whisper_service.get_cached_transcript(audio_hash, language, task, model_size, profile)
+    except Exception as e:
+        logger.warning(f"Transcript cache lookup failed: {str(e)}")
+        return audio_hash, None
+
+def run_transcription_job(whisper_service, data, language, task, model_size=None, profile=None, cost=0.0,
+                          timer=None, audio_hash=None):
+    """Transcribe an in-memory upload on a worker thread"""
+    # The service checks its transcript cache again (the entry may have appeared while queued) and only decodes on a miss
+    logger.info(f"Starting Whisper transcription of {len(data)} bytes...")
+    try:
+        return whisper_service.transcribe_audio(data, language, task, audio_hash=audio_hash, model_size=model_size,
+                                                profile=profile, timer=timer)
+    finally:
+        get_admission_controller().release(cost)
+
+class InMemoryRequest(Request):
+    """Request that keeps multipart uploads in memory instead of spooling to disk"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # MAX_CONTENT_LENGTH already bounds the size of a single request
+        return io.BytesIO()
+
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
+    app.request_class = InMemoryRequest
     
     # Configure CORS for HTTP frontend
     CORS(app, 
@@ -58,11 +167,114 @@ def create_app():
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
         return response
     
-    # Create upload directory
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    @app.before_request
+    def start_timer():
+        """Time every request so its stages can be reported however it ends"""
+        g.timer = StageTimer()
+    
+    @app.after_request
+    def emit_timings(response):
+        """Add the Server-Timing header to every response, including errors and rejections"""
+        timer = g.get('timer')
+        if timer is None:
+            return response
+        response.headers['Server-Timing'] = timer.to_header()
+        # One machine-readable line per API request for log aggregation (health probes are left out)
+        if request.path.startswith('/api/') and request.method != 'OPTIONS':
+            logger.info(f"Request timings: {json.dumps({'path': request.path, 'status': response.status_code, 'stages_ms': timer.to_dict()})}")
+        return response
+    
+    # Create upload directory (uploads are decoded in memory, so this may be read-only)
+    try:
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    except OSError as e:
+        logger.warning(f"Upload folder unavailable: {e}")
     
-    # Initialize Whisper service globally (only once)
+    # Initialize Whisper service globally (only once); the model loads in the background
     logger.info("Initializing application...")
+    get_whisper_service()
+    
+    # Longest a synchronous /transcribe call waits before handing back a job ID
+    transcribe_timeout = float(os.getenv('TRANSCRIBE_SYNC_TIMEOUT', '240'))
+    # Upper bound for a single long-poll on /api/v1/jobs/<id>
+    max_long_poll = float(os.getenv('JOB_LONG_POLL_MAX', '60'))
+    
+    def queue_full_response(error):
+        """Build a 503 response for a rejected job"""
+        response = jsonify({
+            'success': False,
+            'error': str(error),
+            'retry_after': error.retry_after,
+            'pid': os.getpid()
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
+    
+    def overloaded_response(error):
+        """Build a 503 response when no model can meet the latency objective"""
+        response = jsonify({
+            'success': False,
+            'error': str(error),
+            'estimated_wait': error.projected_seconds,
+            'retry_after': error.retry_after,
+            'pid': os.getpid()
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 503
+    
+    def backlog_full_response(error):
+        """Build a 429 response when the admitted backlog is at its limit"""
+        response = jsonify({
+            'success': False,
+            'error': str(error),
+            'backlog_seconds': error.backlog_seconds,
+            'retry_after': error.retry_after,
+            'pid': os.getpid()
+        })
+        response.headers['Retry-After'] = str(error.retry_after)
+        return response, 429
+    
+    def admit_upload(whisper_service, data, model_size):
+        """Price an upload and add it to the admission ledger, returning its cost"""
+        return get_admission_controller().admit(
+            model_size or whisper_service.model_size,
+            estimate_duration(data),
+            whisper_service.get_rtf()
+        )
+    
+    def timed_response(body, timer, include_timings, status=200):
+        """Serialize a transcription response, optionally with its stage timings in the body"""
+        with timer.stage("serialize"):
+            if include_timings:
+                body['timings'] = timer.to_dict()
+            response = jsonify(body)
+        return response, status
+    
+    def unsupported_model_response(whisper_service, model_size):
+        """Build a 400 response for a model size outside WHISPER_ALLOWED_MODELS"""
+        return jsonify({
+            'success': False,
+            'error': f'Unsupported model size: {model_size}',
+            'allowed_models': whisper_service.allowed_models,
+            'pid': os.getpid()
+        }), 400
+    
+    def model_budget_response(error):
+        """Build a 400 response for a model that can never fit in WHISPER_MODEL_MEMORY_MB"""
+        return jsonify({
+            'success': False,
+            'error': str(error),
+            'pid': os.getpid()
+        }), 400
+    
+    def unsupported_profile_response(profile):
+        """Build a 400 response for an unknown decoding profile"""
+        return jsonify({
+            'success': False,
+            'error': f'Unsupported decoding profile: {profile}',
+            'profiles': list(DECODING_PROFILES),
+            'pid': os.getpid()
+        }), 400
     
     @app.route('/health', methods=['GET', 'OPTIONS'])
     def health_check():
@@ -81,6 +293,10 @@ def create_app():
                 'timestamp': datetime.utcnow().isoformat(),
                 'service': 'whisper-voice-to-text',
                 'whisper_model': whisper_status,
+                'job_queue': get_job_queue().get_stats(),
+                'load_governor': get_load_governor().get_stats(),
+                'admission': get_admission_controller().get_stats(),
+                'streams': get_stream_slots().get_stats(),
                 'version': '1.0.0',
                 'pid': os.getpid()  # Add process ID to detect restarts
             })
@@ -88,6 +304,25 @@ def create_app():
             logger.error(f"Health check error: {str(e)}")
             return jsonify({'error': 'Health check failed', 'pid': os.getpid()}), 500
     
+    @app.route('/health/live', methods=['GET'])
+    def liveness_check():
+        """Liveness probe: the process is up and serving requests"""
+        return jsonify({'status': 'alive', 'pid': os.getpid()})
+    
+    @app.route('/health/ready', methods=['GET'])
+    def readiness_check():
+        """Readiness probe: the model is loaded and warmed up"""
+        whisper_status = get_whisper_service().get_status()
+        response = jsonify({
+            'status': 'ready' if whisper_status == 'ready' else 'not_ready',
+            'whisper_model': whisper_status,
+            'pid': os.getpid()
+        })
+        if whisper_status != 'ready':
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        return response
+    
     @app.route('/', methods=['GET'])
     def root():
         """Root endpoint"""
@@ -99,8 +334,14 @@ def create_app():
                 'pid': os.getpid(),
                 'endpoints': {
                     'health': '/health',
+                    'liveness': '/health/live',
+                    'readiness': '/health/ready',
                     'transcribe': '/api/v1/transcribe',
+                    'jobs': '/api/v1/jobs',
+                    'stream': '/api/v1/stream',
+                    'detect_audio_language': '/api/v1/detect-audio-language',
                     'translate': '/api/v1/translate',
+                    'translate_batch': '/api/v1/translate/batch',
                     'languages': '/api/v1/languages',
                     'translation_languages': '/api/v1/translation-languages',
                     'model_info': '/api/v1/model-info'
@@ -138,6 +379,60 @@ def create_app():
                 'pid': os.getpid()
             })
     
+    @app.route('/api/v1/detect-audio-language', methods=['POST', 'OPTIONS'])
+    def detect_audio_language():
+        """Identify the spoken language from the first 30 seconds of an upload"""
+        try:
+            if request.method == 'OPTIONS':
+                return '', 200
+            
+            if not request.files or 'audio' not in request.files:
+                return jsonify({'success': False, 'error': 'No audio file provided', 'pid': os.getpid()}), 400
+            
+            file = request.files['audio']
+            if file.filename == '':
+                return jsonify({'success': False, 'error': 'No file selected', 'pid': os.getpid()}), 400
+            
+            try:
+                top_k = min(max(int(request.form.get('top_k', 5)), 1), 20)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'top_k must be an integer', 'pid': os.getpid()}), 400
+            model_size = request.form.get('model_size', '')
+            
+            whisper_service = get_whisper_service()
+            if model_size and model_size not in whisper_service.allowed_models:
+                return unsupported_model_response(whisper_service, model_size)
+            try:
+                whisper_service.check_model(model_size)
+            except ModelBudgetError as e:
+                return model_budget_response(e)
+            if not whisper_service.is_model_loaded():
+                response = jsonify({
+                    'success': False,
+                    'error': 'Whisper model not loaded',
+                    'pid': os.getpid()
+                })
+                response.headers['Retry-After'] = '30'
+                return response, 503
+            
+            filename, data = read_upload(file)
+            result = whisper_service.detect_language(data, top_k, model_size or None)
+            logger.info(f"Detected language {result['language']} for {filename}")
+            
+            return jsonify({
+                'success': True,
+                'result': result,
+                'filename': filename,
+                'pid': os.getpid()
+            })
+        except Exception as e:
+            logger.error(f"Audio language detection error: {str(e)}")
+            return jsonify({
+                'success': False,
+                'error': f'Server error: {str(e)}',
+                'pid': os.getpid()
+            }), 500
+    
     @app.route('/api/v1/model-info', methods=['GET', 'OPTIONS'])
     def get_model_info():
         """Get model info"""
@@ -181,9 +476,12 @@ def create_app():
                 return '', 200
             
             logger.info(f"Request from: {request.remote_addr}")
+            timer = g.timer
             
-            # Validate request
-            if not request.files or 'audio' not in request.files:
+            # Validate request (the first access to request.files receives and parses the upload)
+            with timer.stage("upload"):
+                has_audio = bool(request.files) and 'audio' in request.files
+            if not has_audio:
                 logger.error("No audio file in request")
                 return jsonify({'success': False, 'error': 'No audio file provided', 'pid': os.getpid()}), 400
             
@@ -195,47 +493,104 @@ def create_app():
             # Get parameters
             language = request.form.get('language', '')
             task = request.form.get('task', 'transcribe')
+            model_size = request.form.get('model_size', '')
+            profile = request.form.get('profile', '')
+            include_timings = request.form.get('timings', 'false').lower() == 'true'
             
-            logger.info(f"Processing: {file.filename}, language={language}, task={task}")
+            logger.info(f"Processing: {file.filename}, language={language}, task={task}, model_size={model_size or 'default'}, profile={profile or 'default'}")
             
             # Get Whisper service
             whisper_service = get_whisper_service()
+            if model_size and model_size not in whisper_service.allowed_models:
+                return unsupported_model_response(whisper_service, model_size)
+            try:
+                whisper_service.check_model(model_size)
+            except ModelBudgetError as e:
+                return model_budget_response(e)
+            if profile and profile not in DECODING_PROFILES:
+                return unsupported_profile_response(profile)
             
             # Check if Whisper is available
             if whisper_service.is_model_loaded():
-                # Use real Whisper
-                filename = secure_filename(file.filename)
-                temp_dir = tempfile.mkdtemp()
-                temp_path = os.path.join(temp_dir, filename)
+                # Use real Whisper via the shared worker pool
+                with timer.stage("read"):
+                    filename, data = read_upload(file)
+                
+                # Repeat uploads are answered before they are priced or queued behind other work
+                with timer.stage("cache"):
+                    audio_hash, cached = lookup_cached_transcript(whisper_service, data, language or None, task,
+                                                                  model_size or None, profile or None)
+                if cached is not None:
+                    logger.info(f"Transcript cache hit for {filename}")
+                    return timed_response({
+                        'success': True,
+                        'result': cached,
+                        'filename': filename,
+                        'pid': os.getpid()
+                    }, timer, include_timings)
+                
+                governor = get_load_governor()
+                if governor.enabled:
+                    # Under load, fall back to a smaller model or shed the request
+                    try:
+                        model_size = governor.choose_model(
+                            model_size or whisper_service.model_size,
+                            estimate_duration(data),
+                            whisper_service.allowed_models,
+                            whisper_service.get_rtf()
+                        )
+                    except OverloadedError as e:
+                        return overloaded_response(e)
                 
                 try:
-                    logger.info(f"Saving file to: {temp_path}")
-                    file.save(temp_path)
-                    
-                    logger.info("Starting Whisper transcription...")
-                    result = whisper_service.transcribe_audio(
-                        temp_path, 
-                        language if language else None, 
-                        task
+                    cost = admit_upload(whisper_service, data, model_size)
+                except BacklogFullError as e:
+                    return backlog_full_response(e)
+                
+                try:
+                    job = get_job_queue().submit(
+                        run_transcription_job,
+                        whisper_service,
+                        data,
+                        language if language else None,
+                        task,
+                        model_size or None,
+                        profile or None,
+                        cost,
+                        timer,
+                        audio_hash
                     )
-                    
-                    logger.info("Transcription completed successfully")
-                    return jsonify({
+                except QueueFullError as e:
+                    get_admission_controller().release(cost)
+                    return queue_full_response(e)
+                
+                if not job.wait(transcribe_timeout):
+                    logger.info(f"Transcription still running after {transcribe_timeout}s - returning job {job.id}")
+                    return timed_response({
                         'success': True,
-                        'result': result,
+                        'job': job.to_dict(),
+                        'status_url': f'/api/v1/jobs/{job.id}',
                         'filename': filename,
                         'pid': os.getpid()
-                    })
-                    
-                finally:
-                    # Cleanup
-                    try:
-                        if os.path.exists(temp_path):
-                            os.remove(temp_path)
-                        os.rmdir(temp_dir)
-                        logger.info("Temporary files cleaned up")
-                    except Exception as cleanup_error:
-                        logger.warning(f"Cleanup error: {cleanup_error}")
+                    }, timer, include_timings, 202)
+                
+                timer.add("queue", job.started_at - job.created_at)
+                
+                if job.status == JOB_FAILED:
+                    logger.error(f"Transcription job {job.id} failed: {job.error}")
+                    return jsonify({
+                        'success': False,
+                        'error': f'Server error: {job.error}',
+                        'pid': os.getpid()
+                    }), 500
+                
+                logger.info("Transcription completed successfully")
+                return timed_response({
+                    'success': True,
+                    'result': job.result,
+                    'filename': filename,
+                    'pid': os.getpid()
+                }, timer, include_timings)
             else:
                 # Mock response
                 logger.info(f"Using mock response (Whisper status: {'loading' if whisper_service.is_loading else 'not loaded'})")
@@ -268,6 +623,196 @@ def create_app():
                 'error': f'Server error: {str(e)}',
                 'pid': os.getpid()
             }), 500
+    @app.route('/api/v1/jobs', methods=['POST', 'OPTIONS'])
+    def submit_job():
+        """Queue an audio file for asynchronous transcription"""
+        try:
+            if request.method == 'OPTIONS':
+                return '', 200
+            
+            if not request.files or 'audio' not in request.files:
+                logger.error("No audio file in request")
+                return jsonify({'success': False, 'error': 'No audio file provided', 'pid': os.getpid()}), 400
+            
+            file = request.files['audio']
+            if file.filename == '':
+                logger.error("Empty filename")
+                return jsonify({'success': False, 'error': 'No file selected', 'pid': os.getpid()}), 400
+            
+            language = request.form.get('language', '')
+            task = request.form.get('task', 'transcribe')
+            model_size = request.form.get('model_size', '')
+            profile = request.form.get('profile', '')
+            
+            whisper_service = get_whisper_service()
+            if model_size and model_size not in whisper_service.allowed_models:
+                return unsupported_model_response(whisper_service, model_size)
+            try:
+                whisper_service.check_model(model_size)
+            except ModelBudgetError as e:
+                return model_budget_response(e)
+            if profile and profile not in DECODING_PROFILES:
+                return unsupported_profile_response(profile)
+            if not whisper_service.is_model_loaded():
+                response = jsonify({
+                    'success': False,
+                    'error': 'Whisper model not loaded',
+                    'pid': os.getpid()
+                })
+                response.headers['Retry-After'] = '30'
+                return response, 503
+            
+            filename, data = read_upload(file)
+            audio_hash, cached = lookup_cached_transcript(whisper_service, data, language or None, task,
+                                                          model_size or None, profile or None)
+            if cached is not None:
+                job = get_job_queue().add_completed(cached)
+                logger.info(f"Transcript cache hit for {filename}, job {job.id} completed immediately")
+                return jsonify({
+                    'success': True,
+                    'job': job.to_dict(),
+                    'status_url': f'/api/v1/jobs/{job.id}',
+                    'filename': filename,
+                    'pid': os.getpid()
+                })
+            
+            try:
+                cost = admit_upload(whisper_service, data, model_size)
+            except BacklogFullError as e:
+                return backlog_full_response(e)
+            
+            try:
+                job = get_job_queue().submit(
+                    run_transcription_job,
+                    whisper_service,
+                    data,
+                    language if language else None,
+                    task,
+                    model_size or None,
+                    profile or None,
+                    cost,
+                    None,
+                    audio_hash
+                )
+            except QueueFullError as e:
+                get_admission_controller().release(cost)
+                return queue_full_response(e)
+            
+            logger.info(f"Queued transcription job {job.id} for {filename}")
+            response = jsonify({
+                'success': True,
+                'job': job.to_dict(),
+                'status_url': f'/api/v1/jobs/{job.id}',
+                'filename': filename,
+                'pid': os.getpid()
+            })
+            response.headers['Location'] = f'/api/v1/jobs/{job.id}'
+            return response, 202
+            
+        except Exception as e:
+            logger.error(f"Error submitting job: {str(e)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            return jsonify({
+                'success': False,
+                'error': f'Server error: {str(e)}',
+                'pid': os.getpid()
+            }), 500
+    
+    @app.route('/api/v1/jobs/<job_id>', methods=['GET', 'OPTIONS'])
+    def get_job(job_id):
+        """Poll a transcription job, optionally long-polling with ?wait=<seconds>"""
+        if request.method == 'OPTIONS':
+            return '', 200
+        
+        try:
+            wait = min(float(request.args.get('wait', 0)), max_long_poll)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid wait parameter', 'pid': os.getpid()}), 400
+        
+        # The job may have been submitted through another worker process
+        try:
+            job = get_job_queue().poll(job_id, max(wait, 0))
+        except Exception as e:
+            logger.error(f"Job lookup failed: {str(e)}")
+            response = jsonify({'success': False, 'error': 'Job registry unavailable', 'pid': os.getpid()})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        if job is None:
+            return jsonify({'success': False, 'error': 'Job not found', 'pid': os.getpid()}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job,
+            'pid': os.getpid()
+        })
+    
+    if Sock is not None:
+        sock = Sock(app)
+        
+        @sock.route('/api/v1/stream')
+        def stream_transcription(ws):
+            """Stream audio chunks in and partial/final transcript segments out"""
+            logger.info(f"=== STREAM START (PID: {os.getpid()}) ===")
+            
+            whisper_service = get_whisper_service()
+            if not whisper_service.is_model_loaded():
+                ws.send(json.dumps({'type': 'error', 'error': 'Whisper model not loaded'}))
+                return
+            
+            # Streams bypass the job queue, so their number is capped separately
+            slots = get_stream_slots()
+            try:
+                slots.acquire()
+            except StreamLimitError as e:
+                logger.warning(f"Rejecting stream: {str(e)}")
+                ws.send(json.dumps({'type': 'error', 'error': str(e)}))
+                ws.close(reason=1013, message='Try again later')
+                return
+            
+            decoder = None
+            try:
+                audio_format = request.args.get('format', 'pcm16')
+                sample_rate = int(request.args.get('sample_rate', 16000))
+                language = request.args.get('language', '')
+                task = request.args.get('task', 'transcribe')
+                
+                decoder = StreamingDecoder(audio_format, sample_rate)
+                transcriber = StreamingTranscriber(whisper_service, language if language else None, task)
+                
+                while True:
+                    message = ws.receive()
+                    if message is None:
+                        break
+                    if isinstance(message, str):
+                        if json.loads(message).get('type') == 'stop':
+                            break
+                        continue
+                    for event in transcriber.add_audio(decoder.feed(message)):
+                        ws.send(json.dumps(event))
+                
+                events = transcriber.add_audio(decoder.close()) + transcriber.finish()
+                for event in events:
+                    ws.send(json.dumps(event))
+                ws.send(json.dumps({'type': 'done'}))
+                logger.info("Stream finished")
+                
+            except ConnectionClosed:
+                logger.info("Stream closed by client")
+            except Exception as e:
+                logger.error(f"Stream error: {str(e)}")
+                logger.error(f"Traceback: {traceback.format_exc()}")
+                try:
+                    ws.send(json.dumps({'type': 'error', 'error': str(e)}))
+                except ConnectionClosed:
+                    pass
+            finally:
+                # An aborted stream would otherwise leave its ffmpeg process and reader thread behind
+                if decoder is not None:
+                    decoder.terminate()
+                slots.release()
+    else:
+        logger.warning("flask-sock not installed - streaming endpoint disabled")
+    
     @app.route('/api/v1/translate', methods=['POST', 'OPTIONS'])
     def translate_text():
         """Proxy translate text to translation service"""
@@ -302,9 +847,14 @@ def create_app():
                     return jsonify(result)
                 else:
                     logger.error(f"Translation service error: {response.status_code}")
+                    try:
+                        # Pass the service's reason through, e.g. a missing source language
+                        error = response.json().get('error')
+                    except ValueError:
+                        error = None
                     return jsonify({
                         'success': False,
-                        'error': f'Translation service error: {response.status_code}',
+                        'error': error or f'Translation service error: {response.status_code}',
                         'pid': os.getpid()
                     }), response.status_code
                     
@@ -327,6 +877,44 @@ def create_app():
                 'pid': os.getpid()
             }), 500
 
+    @app.route('/api/v1/translate/batch', methods=['POST', 'OPTIONS'])
+    def translate_batch():
+        """Proxy batch translation to translation service"""
+        try:
+            if request.method == 'OPTIONS':
+                return '', 200
+            
+            data = request.get_json()
+            if not data:
+                return jsonify({'success': False, 'error': 'No JSON data provided', 'pid': os.getpid()}), 400
+            
+            translation_service_url = os.getenv('TRANSLATION_SERVICE_URL', 'http://translation-service:6000')
+            
+            try:
+                response = requests.post(
+                    f"{translation_service_url}/translate/batch",
+                    json=data,
+                    timeout=float(os.getenv('TRANSLATE_BATCH_TIMEOUT', '120'))
+                )
+                # Per-item errors and 400s carry useful detail, so pass the body through
+                return jsonify(response.json()), response.status_code
+                
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.error(f"Failed to connect to translation service: {str(e)}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Translation service unavailable: {str(e)}',
+                    'pid': os.getpid()
+                }), 503
+                
+        except Exception as e:
+            logger.error(f"Batch translate proxy error: {str(e)}")
+            return jsonify({
+                'success': False,
+                'error': f'Server error: {str(e)}',
+                'pid': os.getpid()
+            }), 500
+
     @app.route('/api/v1/translation-languages', methods=['GET', 'OPTIONS'])
     def get_translation_languages():
         """Proxy get translation languages to translation service"""
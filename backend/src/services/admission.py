@@ -0,0 +1,87 @@
+"""
+Ingress admission control against a ledger of outstanding transcription work
+"""
+import os
+import math
+import threading
+import logging
+
+from services.load_governor import DEFAULT_RTF
+
+logger = logging.getLogger(__name__)
+
+
+class BacklogFullError(Exception):
+    """Exception raised when admitting a request would push the backlog past its limit"""
+
+    def __init__(self, message, retry_after, backlog_seconds):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.backlog_seconds = backlog_seconds
+
+
+class AdmissionController:
+    """Prices each upload in processing seconds and keeps the admitted total under a limit"""
+
+    def __init__(self, workers: int = 1, max_backlog_seconds: float = None):
+        # Inference lanes running concurrently, i.e. how many processing seconds drain per second
+        self.workers = max(1, workers)
+        self.max_backlog_seconds = (max_backlog_seconds if max_backlog_seconds is not None
+                                    else float(os.getenv('ADMISSION_MAX_BACKLOG_SECONDS', '0')))
+        self.backlog_seconds = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Requests are only rejected when a backlog limit is configured"""
+        return self.max_backlog_seconds > 0
+
+    @staticmethod
+    def estimate_cost(model_size: str, audio_seconds: float, measured_rtf):
+        """Expected processing seconds: audio duration times the model's rolling real-time factor"""
+        return audio_seconds * measured_rtf.get(model_size, DEFAULT_RTF.get(model_size, 1.0))
+
+    def admit(self, model_size: str, audio_seconds: float, measured_rtf):
+        """Add a request to the ledger and return its cost, or raise BacklogFullError"""
+        cost = self.estimate_cost(model_size, audio_seconds, measured_rtf)
+        with self._lock:
+            # An idle server takes any single request, however long
+            if self.enabled and self.backlog_seconds > 0 and self.backlog_seconds + cost > self.max_backlog_seconds:
+                self.rejected += 1
+                backlog = self.backlog_seconds
+                # The backlog drains at roughly one processing second per second per worker
+                retry_after = max(1, math.ceil((backlog + cost - self.max_backlog_seconds) / self.workers))
+            else:
+                self.backlog_seconds += cost
+                self.admitted += 1
+                return cost
+
+        logger.warning(f"Admission: backlog {backlog:.1f}s + {cost:.1f}s exceeds {self.max_backlog_seconds:.0f}s, "
+                       f"rejecting - retry after {retry_after}s")
+        raise BacklogFullError(
+            f"Server busy: {backlog:.0f}s of transcription work already queued",
+            retry_after,
+            round(backlog, 1)
+        )
+
+    def release(self, cost: float):
+        """Remove a finished (or abandoned) request from the ledger"""
+        with self._lock:
+            self.backlog_seconds = max(0.0, self.backlog_seconds - cost)
+
+    def estimate_wait_seconds(self) -> int:
+        """Seconds until the admitted backlog has drained"""
+        with self._lock:
+            return max(1, math.ceil(self.backlog_seconds / self.workers))
+
+    def get_stats(self):
+        """Get ledger and counters"""
+        with self._lock:
+            return {
+                "max_backlog_seconds": self.max_backlog_seconds if self.enabled else None,
+                "backlog_seconds": round(self.backlog_seconds, 1),
+                "admitted": self.admitted,
+                "rejected": self.rejected
+            }
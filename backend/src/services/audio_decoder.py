@@ -0,0 +1,125 @@
+"""
+In-memory audio decoding to 16 kHz mono float32 samples
+"""
+import io
+import os
+import wave
+import subprocess
+import logging
+from math import gcd
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(Exception):
+    """Exception raised when uploaded audio cannot be decoded"""
+    pass
+
+
+def decode_audio(data: bytes, max_seconds: float = None) -> np.ndarray:
+    """Decode uploaded audio bytes without touching the filesystem"""
+    if not data:
+        raise AudioDecodeError("Empty audio data")
+
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        try:
+            return _decode_wav(data, max_seconds)
+        except (wave.Error, EOFError, ValueError) as e:
+            # Float or extensible WAVs are left to ffmpeg
+            logger.info(f"Native WAV decode unavailable ({str(e)}), using ffmpeg")
+
+    return _decode_ffmpeg(data, max_seconds)
+
+
+def estimate_duration(data: bytes) -> float:
+    """Estimate the duration of an upload in seconds without decoding it"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        try:
+            with wave.open(io.BytesIO(data), 'rb') as wav:
+                return wav.getnframes() / wav.getframerate()
+        except (wave.Error, EOFError, ZeroDivisionError):
+            pass
+    # Compressed formats: assume a typical voice bitrate
+    kbps = float(os.getenv('AUDIO_ESTIMATE_KBPS', '64'))
+    return len(data) * 8 / (kbps * 1000)
+
+
+def _decode_wav(data: bytes, max_seconds: float = None) -> np.ndarray:
+    """Decode integer PCM WAV natively"""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        frames = wav.getnframes()
+        if max_seconds is not None:
+            frames = min(frames, int(max_seconds * rate))
+        raw = wav.readframes(frames)
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 3:
+        bytes_ = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (bytes_[:, 0].astype(np.int32) | (bytes_[:, 1].astype(np.int32) << 8)
+                | (bytes_[:, 2].astype(np.int32) << 16))
+        ints = np.where(ints & 0x800000, ints - 0x1000000, ints)
+        samples = ints.astype(np.float32) / 8388608.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width}")
+
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+
+    if rate != SAMPLE_RATE:
+        from scipy.signal import resample_poly  # pylint: disable=import-outside-toplevel
+        divisor = gcd(rate, SAMPLE_RATE)
+        samples = resample_poly(samples, SAMPLE_RATE // divisor, rate // divisor)
+
+    return np.ascontiguousarray(samples, dtype=np.float32)
+
+
+def _decode_ffmpeg(data: bytes, max_seconds: float = None) -> np.ndarray:
+    """Decode any ffmpeg-supported format through pipes"""
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error"]
+    pass_fds = ()
+    memfd = None
+
+    # MP4/M4A may keep the index at the end of the file, which ffmpeg cannot
+    # seek to through a pipe - hand those over as an anonymous in-memory file
+    if data[4:8] == b'ftyp' and hasattr(os, 'memfd_create'):
+        memfd = os.memfd_create("upload")
+        os.write(memfd, data)
+        os.lseek(memfd, 0, os.SEEK_SET)
+        pass_fds = (memfd,)
+        source = f"/proc/self/fd/{memfd}"
+        stdin = None
+    else:
+        source = "pipe:0"
+        stdin = data
+
+    if max_seconds is not None:
+        cmd += ["-t", str(max_seconds)]
+    cmd += [
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "pipe:1"
+    ]
+
+    try:
+        result = subprocess.run(cmd, input=stdin, capture_output=True, pass_fds=pass_fds, check=True)
+    except FileNotFoundError as e:
+        raise AudioDecodeError("ffmpeg is not installed") from e
+    except subprocess.CalledProcessError as e:
+        raise AudioDecodeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore').strip()}") from e
+    finally:
+        if memfd is not None:
+            os.close(memfd)
+
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
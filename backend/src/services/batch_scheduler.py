@@ -0,0 +1,225 @@
+"""
+Dynamic micro-batching of short Whisper requests
+"""
+import os
+import threading
+import time
+import logging
+from concurrent.futures import Future
+
+from services.decoding_profiles import DECODING_PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Whisper thresholds used by transcribe() to drop windows that contain no speech
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+# transcribe() re-decodes a window at the next temperature when its text is this repetitive
+COMPRESSION_RATIO_THRESHOLD = 2.4
+
+
+class _BatchItem:
+    """A pending clip waiting to join a batch"""
+
+    def __init__(self, mel, duration, language, task, profile="balanced"):
+        self.mel = mel
+        self.duration = duration
+        self.language = language
+        self.task = task
+        self.profile = profile
+        self.future = Future()
+
+    @property
+    def key(self):
+        """Items can only share a forward pass if their decoding options match"""
+        return (self.language, self.task, self.profile)
+
+
+class WhisperBatchScheduler:
+    """Collects 30-second mel windows from concurrent callers and decodes them together"""
+
+    def __init__(self, model, inference_lock, window_ms: float = None, max_batch_size: int = None,
+                 num_threads: int = None):
+        self.model = model
+        self.inference_lock = inference_lock
+        self.window = (window_ms if window_ms is not None else float(os.getenv('WHISPER_BATCH_WINDOW_MS', '0'))) / 1000.0
+        self.max_batch_size = max(1, max_batch_size or int(os.getenv('WHISPER_BATCH_MAX_SIZE', '8')))
+        self.num_threads = num_threads
+
+        self._pending = []
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+        self.batches = 0
+        self.items = 0
+
+        logger.info(f"Batch scheduler started (window: {self.window * 1000:.0f}ms, max batch: {self.max_batch_size})")
+
+    def transcribe(self, audio, language=None, task="transcribe", profile="balanced"):
+        """Transcribe a clip of at most 30 seconds, blocking until its batch is decoded"""
+        import whisper  # pylint: disable=import-outside-toplevel
+
+        duration = len(audio) / whisper.audio.SAMPLE_RATE
+        # Mel computation runs on the caller's thread so it overlaps with other requests
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio),
+            n_mels=self.model.dims.n_mels
+        )
+
+        item = _BatchItem(mel, duration, language, task, profile)
+        with self._condition:
+            stopped = self._stopped
+            if not stopped:
+                self._pending.append(item)
+                self._condition.notify()
+
+        if stopped:
+            # The scheduler thread has exited; decode on the caller's thread instead
+            self._decode_group([item])
+        return item.future.result()
+
+    def stop(self):
+        """Stop the scheduler thread once pending clips are decoded"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def get_stats(self):
+        """Get batching statistics"""
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None
+        }
+
+    def _run(self):
+        """Scheduler loop: wait for work, hold the window open, then decode"""
+        if self.num_threads:
+            import torch  # pylint: disable=import-outside-toplevel
+            # OpenMP thread counts are per calling thread, like on the inference lanes
+            torch.set_num_threads(self.num_threads)
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch_size and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size:]
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(item.key, []).append(item)
+
+            for items in groups.values():
+                self._decode_group(items)
+
+    def _decode_group(self, items):
+        """Batched decode with the profile's options, re-decoding failed clips at rising temperatures"""
+        try:
+            import torch  # pylint: disable=import-outside-toplevel
+            import whisper  # pylint: disable=import-outside-toplevel
+
+            language, task, profile = items[0].key
+            settings = DECODING_PROFILES[profile]
+            temperatures = settings["temperature"]
+            temperatures = temperatures if isinstance(temperatures, (tuple, list)) else (temperatures,)
+            # Within a single 30-second window there is no previous text to condition on
+
+            self.batches += 1
+            self.items += len(items)
+            remaining = items
+            for index, temperature in enumerate(temperatures):
+                # Like transcribe(): beam search at temperature 0, best-of-N sampling above it
+                options = whisper.DecodingOptions(
+                    task=task,
+                    language=language,
+                    temperature=temperature,
+                    beam_size=settings["beam_size"] if temperature == 0 else None,
+                    best_of=settings["best_of"] if temperature > 0 else None,
+                    fp16=False
+                )
+                mels = torch.stack([item.mel for item in remaining]).to(self.model.device)
+                with self.inference_lock:
+                    results = self.model.decode(mels, options)
+                logger.info(f"Decoded batch of {len(remaining)} clip(s) at temperature {temperature}")
+
+                last = index == len(temperatures) - 1
+                retry = []
+                for item, result in zip(remaining, results):
+                    if not last and self._needs_fallback(result):
+                        retry.append(item)
+                    else:
+                        item.future.set_result(self._to_response(result, item.duration, task))
+                if not retry:
+                    break
+                remaining = retry
+        except Exception as e:
+            logger.error(f"Batched decode failed: {str(e)}")
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    @staticmethod
+    def _needs_fallback(result):
+        """transcribe()'s test for a window worth decoding again at a higher temperature"""
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD:
+            return False
+        return result.compression_ratio > COMPRESSION_RATIO_THRESHOLD or result.avg_logprob < LOGPROB_THRESHOLD
+
+    def _to_response(self, result, duration, task):
+        """Convert a DecodingResult into the transcribe() result layout"""
+        import whisper  # pylint: disable=import-outside-toplevel
+
+        if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+            return {"text": "", "language": result.language, "segments": []}
+
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language=result.language,
+            task=task
+        )
+        time_precision = whisper.audio.HOP_LENGTH * 2 / whisper.audio.SAMPLE_RATE
+
+        # Split the token stream on timestamp tokens, the same way transcribe() does
+        segments = []
+        start = None
+        text_tokens = []
+        for token in result.tokens:
+            if token >= tokenizer.timestamp_begin:
+                timestamp = (token - tokenizer.timestamp_begin) * time_precision
+                if start is None:
+                    start = timestamp
+                else:
+                    if text_tokens:
+                        segments.append({
+                            "start": start,
+                            "end": min(timestamp, duration),
+                            "text": tokenizer.decode(text_tokens)
+                        })
+                    start = None
+                    text_tokens = []
+            elif token < tokenizer.eot:
+                text_tokens.append(token)
+
+        if text_tokens:
+            segments.append({
+                "start": start or 0.0,
+                "end": duration,
+                "text": tokenizer.decode(text_tokens)
+            })
+
+        return {"text": result.text, "language": result.language, "segments": segments}
@@ -0,0 +1,49 @@
+"""
+Named decoding presets that trade transcription accuracy for latency
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Whisper's default ladder: a window is re-decoded at each temperature until it passes
+# the compression-ratio and log-probability checks
+FALLBACK_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+DECODING_PROFILES = {
+    # Greedy, a single pass per window, and no prompt from the previous window
+    'fast': {
+        "temperature": 0.0,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": False
+    },
+    # openai-whisper's transcribe() defaults
+    'balanced': {
+        "temperature": FALLBACK_TEMPERATURES,
+        "beam_size": None,
+        "best_of": None,
+        "condition_on_previous_text": True
+    },
+    # Beam search at temperature 0, best-of-5 sampling on fallback
+    'accurate': {
+        "temperature": FALLBACK_TEMPERATURES,
+        "beam_size": 5,
+        "best_of": 5,
+        "condition_on_previous_text": True
+    }
+}
+
+
+def get_default_profile(profile: str = None):
+    """Decoding profile used when a request does not name one (WHISPER_DECODING_PROFILE)"""
+    profile = (profile or os.getenv('WHISPER_DECODING_PROFILE', 'balanced')).lower()
+    if profile not in DECODING_PROFILES:
+        logger.warning(f"Unknown decoding profile '{profile}', using balanced")
+        return 'balanced'
+    return profile
+
+
+def whisper_options(profile: str):
+    """openai-whisper transcribe() keyword arguments for a profile"""
+    return {key: value for key, value in DECODING_PROFILES[profile].items() if value is not None}
@@ -0,0 +1,111 @@
+"""
+Size-bounded in-memory caches for decoded audio and Whisper encoder outputs
+"""
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from services.audio_decoder import decode_audio
+from services.transcript_cache import hash_audio
+
+logger = logging.getLogger(__name__)
+
+
+class ArrayCache:
+    """LRU of numpy arrays or tensors bounded by their total size in MB"""
+
+    def __init__(self, budget_mb: float):
+        self.budget_mb = budget_mb
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        """The cache is off when its budget is zero"""
+        return self.budget_mb > 0
+
+    def get(self, key: str):
+        """Look up an array, marking it most recently used"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value):
+        """Store an array, evicting the least recently used ones past the budget"""
+        size = value.nbytes
+        budget = self.budget_mb * 1024 * 1024
+        if size > budget:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = value
+            self._bytes += size
+            while self._bytes > budget:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def get_stats(self):
+        """Get hit counters and memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_mb": round(self._bytes / (1024 * 1024), 1),
+                "budget_mb": self.budget_mb,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+def create_audio_cache():
+    """Cache of decoded uploads keyed by the hash of their bytes (WHISPER_AUDIO_CACHE_MB)"""
+    return ArrayCache(float(os.getenv('WHISPER_AUDIO_CACHE_MB', '128')))
+
+
+def decode_cached(cache, data: bytes, audio_hash: str = None):
+    """Decode encoded audio bytes, reusing the samples from an earlier upload of the same file"""
+    if not cache.enabled:
+        return decode_audio(data)
+    key = audio_hash or hash_audio(data)
+    audio = cache.get(key)
+    if audio is None:
+        audio = decode_audio(data)
+        cache.put(key, audio)
+    return audio
+
+
+def cache_encoder(model, cache):
+    """Memoize a Whisper model's audio encoder on the content of each 30-second mel window"""
+    import torch  # pylint: disable=import-outside-toplevel
+
+    encode = model.encoder.forward
+
+    def forward(mel):
+        # transcribe() seeks within a clip and retries at higher temperatures, so windows
+        # are keyed by their own content rather than by the upload they came from
+        keys = [hashlib.sha1(row.detach().cpu().contiguous().numpy().tobytes()).hexdigest() for row in mel]
+        features = [cache.get(key) for key in keys]
+        missing = [index for index, feature in enumerate(features) if feature is None]
+        if missing:
+            encoded = encode(mel[missing])
+            for position, index in enumerate(missing):
+                # Clone so a cached row does not keep the whole batch alive
+                features[index] = encoded[position].clone()
+                cache.put(keys[index], features[index])
+        return torch.stack(features)
+
+    # nn.Module.__call__ dispatches through the instance attribute
+    model.encoder.forward = forward
+    return model
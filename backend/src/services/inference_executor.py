@@ -0,0 +1,86 @@
+"""
+Inference lanes that partition CPU cores between concurrent model calls
+"""
+import os
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus():
+    """CPUs this process may run on (respects container CPU sets)"""
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:
+        return list(range(os.cpu_count() or 1))
+
+
+class InferenceExecutor:
+    """Runs model calls on a fixed number of lane threads, each with its own share of cores"""
+
+    def __init__(self, lanes: int = None, threads_per_lane: int = None, pin_cpus: bool = None):
+        cpus = available_cpus()
+        self.lanes = max(1, lanes or int(os.getenv('WHISPER_EXECUTOR_LANES', '1')))
+        self.threads_per_lane = max(1, threads_per_lane or int(os.getenv('WHISPER_THREADS_PER_LANE', '0'))
+                                    or len(cpus) // self.lanes)
+        self.pin_cpus = pin_cpus if pin_cpus is not None else os.getenv('WHISPER_PIN_CPUS', 'false').lower() == 'true'
+        # Contiguous, non-overlapping core sets so lanes never compete for the same cores
+        self.cpu_sets = []
+        for index in range(self.lanes):
+            start = (index * self.threads_per_lane) % len(cpus)
+            self.cpu_sets.append(cpus[start:start + self.threads_per_lane] or cpus)
+
+        self._queue = queue.Queue()
+        self.busy = 0
+        self._busy_lock = threading.Lock()
+        for index in range(self.lanes):
+            threading.Thread(target=self._lane_loop, args=(index,), name=f"inference-lane-{index}", daemon=True).start()
+
+        logger.info(f"Inference executor started with {self.lanes} lane(s) x {self.threads_per_lane} thread(s)"
+                    f"{' pinned to CPUs' if self.pin_cpus else ''}")
+
+    def run(self, func):
+        """Run func(lane_index) on the next free lane and wait for its result"""
+        future = Future()
+        self._queue.put((func, future))
+        return future.result()
+
+    def _lane_loop(self, index):
+        """Configure this lane's thread pool once, then execute calls from the shared queue"""
+        try:
+            import torch  # pylint: disable=import-outside-toplevel
+            # OpenMP thread counts are per calling thread, so each lane gets its own pool size
+            torch.set_num_threads(self.threads_per_lane)
+        except ImportError:
+            pass
+        if self.pin_cpus and hasattr(os, 'sched_setaffinity'):
+            try:
+                # pid 0 is the calling thread; OpenMP workers it spawns inherit the mask
+                os.sched_setaffinity(0, self.cpu_sets[index])
+            except OSError as e:
+                logger.warning(f"Could not pin lane {index} to CPUs {self.cpu_sets[index]}: {e}")
+
+        while True:
+            func, future = self._queue.get()
+            with self._busy_lock:
+                self.busy += 1
+            try:
+                future.set_result(func(index))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._busy_lock:
+                    self.busy -= 1
+
+    def get_stats(self):
+        """Get lane configuration and utilisation"""
+        return {
+            "lanes": self.lanes,
+            "threads_per_lane": self.threads_per_lane,
+            "pinned": self.pin_cpus,
+            "busy": self.busy,
+            "queued": self._queue.qsize()
+        }
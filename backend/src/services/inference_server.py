@@ -0,0 +1,444 @@
+"""
+Shared Whisper inference server process and its client for HTTP workers
+
+The server owns the only copy of the model. HTTP workers talk to it over a
+local Unix socket and hand over decoded PCM through shared memory, so the
+audio samples are written once and never pickled through the socket.
+"""
+import os
+import time
+import threading
+import logging
+from multiprocessing import Process
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Listener, Client
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from services.audio_decoder import decode_audio
+from services.transcript_cache import hash_audio
+from services.model_registry import ModelBudgetError, allowed_model_sizes
+from services.decoding_profiles import DECODING_PROFILES
+from services.timings import StageTimer
+from services.admission import AdmissionController, BacklogFullError
+from services.job_queue import JobRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = '/tmp/whisper-inference.sock'
+
+
+class _AudioNotCached(Exception):
+    """Raised when a request names samples by hash that the server no longer holds"""
+
+
+def run_inference_server(address: str, authkey: bytes):
+    """Serve transcription requests for the HTTP workers (runs in its own process)"""
+    from services.whisper_service import SimpleWhisperService  # pylint: disable=import-outside-toplevel
+
+    # The service loads its model on a background thread, so connections are
+    # accepted right away and workers can report "loading"
+    service = SimpleWhisperService()
+    state = {
+        "service": service,
+        # One ledger for every HTTP worker, since they all share this process's model and its lanes
+        "admission": AdmissionController(service.executor.lanes),
+        # Jobs are run by the worker that accepted them but can be polled through any worker
+        "jobs": JobRegistry()
+    }
+
+    if os.path.exists(address):
+        os.remove(address)
+
+    with Listener(address, family='AF_UNIX', authkey=authkey) as listener:
+        logger.info(f"Whisper inference server listening on {address} (PID: {os.getpid()})")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"Rejected inference client: {str(e)}")
+                continue
+            threading.Thread(
+                target=_serve_connection,
+                args=(conn, state),
+                name="inference-conn",
+                daemon=True
+            ).start()
+
+
+def _serve_connection(conn, state):
+    """Handle requests from one HTTP worker connection"""
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+            conn.send(_handle_message(message, state))
+    except Exception as e:
+        logger.error(f"Inference connection error: {str(e)}")
+    finally:
+        conn.close()
+
+
+def _handle_message(message, state):
+    """Dispatch a single request to the Whisper service or the shared admission ledger"""
+    op = message.get("op")
+    service = state["service"]
+
+    if op == "admit":
+        try:
+            cost = state["admission"].admit(message["model_size"], message["audio_seconds"], service.get_rtf())
+            return {"ok": True, "admitted": True, "cost": cost}
+        except BacklogFullError as e:
+            return {"ok": True, "admitted": False, "error": str(e), "retry_after": e.retry_after,
+                    "backlog_seconds": e.backlog_seconds}
+    if op == "release":
+        state["admission"].release(message["cost"])
+        return {"ok": True}
+    if op == "admission_wait":
+        return {"ok": True, "result": state["admission"].estimate_wait_seconds()}
+    if op == "admission_stats":
+        return {"ok": True, "result": state["admission"].get_stats()}
+    if op == "job_publish":
+        state["jobs"].publish(message["record"])
+        return {"ok": True}
+    if op == "job_get":
+        return {"ok": True, "result": state["jobs"].get(message["job_id"], message.get("wait", 0))}
+
+    if op == "status":
+        return {
+            "ok": True,
+            "loaded": service.is_model_loaded(),
+            "loading": service.is_loading,
+            "status": service.get_status(),
+            "model_size": service.model_size
+        }
+
+    if not service.is_model_loaded():
+        return {"ok": False, "error": "Whisper model is not loaded"}
+
+    try:
+        if op == "transcribe":
+            timer = StageTimer()
+            result = _transcribe_shared(service, message, timer)
+            return {"ok": True, "result": result, "timings": timer.to_dict()}
+        if op == "cached":
+            return {"ok": True, "result": service.get_cached_transcript(
+                message["audio_hash"], message.get("language"), message.get("task", "transcribe"),
+                message.get("model_size"), message.get("profile"))}
+        if op == "check_model":
+            try:
+                service.check_model(message.get("model_size"))
+                return {"ok": True, "fits": True}
+            except ModelBudgetError as e:
+                return {"ok": True, "fits": False, "error": str(e)}
+        if op == "languages":
+            return {"ok": True, "result": service.get_supported_languages()}
+        if op == "detect_language":
+            return {"ok": True, "result": _detect_language_shared(service, message)}
+        if op == "rtf":
+            return {"ok": True, "result": service.get_rtf()}
+        if op == "model_info":
+            return {"ok": True, "result": service.get_model_info()}
+        return {"ok": False, "error": f"Unknown operation: {op}"}
+    except _AudioNotCached:
+        return {"ok": False, "missing_audio": True}
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+
+def _run_shared(service, message, func):
+    """Call func on the PCM samples in shared memory, or on decoded samples cached under the audio hash"""
+    cache = service.audio_cache
+    if "shm" not in message:
+        audio = cache.get(message["audio_hash"]) if cache.enabled and message.get("audio_hash") else None
+        if audio is None:
+            raise _AudioNotCached()
+        return func(audio)
+
+    shm = SharedMemory(name=message["shm"])
+    # The client owns the segment; stop this process's tracker from unlinking it on exit
+    resource_tracker.unregister(shm._name, "shared_memory")  # pylint: disable=protected-access
+    try:
+        audio = np.ndarray((message["samples"],), dtype=np.float32, buffer=shm.buf)
+        if message.get("cache_audio") and cache.enabled:
+            # One decoded-audio cache for every HTTP worker; copied out of the client's segment
+            cache.put(message["audio_hash"], audio.copy())
+        result = func(audio)
+        del audio
+        return result
+    finally:
+        shm.close()
+
+
+def _transcribe_shared(service, message, timer=None):
+    """Transcribe shared-memory samples"""
+    return _run_shared(service, message, lambda audio: service.transcribe_audio(
+        audio,
+        message.get("language"),
+        message.get("task", "transcribe"),
+        audio_hash=message.get("audio_hash"),
+        use_cache=message.get("use_cache", True),
+        model_size=message.get("model_size"),
+        profile=message.get("profile"),
+        timer=timer
+    ))
+
+
+def _detect_language_shared(service, message):
+    """Identify the language of shared-memory samples"""
+    return _run_shared(service, message, lambda audio: service.detect_language(
+        audio[:30 * 16000],
+        message.get("top_k", 5),
+        message.get("model_size")
+    ))
+
+
+def start_inference_server_process(address: str, authkey: bytes) -> Process:
+    """Launch the inference server in a separate process"""
+    process = Process(
+        target=run_inference_server,
+        args=(address, authkey),
+        name="whisper-inference-server"
+    )
+    process.start()
+    logger.info(f"Started Whisper inference server process (PID: {process.pid})")
+    return process
+
+
+class RemoteWhisperService:
+    """Drop-in replacement for SimpleWhisperService that forwards to the inference server"""
+
+    def __init__(self, address: str = None, authkey: bytes = None):
+        self.address = address or os.getenv('WHISPER_INFERENCE_SOCKET', DEFAULT_SOCKET_PATH)
+        self.authkey = authkey or os.getenv('WHISPER_INFERENCE_AUTHKEY', '').encode()
+        self.model_size = os.getenv('WHISPER_MODEL_SIZE', 'small')
+        self.allowed_models = allowed_model_sizes(self.model_size)
+        self.device = "cpu"
+        # One connection per thread; Connection objects are not thread-safe
+        self._local = threading.local()
+
+    def _call(self, message):
+        """Send a request to the inference server and return its reply"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(self.address, family='AF_UNIX', authkey=self.authkey)
+            self._local.conn = conn
+        try:
+            conn.send(message)
+            return conn.recv()
+        except (EOFError, OSError):
+            # Server restarted - drop the stale connection so the next call reconnects
+            self._local.conn = None
+            conn.close()
+            raise
+
+    def _call_shared(self, audio, message):
+        """Send a request whose samples travel through a shared-memory segment"""
+        shm = SharedMemory(create=True, size=max(audio.nbytes, 1))
+        try:
+            shared = np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)
+            shared[:] = audio
+            del shared
+            return self._call(dict(message, shm=shm.name, samples=len(audio)))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _status(self):
+        """Get the server's model status, treating an unreachable server as not loaded"""
+        try:
+            return self._call({"op": "status"})
+        except Exception as e:
+            logger.warning(f"Inference server unavailable: {str(e)}")
+            return {"ok": False, "loaded": False, "loading": False}
+
+    @property
+    def is_loading(self):
+        """Whether the server is still loading the model"""
+        return self._status().get("loading", False)
+
+    def is_model_loaded(self):
+        """Check if the server's model is loaded"""
+        return self._status().get("loaded", False)
+
+    def is_ready(self):
+        """Check if the server's model is loaded and warmed up"""
+        return self.get_status() == "ready"
+
+    def get_status(self):
+        """Get the server's model lifecycle state"""
+        return self._status().get("status", "not_loaded")
+
+    def transcribe_audio(self, audio, language=None, task="transcribe", audio_hash=None, use_cache=True,
+                         model_size=None, profile=None, timer=None):
+        """Transcribe a file path, encoded audio bytes or 16 kHz samples in the inference server"""
+        if model_size and model_size not in self.allowed_models:
+            raise ValueError(f"Unsupported model size: {model_size}")
+        if profile and profile not in DECODING_PROFILES:
+            raise ValueError(f"Unsupported decoding profile: {profile}")
+
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                raise Exception(f"Audio file not found: {audio}")
+            with open(audio, 'rb') as f:
+                audio = f.read()
+
+        timer = timer if timer is not None else StageTimer()
+        if use_cache:
+            audio_hash = audio_hash or hash_audio(audio)
+            # Ask the server's cache first so repeated uploads are not even decoded
+            with timer.stage("cache"):
+                cached = self.get_cached_transcript(audio_hash, language, task, model_size, profile)
+            if cached is not None:
+                return cached
+
+        message = {
+            "op": "transcribe",
+            "language": language,
+            "task": task,
+            "audio_hash": audio_hash,
+            "use_cache": use_cache,
+            "model_size": model_size,
+            "profile": profile
+        }
+        started = time.time()
+        decode_seconds = 0.0
+        if isinstance(audio, (bytes, bytearray)):
+            audio_hash = message["audio_hash"] = audio_hash or hash_audio(audio)
+            # The server keeps recently decoded uploads for all workers; only decode here on a miss
+            reply = self._call(message)
+            if reply.get("missing_audio"):
+                decode_started = time.time()
+                samples = decode_audio(audio)
+                decode_seconds = time.time() - decode_started
+                timer.add("decode", decode_seconds)
+                reply = self._call_shared(samples, dict(message, cache_audio=True))
+        else:
+            reply = self._call_shared(audio, message)
+
+        if not reply.get("ok"):
+            raise Exception(f"Transcription failed: {reply.get('error')}")
+        # Server-side stages, plus the shared-memory copy and socket round trips around them
+        server = reply.get("timings", {})
+        timer.update(server)
+        timer.add("ipc", time.time() - started - decode_seconds - server.get("total", 0) / 1000)
+        return reply["result"]
+
+    def get_cached_transcript(self, audio_hash, language=None, task="transcribe", model_size=None, profile=None):
+        """Look up a transcript in the server's cache by audio hash"""
+        reply = self._call({
+            "op": "cached",
+            "audio_hash": audio_hash,
+            "language": language,
+            "task": task,
+            "model_size": model_size,
+            "profile": profile
+        })
+        return reply["result"] if reply.get("ok") else None
+
+    def check_model(self, model_size):
+        """Raise ModelBudgetError if the server can never fit a requested model in its memory budget"""
+        if not model_size or model_size == self.model_size:
+            return
+        reply = self._call({"op": "check_model", "model_size": model_size})
+        if reply.get("ok") and not reply["fits"]:
+            raise ModelBudgetError(reply["error"])
+
+    def get_supported_languages(self):
+        """Get supported languages from the server"""
+        reply = self._call({"op": "languages"})
+        if not reply.get("ok"):
+            return ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh', 'ar', 'hi']
+        return reply["result"]
+
+    def detect_language(self, audio, top_k: int = 5, model_size=None):
+        """Identify the language of encoded bytes or samples in the inference server"""
+        if model_size and model_size not in self.allowed_models:
+            raise ValueError(f"Unsupported model size: {model_size}")
+        message = {
+            "op": "detect_language",
+            "top_k": top_k,
+            "model_size": model_size
+        }
+        if isinstance(audio, (bytes, bytearray)):
+            # Use the server's decoded copy of an earlier upload; otherwise decode only the first window
+            reply = self._call(dict(message, audio_hash=hash_audio(audio)))
+            if reply.get("missing_audio"):
+                reply = self._call_shared(decode_audio(audio, max_seconds=30), message)
+        else:
+            reply = self._call_shared(audio[:30 * 16000], message)
+        if not reply.get("ok"):
+            raise Exception(f"Language detection failed: {reply.get('error')}")
+        return reply["result"]
+
+    def get_rtf(self):
+        """Get measured real-time factors from the server"""
+        reply = self._call({"op": "rtf"})
+        return reply["result"] if reply.get("ok") else {}
+
+    def get_model_info(self):
+        """Get model info from the server"""
+        reply = self._call({"op": "model_info"})
+        if not reply.get("ok"):
+            return {"model_size": self.model_size, "device": self.device, "status": "not_loaded"}
+        info = reply["result"]
+        info["inference_server"] = self.address
+        return info
+
+
+class RemoteAdmissionController:
+    """AdmissionController interface backed by the inference server's ledger, shared by all HTTP workers"""
+
+    def __init__(self, remote_service: RemoteWhisperService):
+        self.remote_service = remote_service
+
+    def admit(self, model_size: str, audio_seconds: float, measured_rtf=None):
+        """Add a request to the shared ledger and return its cost, or raise BacklogFullError"""
+        # The server prices the request with its own real-time factors
+        reply = self.remote_service._call({"op": "admit", "model_size": model_size, "audio_seconds": audio_seconds})  # pylint: disable=protected-access
+        if not reply.get("ok"):
+            raise Exception(f"Admission failed: {reply.get('error')}")
+        if not reply["admitted"]:
+            raise BacklogFullError(reply["error"], reply["retry_after"], reply["backlog_seconds"])
+        return reply["cost"]
+
+    def release(self, cost: float):
+        """Remove a finished (or abandoned) request from the shared ledger"""
+        try:
+            self.remote_service._call({"op": "release", "cost": cost})  # pylint: disable=protected-access
+        except Exception as e:
+            logger.warning(f"Could not release {cost:.1f}s from the admission ledger: {str(e)}")
+
+    def estimate_wait_seconds(self) -> int:
+        """Seconds until the backlog admitted by all workers has drained"""
+        reply = self.remote_service._call({"op": "admission_wait"})  # pylint: disable=protected-access
+        return reply["result"] if reply.get("ok") else 1
+
+    def get_stats(self):
+        """Get the shared ledger and counters"""
+        try:
+            reply = self.remote_service._call({"op": "admission_stats"})  # pylint: disable=protected-access
+        except Exception as e:
+            return {"error": str(e)}
+        return dict(reply.get("result") or {}, shared=True)
+
+
+class RemoteJobRegistry:
+    """JobRegistry interface backed by the inference server, so any HTTP worker can answer a job poll"""
+
+    def __init__(self, remote_service: RemoteWhisperService):
+        self.remote_service = remote_service
+
+    def publish(self, record):
+        """Store a job snapshot in the shared registry"""
+        self.remote_service._call({"op": "job_publish", "record": record})  # pylint: disable=protected-access
+
+    def get(self, job_id: str, wait: float = 0):
+        """Get a job snapshot from the shared registry, waiting up to wait seconds for it to finish"""
+        reply = self.remote_service._call({"op": "job_get", "job_id": job_id, "wait": wait})  # pylint: disable=protected-access
+        if not reply.get("ok"):
+            raise Exception(f"Job lookup failed: {reply.get('error')}")
+        return reply["result"]
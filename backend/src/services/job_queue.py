@@ -0,0 +1,281 @@
+"""
+Bounded transcription job queue drained by a fixed-size worker pool
+"""
+import os
+import math
+import queue
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def default_worker_count():
+    """One worker per inference lane, or enough workers to fill a batch when micro-batching is on"""
+    workers = int(os.getenv('WHISPER_EXECUTOR_LANES', '1'))
+    if float(os.getenv('WHISPER_BATCH_WINDOW_MS', '0')) > 0:
+        workers = max(workers, int(os.getenv('WHISPER_BATCH_MAX_SIZE', '8')))
+    return workers
+
+
+class QueueFullError(Exception):
+    """Exception raised when the job queue cannot accept more work"""
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobRegistry:
+    """Snapshots of job state keyed by ID, so a job can be polled by any worker that shares the registry"""
+
+    def __init__(self, result_ttl: float = None):
+        self.result_ttl = result_ttl or float(os.getenv('TRANSCRIBE_JOB_TTL', '600'))
+        self._records = {}
+        self._changed = threading.Condition()
+
+    def publish(self, record):
+        """Store the latest to_dict() snapshot of a job and wake any long-polls on it"""
+        with self._changed:
+            self._purge_expired()
+            self._records[record["job_id"]] = record
+            self._changed.notify_all()
+
+    def get(self, job_id: str, wait: float = 0):
+        """Get a job snapshot, waiting up to wait seconds for it to finish; None if unknown or expired"""
+        deadline = time.time() + wait
+        with self._changed:
+            record = self._records.get(job_id)
+            while record is not None and record["status"] not in (JOB_COMPLETED, JOB_FAILED):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+                record = self._records.get(job_id)
+            return record
+
+    def _purge_expired(self):
+        """Forget finished jobs older than the result TTL (caller holds the lock)"""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, record in self._records.items()
+            if record["finished_at"] is not None and record["finished_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._records[job_id]
+
+
+class TranscriptionJob:
+    """A unit of work tracked by the job queue"""
+
+    def __init__(self, func, args=(), kwargs=None):
+        self.id = uuid.uuid4().hex
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.status = JOB_QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def is_finished(self):
+        """Check if the job has completed or failed"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes, returns True if it did"""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        """Serialize job state for API responses"""
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.status == JOB_COMPLETED:
+            data["result"] = self.result
+        elif self.status == JOB_FAILED:
+            data["error"] = self.error
+        return data
+
+
+class TranscriptionJobQueue:
+    """Fixed-size worker pool draining a bounded FIFO of transcription jobs"""
+
+    def __init__(self, num_workers: int = None, max_queue_size: int = None, result_ttl: float = None,
+                 registry=None):
+        # Default to enough workers to keep every lane (or a whole batch) busy
+        self.num_workers = max(1, num_workers or int(os.getenv('TRANSCRIBE_WORKERS', '0')) or default_worker_count())
+        self.max_queue_size = max(1, max_queue_size or int(os.getenv('TRANSCRIBE_QUEUE_SIZE', '16')))
+        self.result_ttl = result_ttl or float(os.getenv('TRANSCRIBE_JOB_TTL', '600'))
+
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._jobs = {}
+        self._jobs_lock = threading.Lock()
+        self._workers = []
+        self._started = False
+        self._running = 0
+        # Exponentially weighted average of job service time, used for Retry-After
+        self._avg_service_time = None
+        # Optional JobRegistry (or a proxy to a shared one) where other processes can poll these jobs
+        self.registry = registry
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._jobs_lock:
+            if self._started:
+                return
+            self._started = True
+
+        for index in range(self.num_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"transcribe-worker-{index}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+        logger.info(f"Job queue started with {self.num_workers} worker(s), queue size {self.max_queue_size}")
+
+    def submit(self, func, *args, **kwargs) -> TranscriptionJob:
+        """Enqueue a job, raises QueueFullError when the queue is at capacity"""
+        self.start()
+        self._purge_expired()
+
+        job = TranscriptionJob(func, args, kwargs)
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._jobs_lock:
+                self._jobs.pop(job.id, None)
+            retry_after = self.estimate_wait_seconds()
+            logger.warning(f"Job queue full ({self.max_queue_size}), rejecting job - retry after {retry_after}s")
+            raise QueueFullError("Transcription queue is full", retry_after=retry_after)
+
+        logger.info(f"Job {job.id} queued (depth: {self._queue.qsize()})")
+        self._publish(job)
+        return job
+
+    def add_completed(self, result) -> TranscriptionJob:
+        """Record a job that was answered without running, so it can be polled like any other"""
+        self._purge_expired()
+        job = TranscriptionJob(None)
+        job.status = JOB_COMPLETED
+        job.result = result
+        job.started_at = job.finished_at = job.created_at
+        job._done.set()
+        with self._jobs_lock:
+            self._jobs[job.id] = job
+        self._publish(job)
+        return job
+
+    def get(self, job_id: str):
+        """Look up a job by ID, returns None if unknown or expired"""
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def poll(self, job_id: str, wait: float = 0):
+        """Get a job's to_dict() state, waiting up to wait seconds for it to finish
+
+        Jobs submitted to this queue are answered locally; others are looked up in the shared
+        registry, since the poll may reach a different worker process than the submit did.
+        Returns None if the job is unknown or expired.
+        """
+        job = self.get(job_id)
+        if job is not None:
+            if wait > 0:
+                job.wait(wait)
+            return job.to_dict()
+        if self.registry is not None:
+            return self.registry.get(job_id, wait)
+        return None
+
+    def estimate_wait_seconds(self) -> int:
+        """Estimate how long until a newly submitted job would start"""
+        avg = self._avg_service_time or 5.0
+        pending = self._queue.qsize() + self._running
+        return max(1, math.ceil(avg * pending / self.num_workers))
+
+    def get_stats(self):
+        """Get queue statistics"""
+        return {
+            "workers": self.num_workers,
+            "queue_size": self.max_queue_size,
+            "queued": self._queue.qsize(),
+            "running": self._running,
+            "avg_service_time": round(self._avg_service_time, 3) if self._avg_service_time else None
+        }
+
+    def _worker_loop(self):
+        """Pull jobs off the queue and run them"""
+        while True:
+            job = self._queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            with self._jobs_lock:
+                self._running += 1
+            self._publish(job)
+            try:
+                job.result = job.func(*job.args, **job.kwargs)
+                job.status = JOB_COMPLETED
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {str(e)}")
+                job.error = str(e)
+                job.status = JOB_FAILED
+            finally:
+                job.finished_at = time.time()
+                with self._jobs_lock:
+                    self._running -= 1
+                    self._record_service_time(job.finished_at - job.started_at)
+                # Drop references to the payload so uploads can be freed
+                job.func = None
+                job.args = ()
+                job.kwargs = {}
+                self._publish(job)
+                job._done.set()
+                self._queue.task_done()
+                logger.info(f"Job {job.id} {job.status} in {job.finished_at - job.started_at:.2f}s")
+
+    def _publish(self, job):
+        """Copy a job's state to the registry, if there is one"""
+        if self.registry is None:
+            return
+        try:
+            self.registry.publish(job.to_dict())
+        except Exception as e:
+            logger.warning(f"Could not publish job {job.id}: {str(e)}")
+
+    def _record_service_time(self, elapsed: float):
+        """Update the moving average of job service time"""
+        if self._avg_service_time is None:
+            self._avg_service_time = elapsed
+        else:
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+
+    def _purge_expired(self):
+        """Forget finished jobs older than the result TTL"""
+        cutoff = time.time() - self.result_ttl
+        with self._jobs_lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
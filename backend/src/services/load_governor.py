@@ -0,0 +1,112 @@
+"""
+Load-adaptive model selection and admission control for synchronous transcription
+"""
+import os
+import math
+import threading
+import logging
+
+from services.model_registry import MODEL_MEMORY_MB
+
+logger = logging.getLogger(__name__)
+
+# Typical CPU processing seconds per audio second, used until a model has been measured
+DEFAULT_RTF = {
+    'tiny': 0.05, 'tiny.en': 0.05,
+    'base': 0.1, 'base.en': 0.1,
+    'small': 0.3, 'small.en': 0.3,
+    'medium': 0.9, 'medium.en': 0.9,
+    'large-v1': 2.0, 'large-v2': 2.0, 'large-v3': 2.0, 'large': 2.0,
+    'large-v3-turbo': 1.0, 'turbo': 1.0
+}
+
+
+class OverloadedError(Exception):
+    """Exception raised when no model can meet the latency objective"""
+
+    def __init__(self, message, retry_after, projected_seconds):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.projected_seconds = projected_seconds
+
+
+class RealTimeFactorTracker:
+    """Moving average of processing time per second of audio, per model size"""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._rtf = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_size: str, audio_seconds: float, processing_seconds: float):
+        """Add one measured transcription"""
+        if audio_seconds <= 0:
+            return
+        rtf = processing_seconds / audio_seconds
+        with self._lock:
+            previous = self._rtf.get(model_size)
+            self._rtf[model_size] = rtf if previous is None else (1 - self.alpha) * previous + self.alpha * rtf
+
+    def get_all(self):
+        """Get measured real-time factors keyed by model size"""
+        with self._lock:
+            return {size: round(rtf, 4) for size, rtf in self._rtf.items()}
+
+
+class LoadGovernor:
+    """Degrades to smaller models, then rejects, when projected latency exceeds the SLO"""
+
+    def __init__(self, wait_estimator, slo_seconds: float = None):
+        # Anything with estimate_wait_seconds(): the local job queue, or the shared admission ledger
+        self.wait_estimator = wait_estimator
+        self.slo_seconds = slo_seconds if slo_seconds is not None else float(os.getenv('TRANSCRIBE_SLO_SECONDS', '0'))
+        self.degraded = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """The governor is off unless an SLO is configured"""
+        return self.slo_seconds > 0
+
+    def choose_model(self, requested: str, audio_seconds: float, allowed_models, measured_rtf):
+        """Pick the largest model at or below the requested one that meets the SLO"""
+        if not self.enabled:
+            return requested
+
+        wait = self.wait_estimator.estimate_wait_seconds()
+        requested_mb = MODEL_MEMORY_MB.get(requested, 0)
+        candidates = [requested] + sorted(
+            (size for size in allowed_models if MODEL_MEMORY_MB.get(size, 0) < requested_mb),
+            key=lambda size: MODEL_MEMORY_MB.get(size, 0),
+            reverse=True
+        )
+
+        projected = None
+        for model_size in candidates:
+            rtf = measured_rtf.get(model_size, DEFAULT_RTF.get(model_size, 1.0))
+            projected = wait + audio_seconds * rtf
+            if projected <= self.slo_seconds:
+                if model_size != requested:
+                    with self._lock:
+                        self.degraded += 1
+                    logger.info(f"Load governor: projected {projected:.1f}s, degrading '{requested}' to '{model_size}'")
+                return model_size
+
+        with self._lock:
+            self.rejected += 1
+        retry_after = max(1, math.ceil(projected - self.slo_seconds))
+        logger.warning(f"Load governor: projected {projected:.1f}s exceeds SLO of {self.slo_seconds:.0f}s, rejecting")
+        raise OverloadedError(
+            f"Server overloaded: projected latency {projected:.0f}s exceeds {self.slo_seconds:.0f}s",
+            retry_after,
+            round(projected, 1)
+        )
+
+    def get_stats(self):
+        """Get governor counters"""
+        return {
+            "slo_seconds": self.slo_seconds if self.enabled else None,
+            "degraded": self.degraded,
+            "rejected": self.rejected
+        }
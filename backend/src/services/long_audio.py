@@ -0,0 +1,158 @@
+"""
+Parallel chunked transcription of long recordings across a process pool
+"""
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from services.vad import EnergyVAD
+from services.quantization import quantize_model
+from services.decoding_profiles import whisper_options
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Per-process model, loaded once by the pool initializer
+_worker_model = None
+
+
+def _init_worker(model_size: str, num_threads: int, quantize: str = None):
+    """Load a private Whisper model in each pool process"""
+    global _worker_model
+    import torch  # pylint: disable=import-outside-toplevel
+    import whisper  # pylint: disable=import-outside-toplevel
+
+    os.environ['CUDA_VISIBLE_DEVICES'] = ''
+    torch.set_num_threads(num_threads)
+    _worker_model = quantize_model(whisper.load_model(model_size, device="cpu"), quantize)
+
+
+def _transcribe_chunk(audio, language, task, profile="balanced"):
+    """Transcribe one chunk inside a pool process"""
+    options = {"task": task, "fp16": False}
+    options.update(whisper_options(profile))
+    if language:
+        options["language"] = language
+    result = _worker_model.transcribe(audio, **options)
+    return {
+        "language": result.get("language"),
+        "segments": [
+            {"start": s["start"], "end": s["end"], "text": s["text"].strip()}
+            for s in result.get("segments", [])
+        ]
+    }
+
+
+def plan_chunks(audio: np.ndarray, target_seconds: float, overlap_seconds: float = 1.0):
+    """Split audio into roughly target-length chunks, cutting in silence where possible
+
+    Returns (start, end, keep_from) sample tuples; keep_from marks where this chunk's
+    segments take over from the previous chunk when a forced cut had to overlap.
+    """
+    total = len(audio)
+    target = int(target_seconds * SAMPLE_RATE)
+    if total <= target:
+        return [(0, total, 0)]
+
+    # Candidate cut points are the middles of pauses between speech regions
+    regions = EnergyVAD(min_silence_ms=300, padding_ms=0).detect(audio)
+    pauses = [(end + next_start) // 2 for (_, end), (next_start, _) in zip(regions, regions[1:])]
+
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    search = target // 4
+    chunks = []
+    start = 0
+    keep_from = 0
+    while total - start > target + search:
+        ideal = start + target
+        candidates = [p for p in pauses if ideal - search <= p <= ideal + search]
+        if candidates:
+            cut = min(candidates, key=lambda p: abs(p - ideal))
+            chunks.append((start, cut, keep_from))
+            start, keep_from = cut, cut
+        else:
+            # No pause nearby: overlap the neighbours and split the overlap down the middle
+            chunks.append((start, ideal + overlap, keep_from))
+            start, keep_from = ideal - overlap, ideal
+    chunks.append((start, total, keep_from))
+    return chunks
+
+
+def stitch_segments(chunks, chunk_results):
+    """Offset chunk segments onto the full timeline and drop duplicated edges"""
+    segments = []
+    for index, ((start, end, keep_from), result) in enumerate(zip(chunks, chunk_results)):
+        offset = start / SAMPLE_RATE
+        keep_after = keep_from / SAMPLE_RATE
+        keep_before = chunks[index + 1][2] / SAMPLE_RATE if index + 1 < len(chunks) else None
+
+        for segment in result["segments"]:
+            seg_start = offset + segment["start"]
+            seg_end = offset + segment["end"]
+            midpoint = (seg_start + seg_end) / 2
+            # Inside an overlap, each side keeps only the segments centred on its half
+            if midpoint < keep_after or (keep_before is not None and midpoint >= keep_before):
+                continue
+            if segments and segments[-1]["text"] == segment["text"] and seg_start < segments[-1]["end"]:
+                continue
+            segments.append({
+                "start": round(seg_start, 2),
+                "end": round(seg_end, 2),
+                "text": segment["text"]
+            })
+    return segments
+
+
+class ParallelChunkTranscriber:
+    """Transcribes long audio by fanning silence-aligned chunks out to worker processes"""
+
+    def __init__(self, model_size: str, workers: int, chunk_seconds: float = None, quantize: str = None):
+        self.model_size = model_size
+        self.quantize = quantize
+        self.workers = max(1, workers)
+        self.chunk_seconds = chunk_seconds or float(os.getenv('WHISPER_CHUNK_SECONDS', '120'))
+        self.threads_per_worker = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool = None
+
+    def _get_pool(self):
+        """Start the pool on first use; each process loads its own model once"""
+        if self._pool is None:
+            logger.info(f"Starting {self.workers} chunk worker(s) with {self.threads_per_worker} thread(s) each")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_size, self.threads_per_worker, self.quantize)
+            )
+        return self._pool
+
+    def transcribe(self, audio: np.ndarray, language, task, profile="balanced"):
+        """Transcribe chunks in parallel and stitch them back in order"""
+        chunks = plan_chunks(audio, self.chunk_seconds)
+        logger.info(f"Split {len(audio) / SAMPLE_RATE:.0f}s of audio into {len(chunks)} chunk(s)")
+
+        pool = self._get_pool()
+        futures = [
+            pool.submit(_transcribe_chunk, audio[start:end], language, task, profile)
+            for start, end, _ in chunks
+        ]
+        results = [future.result() for future in futures]
+
+        segments = stitch_segments(chunks, results)
+        return {
+            "text": " ".join(s["text"] for s in segments),
+            "language": language or results[0]["language"],
+            "segments": segments
+        }
+
+    def get_stats(self):
+        """Get long-audio configuration"""
+        return {
+            "workers": self.workers,
+            "chunk_seconds": self.chunk_seconds,
+            "threads_per_worker": self.threads_per_worker
+        }
@@ -0,0 +1,146 @@
+"""
+Registry of resident Whisper models with a memory budget and LRU eviction
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Approximate resident size of fp32 checkpoints, used before a model is loaded
+MODEL_MEMORY_MB = {
+    'tiny': 150, 'tiny.en': 150,
+    'base': 290, 'base.en': 290,
+    'small': 970, 'small.en': 970,
+    'medium': 3000, 'medium.en': 3000,
+    'large-v1': 6200, 'large-v2': 6200, 'large-v3': 6200, 'large': 6200,
+    'large-v3-turbo': 3300, 'turbo': 3300
+}
+
+
+def allowed_model_sizes(default_size: str = None):
+    """Model sizes that requests may ask for (WHISPER_ALLOWED_MODELS)"""
+    sizes = [s.strip() for s in os.getenv('WHISPER_ALLOWED_MODELS', 'tiny,base,small,medium').split(',') if s.strip()]
+    default_size = default_size or os.getenv('WHISPER_MODEL_SIZE', 'small')
+    if default_size not in sizes:
+        sizes.append(default_size)
+    return sizes
+
+
+class ModelBudgetError(Exception):
+    """Exception raised when a model cannot fit in the memory budget even with every other model evicted"""
+
+
+class ModelRegistry:
+    """Loads engines on demand and keeps them resident within a RAM budget"""
+
+    def __init__(self, engine_factory, default_size: str, budget_mb: float = None, estimate_mb=None):
+        self.engine_factory = engine_factory
+        self.default_size = default_size
+        self.budget_mb = budget_mb if budget_mb is not None else float(os.getenv('WHISPER_MODEL_MEMORY_MB', '4096'))
+        # Expected resident size of a model that is not loaded yet
+        self.estimate_mb = estimate_mb or (lambda model_size: MODEL_MEMORY_MB.get(model_size, 0))
+
+        self._engines = OrderedDict()
+        self._memory_mb = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def register(self, model_size: str, engine):
+        """Add an already loaded engine"""
+        with self._lock:
+            self._engines[model_size] = engine
+            self._memory_mb[model_size] = engine.memory_mb() or MODEL_MEMORY_MB.get(model_size, 0)
+            self._engines.move_to_end(model_size)
+
+    def check_fits(self, model_size: str):
+        """Raise ModelBudgetError if a model could not be loaded even after evicting everything evictable"""
+        with self._lock:
+            if self.budget_mb <= 0 or model_size in self._engines:
+                return
+            self._check_fits(model_size, self.estimate_mb(model_size))
+
+    def _check_fits(self, model_size: str, needed_mb: float):
+        """check_fits for a known size (caller holds the lock)"""
+        # The default model is never evicted, so it always shares the budget
+        pinned_mb = self._memory_mb.get(self.default_size, 0) if model_size != self.default_size else 0
+        if pinned_mb + needed_mb > self.budget_mb:
+            raise ModelBudgetError(
+                f"Model '{model_size}' needs about {needed_mb:.0f} MB, which does not fit in the "
+                f"{self.budget_mb:.0f} MB model budget next to the default model ({pinned_mb:.0f} MB)"
+            )
+
+    def get(self, model_size: str):
+        """Return the engine for a model size, loading it (and evicting others) if needed"""
+        with self._lock:
+            engine = self._engines.get(model_size)
+            if engine is not None:
+                self._engines.move_to_end(model_size)
+                return engine
+            load_lock = self._load_locks.setdefault(model_size, threading.Lock())
+
+        # Concurrent requests for the same model wait for a single load
+        with load_lock:
+            with self._lock:
+                engine = self._engines.get(model_size)
+                if engine is not None:
+                    self._engines.move_to_end(model_size)
+                    return engine
+                if self.budget_mb > 0:
+                    # Refuse rather than overcommit: a model that cannot fit is never loaded
+                    self._check_fits(model_size, self.estimate_mb(model_size))
+                self._make_room(self.estimate_mb(model_size))
+
+            logger.info(f"Loading Whisper model '{model_size}' on demand")
+            started = time.time()
+            engine = self.engine_factory(model_size)
+            engine.load()
+            logger.info(f"Loaded '{model_size}' in {time.time() - started:.1f}s")
+
+            with self._lock:
+                self.loads += 1
+                memory_mb = engine.memory_mb() or self.estimate_mb(model_size)
+                if self.budget_mb > 0:
+                    try:
+                        # The real size is known now and may be larger than the estimate
+                        self._check_fits(model_size, memory_mb)
+                    except ModelBudgetError:
+                        logger.warning(f"Model '{model_size}' is {memory_mb:.0f} MB once loaded, unloading it")
+                        engine.close()
+                        raise
+                self._engines[model_size] = engine
+                self._memory_mb[model_size] = memory_mb
+                # Trim again in case the estimate was low
+                self._make_room(0, keep=model_size)
+            return engine
+
+    def _make_room(self, needed_mb: float, keep: str = None):
+        """Evict least recently used models until the budget fits (caller holds the lock)"""
+        if self.budget_mb <= 0:
+            return
+        for model_size in list(self._engines):
+            if sum(self._memory_mb.values()) + needed_mb <= self.budget_mb:
+                break
+            # The default model backs readiness and is never evicted
+            if model_size in (self.default_size, keep):
+                continue
+            # Requests already running on the engine keep their reference until they finish
+            self._engines.pop(model_size).close()
+            freed = self._memory_mb.pop(model_size)
+            self.evictions += 1
+            logger.info(f"Evicted Whisper model '{model_size}' ({freed:.0f} MB) to stay within {self.budget_mb:.0f} MB")
+
+    def get_stats(self):
+        """Get resident models and budget usage"""
+        with self._lock:
+            return {
+                "loaded": list(self._engines),
+                "memory_mb": round(sum(self._memory_mb.values())),
+                "budget_mb": self.budget_mb,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
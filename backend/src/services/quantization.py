@@ -0,0 +1,40 @@
+"""
+Dynamic INT8 quantization of Whisper for CPU inference
+"""
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_MODES = ('int8',)
+
+
+def get_quantize_mode(mode: str = None):
+    """Read the quantization mode from WHISPER_QUANTIZE, returning None when off"""
+    mode = (mode if mode is not None else os.getenv('WHISPER_QUANTIZE', 'off')).lower()
+    if mode in ('', 'off', 'none', 'false', 'fp32'):
+        return None
+    if mode not in SUPPORTED_MODES:
+        logger.warning(f"Unknown quantization mode '{mode}', using fp32 weights")
+        return None
+    return mode
+
+
+def quantize_model(model, mode: str):
+    """Replace the model's linear layers with dynamically quantized INT8 versions"""
+    if mode is None:
+        return model
+
+    import torch  # pylint: disable=import-outside-toplevel
+    from torch import nn  # pylint: disable=import-outside-toplevel
+
+    # Whisper wraps nn.Linear in a subclass that casts weights to the input dtype;
+    # on CPU everything is fp32, so reverting to the base class is safe and lets
+    # the quantizer recognise the layers
+    for module in model.modules():
+        if isinstance(module, nn.Linear) and type(module) is not nn.Linear:
+            module.__class__ = nn.Linear
+
+    quantized = torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+    logger.info(f"Applied dynamic {mode} quantization to linear layers")
+    return quantized
@@ -0,0 +1,263 @@
+"""
+Incremental streaming transcription over a sliding Whisper window
+"""
+import os
+import queue
+import subprocess
+import threading
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Whisper only ever sees 30 seconds at a time
+MAX_WINDOW_SECONDS = 30.0
+
+
+class StreamingDecoder:
+    """Turns incoming audio chunks into 16 kHz mono float32 samples"""
+
+    def __init__(self, audio_format: str = "pcm16", sample_rate: int = SAMPLE_RATE):
+        self.audio_format = audio_format
+        self.sample_rate = sample_rate
+        self._ffmpeg = None
+        self._decoded = None
+        self._remainder = b""
+
+        if audio_format not in ("pcm16", "float32"):
+            # Compressed containers (webm/ogg Opus) go through a long-lived ffmpeg pipe
+            self._decoded = queue.Queue()
+            self._ffmpeg = subprocess.Popen(
+                [
+                    "ffmpeg", "-nostdin", "-loglevel", "error",
+                    # Start decoding from the first bytes instead of probing ahead for stream info
+                    "-fflags", "nobuffer", "-probesize", "32", "-analyzeduration", "0",
+                    "-i", "pipe:0",
+                    "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+                    "pipe:1"
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            threading.Thread(target=self._read_ffmpeg, name="stream-ffmpeg", daemon=True).start()
+
+    def _read_ffmpeg(self):
+        """Collect PCM produced by ffmpeg as it becomes available"""
+        while True:
+            data = self._ffmpeg.stdout.read1(65536)
+            if not data:
+                self._decoded.put(None)
+                break
+            self._decoded.put(data)
+
+    def feed(self, chunk: bytes) -> np.ndarray:
+        """Decode a chunk, returning whatever samples are ready"""
+        if self._ffmpeg is None:
+            if self.audio_format == "pcm16":
+                samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+            else:
+                samples = np.frombuffer(chunk, dtype=np.float32)
+            return self._resample(samples)
+
+        self._ffmpeg.stdin.write(chunk)
+        self._ffmpeg.stdin.flush()
+        return self._drain()
+
+    def close(self) -> np.ndarray:
+        """Flush the decoder and return any remaining samples"""
+        if self._ffmpeg is None:
+            return np.zeros(0, dtype=np.float32)
+
+        self._ffmpeg.stdin.close()
+        self._ffmpeg.wait(timeout=10)
+        return self._drain(until_eof=True)
+
+    def terminate(self):
+        """Kill the ffmpeg pipe of an aborted stream so its process and reader thread exit"""
+        if self._ffmpeg is None or self._ffmpeg.poll() is not None:
+            return
+        self._ffmpeg.kill()
+        self._ffmpeg.wait()
+        for pipe in (self._ffmpeg.stdin, self._ffmpeg.stdout):
+            try:
+                pipe.close()
+            except (OSError, ValueError):
+                pass
+
+    def _drain(self, until_eof: bool = False) -> np.ndarray:
+        """Pull decoded PCM off the reader queue"""
+        parts = []
+        while True:
+            try:
+                data = self._decoded.get(block=until_eof, timeout=5 if until_eof else None)
+            except queue.Empty:
+                break
+            if data is None:
+                break
+            parts.append(data)
+
+        pcm = self._remainder + b"".join(parts)
+        # Keep the byte stream aligned to whole int16 samples
+        split = len(pcm) - len(pcm) % 2
+        pcm, self._remainder = pcm[:split], pcm[split:]
+        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def _resample(self, samples: np.ndarray) -> np.ndarray:
+        """Linearly resample raw PCM to 16 kHz"""
+        if self.sample_rate == SAMPLE_RATE or len(samples) == 0:
+            return samples
+        duration = len(samples) / self.sample_rate
+        target = np.arange(0, duration, 1.0 / SAMPLE_RATE)
+        source = np.arange(len(samples)) / self.sample_rate
+        return np.interp(target, source, samples).astype(np.float32)
+
+
+class StreamLimitError(Exception):
+    """Exception raised when every streaming slot is taken"""
+
+
+class StreamSlots:
+    """Caps concurrent streams, which re-run the model every step outside the job queue"""
+
+    def __init__(self, max_streams: int = None):
+        self.max_streams = max_streams if max_streams is not None else int(os.getenv('STREAM_MAX_CONCURRENT', '2'))
+        self.active = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a slot, raises StreamLimitError when all are in use"""
+        with self._lock:
+            if self.active >= self.max_streams:
+                self.rejected += 1
+                raise StreamLimitError(f"Too many concurrent streams ({self.max_streams})")
+            self.active += 1
+
+    def release(self):
+        """Return a slot"""
+        with self._lock:
+            self.active -= 1
+
+    def get_stats(self):
+        """Get slot usage"""
+        return {
+            "max_streams": self.max_streams,
+            "active": self.active,
+            "rejected": self.rejected
+        }
+
+
+class StreamingTranscriber:
+    """Re-transcribes a sliding window of uncommitted audio and emits partial and final segments"""
+
+    def __init__(self, whisper_service, language=None, task="transcribe",
+                 step_seconds: float = None, commit_seconds: float = None):
+        self.whisper_service = whisper_service
+        self.language = language
+        self.task = task
+        # How much new audio to wait for before re-running the window
+        self.step_seconds = step_seconds or float(os.getenv('STREAM_STEP_SECONDS', '1.0'))
+        # Segments ending this far before the window edge are considered stable
+        self.commit_seconds = commit_seconds or float(os.getenv('STREAM_COMMIT_SECONDS', '2.0'))
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._offset = 0.0
+        self._pending_samples = 0
+
+    def add_audio(self, samples: np.ndarray):
+        """Append samples, returning any events produced by re-running the window"""
+        if len(samples) == 0:
+            return []
+
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._pending_samples += len(samples)
+
+        if self._pending_samples < self.step_seconds * SAMPLE_RATE:
+            return []
+
+        self._pending_samples = 0
+        events = self._process(final=False)
+        # A large chunk (or an ffmpeg drain) can leave more than a full window buffered
+        while len(self._buffer) >= MAX_WINDOW_SECONDS * SAMPLE_RATE:
+            offset = self._offset
+            events += self._process(final=False)
+            if self._offset == offset:
+                break
+        return events
+
+    def finish(self):
+        """Finalize everything left in the buffer, one window at a time"""
+        events = []
+        while len(self._buffer) > 0:
+            events += self._process(final=True)
+        return events
+
+    def _process(self, final: bool):
+        """Transcribe the current window and split it into committed and tentative text"""
+        # Only the first 30 seconds are transcribed, so everything below is relative to that slice
+        window = self._buffer[:int(MAX_WINDOW_SECONDS * SAMPLE_RATE)]
+        window_seconds = len(window) / SAMPLE_RATE
+        result = self.whisper_service.transcribe_audio(
+            window,
+            self.language,
+            self.task,
+            use_cache=False
+        )
+        segments = [s for s in result.get("segments", []) if s["text"]]
+
+        if self.language is None and result.get("language") and segments:
+            # Lock the detected language so later windows stay consistent
+            self.language = result["language"]
+
+        window_full = window_seconds >= MAX_WINDOW_SECONDS - self.step_seconds
+        if final or (window_full and len(segments) <= 1):
+            committed, tentative = segments, []
+        else:
+            stable_until = window_seconds - self.commit_seconds
+            committed = [s for s in segments[:-1] if s["end"] <= stable_until]
+            if window_full and not committed:
+                # The window cannot grow any further, so commit all but the last segment
+                committed = segments[:-1]
+            tentative = segments[len(committed):]
+
+        events = []
+        if committed:
+            events.append({
+                "type": "final",
+                "language": result.get("language"),
+                "segments": [self._shift(s) for s in committed]
+            })
+        if tentative:
+            events.append({
+                "type": "partial",
+                "text": " ".join(s["text"] for s in tentative),
+                "start": round(self._offset + tentative[0]["start"], 2),
+                "end": round(self._offset + window_seconds, 2)
+            })
+
+        if committed and tentative:
+            # Keep the tentative tail in the window so it can be revised next time
+            self._trim(committed[-1]["end"])
+        elif committed or window_full or final:
+            # Everything the model saw is settled; a full window with nothing recognisable
+            # is dropped rather than left to grow forever
+            self._trim(window_seconds)
+
+        return events
+
+    def _shift(self, segment):
+        """Map a window-relative segment onto the stream timeline"""
+        return {
+            "start": round(self._offset + segment["start"], 2),
+            "end": round(self._offset + segment["end"], 2),
+            "text": segment["text"]
+        }
+
+    def _trim(self, seconds: float):
+        """Drop committed audio from the front of the window"""
+        samples = min(int(seconds * SAMPLE_RATE), len(self._buffer))
+        self._buffer = self._buffer[samples:]
+        self._offset += samples / SAMPLE_RATE
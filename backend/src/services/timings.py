@@ -0,0 +1,93 @@
+"""
+Per-request stage timings for Server-Timing headers and structured logs
+"""
+import time
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+
+# Timer of the request the current thread is working on, so model hooks can report into it
+_active = threading.local()
+
+
+class StageTimer:
+    """Accumulates wall-clock time per named stage of one request"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._stages = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as one stage"""
+        started = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, time.time() - started)
+
+    def add(self, name: str, seconds: float):
+        """Add seconds to a stage, creating it on first use"""
+        with self._lock:
+            self._stages[name] = self._stages.get(name, 0.0) + seconds
+
+    def get(self, name: str) -> float:
+        """Seconds recorded for a stage so far"""
+        with self._lock:
+            return self._stages.get(name, 0.0)
+
+    def update(self, stages_ms):
+        """Merge stages reported in milliseconds by another process"""
+        for name, ms in stages_ms.items():
+            if name != "total":
+                self.add(name, ms / 1000)
+
+    def to_dict(self):
+        """Stage durations in milliseconds, plus the total since the timer was created"""
+        with self._lock:
+            stages = {name: round(seconds * 1000, 1) for name, seconds in self._stages.items()}
+        stages["total"] = round((time.time() - self.started) * 1000, 1)
+        return stages
+
+    def to_header(self) -> str:
+        """Format the stages as a Server-Timing header value"""
+        return ", ".join(f"{name};dur={ms}" for name, ms in self.to_dict().items())
+
+
+@contextmanager
+def activate(timer):
+    """Make timer the current thread's timer for the enclosed block"""
+    previous = getattr(_active, "timer", None)
+    _active.timer = timer
+    try:
+        yield
+    finally:
+        _active.timer = previous
+
+
+def current():
+    """The current thread's timer, or None"""
+    return getattr(_active, "timer", None)
+
+
+def record(name: str, seconds: float):
+    """Add to a stage of the current thread's timer, if any"""
+    timer = getattr(_active, "timer", None)
+    if timer is not None:
+        timer.add(name, seconds)
+
+
+def time_encoder(model):
+    """Report a Whisper model's audio encoder passes as the 'encoder' stage"""
+    encode = model.encoder.forward
+
+    def forward(mel):
+        started = time.time()
+        try:
+            return encode(mel)
+        finally:
+            record("encoder", time.time() - started)
+
+    model.encoder.forward = forward
+    return model
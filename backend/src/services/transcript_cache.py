@@ -0,0 +1,156 @@
+"""
+Content-addressed transcript cache with an in-memory LRU tier and a size-bounded disk tier
+"""
+import os
+import copy
+import json
+import hashlib
+import tempfile
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def hash_audio(audio) -> str:
+    """SHA-256 of raw upload bytes or of a decoded sample array"""
+    data = audio if isinstance(audio, (bytes, bytearray, memoryview)) else audio.tobytes()
+    return hashlib.sha256(data).hexdigest()
+
+
+class TranscriptCache:
+    """Two-tier cache of transcription results keyed by audio hash and decoding options"""
+
+    def __init__(self, memory_entries: int = None, disk_dir: str = None, disk_max_bytes: int = None):
+        self.memory_entries = memory_entries if memory_entries is not None else int(os.getenv('TRANSCRIPT_CACHE_ENTRIES', '256'))
+        self.disk_dir = disk_dir if disk_dir is not None else os.getenv(
+            'TRANSCRIPT_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'whisper-transcripts')
+        )
+        self.disk_max_bytes = disk_max_bytes if disk_max_bytes is not None else int(os.getenv('TRANSCRIPT_CACHE_DISK_MB', '256')) * 1024 * 1024
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            except OSError as e:
+                logger.warning(f"Transcript disk cache disabled: {e}")
+                self.disk_dir = ''
+
+    @staticmethod
+    def make_key(audio_hash: str, *options) -> str:
+        """Combine the audio hash with everything that changes the transcript"""
+        return hashlib.sha256("|".join([audio_hash] + [str(o or '') for o in options]).encode()).hexdigest()
+
+    def get(self, key: str, record_miss: bool = True):
+        """Look up a result, promoting disk hits into memory"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(self._memory[key])
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                if record_miss:
+                    self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, result)
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result):
+        """Store a result in both tiers"""
+        with self._lock:
+            self._remember(key, copy.deepcopy(result))
+        self._write_disk(key, result)
+
+    def get_stats(self):
+        """Get hit/miss counters"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+            "memory_entries": len(self._memory),
+            "disk_bytes": self._disk_bytes if self.disk_dir else None
+        }
+
+    def _remember(self, key, result):
+        """Insert into the memory tier, evicting the least recently used entries"""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key):
+        """Read an entry from disk and mark it recently used"""
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, result):
+        """Atomically write an entry and keep the directory under its size budget"""
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(result, f)
+            path = self._path(key)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._disk_bytes += os.path.getsize(path) - previous
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            logger.warning(f"Failed to write transcript cache entry: {e}")
+
+    def _disk_entries(self):
+        """List (path, size, mtime) for cached files"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.disk_dir, name)
+                try:
+                    stat = os.stat(path)
+                    entries.append((path, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+        return entries
+
+    def _evict_disk(self):
+        """Remove least recently used files until under the size budget"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        self._disk_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._disk_bytes <= self.disk_max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+                self._disk_bytes -= size
+            except OSError:
+                continue
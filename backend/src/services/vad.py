@@ -0,0 +1,152 @@
+"""
+Voice activity detection used to skip silence before Whisper
+"""
+import os
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class EnergyVAD:
+    """Frame-energy detector with an adaptive noise floor"""
+
+    def __init__(self, frame_ms: float = 30, margin_db: float = None, min_speech_ms: float = 250,
+                 min_silence_ms: float = None, padding_ms: float = None):
+        self.frame = int(SAMPLE_RATE * frame_ms / 1000)
+        # How far above the estimated noise floor a frame must be to count as speech
+        self.margin_db = margin_db if margin_db is not None else float(os.getenv('WHISPER_VAD_MARGIN_DB', '12'))
+        self.min_speech = int(SAMPLE_RATE * min_speech_ms / 1000)
+        self.min_silence = int(SAMPLE_RATE * (min_silence_ms if min_silence_ms is not None
+                                              else float(os.getenv('WHISPER_VAD_MIN_SILENCE_MS', '600'))) / 1000)
+        self.padding = int(SAMPLE_RATE * (padding_ms if padding_ms is not None
+                                          else float(os.getenv('WHISPER_VAD_PADDING_MS', '200'))) / 1000)
+
+    def detect(self, audio: np.ndarray):
+        """Return (start, end) sample ranges that contain speech"""
+        frames = len(audio) // self.frame
+        if frames == 0:
+            return []
+
+        energy = np.square(audio[:frames * self.frame].reshape(frames, self.frame)).mean(axis=1)
+        db = 10.0 * np.log10(energy + 1e-10)
+
+        noise_floor = np.percentile(db, 10)
+        loud = np.percentile(db, 95)
+        # Speech rises and falls between syllables; a recording whose loud frames are barely
+        # above its floor is steady noise (or silence) and costs nothing to transcribe
+        if loud - noise_floor <= self.margin_db:
+            return []
+        # Recordings with hardly any pauses have a "floor" at speech level, so also
+        # cap the threshold below the loud frames; never treat very quiet hiss as speech
+        threshold = min(noise_floor + self.margin_db, loud - self.margin_db)
+        threshold = max(threshold, -55.0)
+        voiced = db > threshold
+
+        regions = []
+        start = None
+        for index, is_voiced in enumerate(voiced):
+            if is_voiced and start is None:
+                start = index
+            elif not is_voiced and start is not None:
+                regions.append((start * self.frame, index * self.frame))
+                start = None
+        if start is not None:
+            regions.append((start * self.frame, frames * self.frame))
+
+        return _finalize_regions(regions, len(audio), self.min_speech, self.min_silence, self.padding)
+
+
+class SileroVAD:
+    """Small CPU neural detector from the optional silero-vad package"""
+
+    def __init__(self, min_silence_ms: float = None, padding_ms: float = None):
+        from silero_vad import load_silero_vad  # pylint: disable=import-outside-toplevel
+
+        self.model = load_silero_vad()
+        self.min_silence_ms = min_silence_ms if min_silence_ms is not None else float(os.getenv('WHISPER_VAD_MIN_SILENCE_MS', '600'))
+        self.padding_ms = padding_ms if padding_ms is not None else float(os.getenv('WHISPER_VAD_PADDING_MS', '200'))
+
+    def detect(self, audio: np.ndarray):
+        """Return (start, end) sample ranges that contain speech"""
+        import torch  # pylint: disable=import-outside-toplevel
+        from silero_vad import get_speech_timestamps  # pylint: disable=import-outside-toplevel
+
+        timestamps = get_speech_timestamps(
+            torch.from_numpy(audio),
+            self.model,
+            sampling_rate=SAMPLE_RATE,
+            min_silence_duration_ms=int(self.min_silence_ms),
+            speech_pad_ms=int(self.padding_ms)
+        )
+        return [(t["start"], t["end"]) for t in timestamps]
+
+
+def create_vad(mode: str = None):
+    """Build the detector selected by WHISPER_VAD (off, energy or silero)"""
+    mode = (mode or os.getenv('WHISPER_VAD', 'off')).lower()
+    if mode in ('', 'off', 'none', 'false'):
+        return None
+    if mode == 'silero':
+        try:
+            return SileroVAD()
+        except ImportError:
+            logger.warning("silero-vad not installed, falling back to energy VAD")
+    elif mode != 'energy':
+        logger.warning(f"Unknown VAD mode '{mode}', using energy VAD")
+    return EnergyVAD()
+
+
+def _finalize_regions(regions, total, min_speech, min_silence, padding):
+    """Bridge short gaps, drop blips and pad region edges"""
+    merged = []
+    for start, end in regions:
+        if merged and start - merged[-1][1] < min_silence:
+            merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+
+    padded = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start, end = max(0, start - padding), min(total, end + padding)
+        if padded and start <= padded[-1][1]:
+            padded[-1] = (padded[-1][0], end)
+        else:
+            padded.append((start, end))
+    return padded
+
+
+def extract_speech(audio: np.ndarray, regions):
+    """Concatenate speech regions, returning the new audio and a timeline map"""
+    pieces = []
+    timeline = []
+    position = 0
+    for start, end in regions:
+        pieces.append(audio[start:end])
+        timeline.append((position / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE))
+        position += end - start
+    return np.concatenate(pieces), timeline
+
+
+def remap_time(t: float, timeline, is_start: bool = False) -> float:
+    """Map a time in the concatenated speech audio back onto the original recording"""
+    for speech_start, original_start, duration in timeline:
+        # A segment starting exactly on a join belongs to the next region
+        if t < speech_start + duration or (not is_start and t == speech_start + duration):
+            return original_start + max(0.0, t - speech_start)
+    speech_start, original_start, duration = timeline[-1]
+    return original_start + duration
+
+
+def remap_segments(segments, timeline):
+    """Shift segment timestamps from the concatenated speech back to the original timeline"""
+    return [
+        dict(segment, start=round(remap_time(segment["start"], timeline, is_start=True), 2),
+             end=round(remap_time(segment["end"], timeline), 2))
+        for segment in segments
+    ]
@@ -0,0 +1,284 @@
+"""
+Inference engines that run Whisper on decoded 16 kHz samples
+"""
+import os
+import time
+import logging
+import threading
+
+from services.batch_scheduler import WhisperBatchScheduler
+from services.quantization import quantize_model
+from services.model_registry import MODEL_MEMORY_MB
+from services.feature_cache import ArrayCache, cache_encoder
+from services.decoding_profiles import DECODING_PROFILES, whisper_options
+from services.timings import time_encoder
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+N_SAMPLES = 30 * SAMPLE_RATE
+
+
+class OpenAIWhisperEngine:
+    """Reference PyTorch implementation from the openai-whisper package"""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_size: str, quantize: str = None):
+        self.model_size = model_size
+        self.quantize = quantize
+        self.model = None
+        # Whisper installs per-call kv-cache hooks on the model, so concurrent
+        # transcribe() calls on one model instance must be serialized
+        self._inference_lock = threading.Lock()
+        # Micro-batching of short clips is off unless a collection window is set
+        self.batch_window_ms = float(os.getenv('WHISPER_BATCH_WINDOW_MS', '0'))
+        self._batch_scheduler = None
+        # Intra-op threads for the batcher thread; set by the service to match its lanes
+        self.num_threads = None
+        # Encoder outputs are reused when the same audio is decoded again with other options;
+        # replicas of the same model may share one cache
+        self.encoder_cache = ArrayCache(float(os.getenv('WHISPER_ENCODER_CACHE_MB', '128')))
+
+    def load(self):
+        """Load the model on CPU"""
+        import whisper  # pylint: disable=import-outside-toplevel
+
+        # Force CPU usage
+        os.environ['CUDA_VISIBLE_DEVICES'] = ''
+
+        self.model = quantize_model(whisper.load_model(self.model_size, device="cpu"), self.quantize)
+        if self.encoder_cache.enabled:
+            cache_encoder(self.model, self.encoder_cache)
+        time_encoder(self.model)
+
+        if self.batch_window_ms > 0:
+            self._batch_scheduler = WhisperBatchScheduler(
+                self.model,
+                self._inference_lock,
+                window_ms=self.batch_window_ms,
+                num_threads=self.num_threads
+            )
+
+    def is_loaded(self):
+        """Check if the model is loaded"""
+        return self.model is not None
+
+    def batches(self, audio):
+        """Whether transcribe() hands this clip to the micro-batcher"""
+        return self._batch_scheduler is not None and len(audio) <= N_SAMPLES
+
+    def transcribe(self, audio, language, task, profile="balanced"):
+        """Run Whisper on decoded samples"""
+        options = {"task": task, "fp16": False}
+        options.update(whisper_options(profile))
+        if language:
+            options["language"] = language
+
+        if self.batches(audio):
+            # Short clips share a batched forward pass with concurrent requests using the same profile
+            return self._batch_scheduler.transcribe(audio, language, task, profile)
+
+        with self._inference_lock:
+            return self.model.transcribe(audio, **options)
+
+    def detect_language(self, audio):
+        """Detect the spoken language from the first 30-second window"""
+        probs = self.language_probabilities(audio)
+        return max(probs, key=probs.get)
+
+    def language_probabilities(self, audio):
+        """One encoder pass plus the language-token head over the first 30-second window"""
+        import whisper  # pylint: disable=import-outside-toplevel
+
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio[:N_SAMPLES]),
+            n_mels=self.model.dims.n_mels
+        ).to(self.model.device)
+        with self._inference_lock:
+            _, probs = self.model.detect_language(mel)
+        return probs
+
+    def get_supported_languages(self):
+        """Get supported language codes"""
+        import whisper  # pylint: disable=import-outside-toplevel
+        return list(whisper.tokenizer.LANGUAGES.keys())
+
+    def close(self):
+        """Release background resources so an evicted model can be freed"""
+        if self._batch_scheduler is not None:
+            self._batch_scheduler.stop()
+
+    def memory_mb(self):
+        """Resident size of the weights, including packed INT8 layers"""
+        total = 0
+        for value in self.model.state_dict().values():
+            tensors = value if isinstance(value, tuple) else (value,)
+            total += sum(t.numel() * t.element_size() for t in tensors if hasattr(t, 'element_size'))
+        return total / (1024 * 1024)
+
+    def get_info(self):
+        """Get engine-specific details for model info"""
+        info = {}
+        if self.encoder_cache.enabled:
+            info["encoder_cache"] = self.encoder_cache.get_stats()
+        if self._batch_scheduler is not None:
+            info["batching"] = self._batch_scheduler.get_stats()
+        return info
+
+
+class FasterWhisperEngine:
+    """CTranslate2 runtime from the optional faster-whisper package"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str, quantize: str = None):
+        from faster_whisper import WhisperModel  # pylint: disable=import-outside-toplevel
+
+        self._model_class = WhisperModel
+        self.model_size = model_size
+        self.model = None
+        # CTranslate2 quantizes on load; follow WHISPER_QUANTIZE unless a type is given
+        self.compute_type = os.getenv('WHISPER_COMPUTE_TYPE', 'int8' if quantize == 'int8' else 'float32')
+        # Independent model workers, so concurrent calls need no lock
+        self.num_workers = int(os.getenv('WHISPER_ENGINE_WORKERS', '1'))
+        self.cpu_threads = int(os.getenv('WHISPER_ENGINE_THREADS', '0'))
+
+    def load(self):
+        """Load (and on first use download and convert) the model"""
+        self.model = self._model_class(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,
+            download_root=os.getenv('WHISPER_CACHE_DIR') or None
+        )
+
+    def is_loaded(self):
+        """Check if the model is loaded"""
+        return self.model is not None
+
+    def transcribe(self, audio, language, task, profile="balanced"):
+        """Run CTranslate2 Whisper on decoded samples"""
+        settings = DECODING_PROFILES[profile]
+        # faster-whisper defaults to beam search, so greedy profiles ask for a beam of 1
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            task=task,
+            beam_size=settings["beam_size"] or 1,
+            best_of=settings["best_of"] or 1,
+            temperature=settings["temperature"],
+            condition_on_previous_text=settings["condition_on_previous_text"]
+        )
+        segments = list(segments)
+        return {
+            "text": "".join(segment.text for segment in segments),
+            "language": info.language,
+            "segments": [
+                {"start": segment.start, "end": segment.end, "text": segment.text}
+                for segment in segments
+            ]
+        }
+
+    def detect_language(self, audio):
+        """Detect the spoken language from the first 30-second window"""
+        # Language detection runs eagerly; the lazy segment generator is never consumed
+        _, info = self.model.transcribe(audio[:N_SAMPLES])
+        return info.language
+
+    def language_probabilities(self, audio):
+        """Language probabilities from the first 30-second window"""
+        _, info = self.model.transcribe(audio[:N_SAMPLES])
+        if info.all_language_probs:
+            return dict(info.all_language_probs)
+        return {info.language: info.language_probability}
+
+    def get_supported_languages(self):
+        """Get supported language codes"""
+        return list(self.model.supported_languages)
+
+    def close(self):
+        """Nothing to release; the model is freed with the engine"""
+
+    def memory_mb(self):
+        """Approximate resident size; CTranslate2 does not expose it"""
+        estimate = MODEL_MEMORY_MB.get(self.model_size, 0)
+        # INT8 weights take roughly a third of the fp32 footprint
+        return estimate * 0.35 if 'int8' in self.compute_type else estimate
+
+    def get_info(self):
+        """Get engine-specific details for model info"""
+        return {
+            "compute_type": self.compute_type,
+            "engine_workers": self.num_workers
+        }
+
+
+class StubWhisperEngine:
+    """Weightless stand-in that sleeps in proportion to the audio, for benchmarking the serving path"""
+
+    name = "stub"
+
+    def __init__(self, model_size: str, quantize: str = None):
+        self.model_size = model_size
+        self.model = None
+        # Simulated processing seconds per second of audio
+        self.rtf = float(os.getenv('WHISPER_STUB_RTF', '0.05'))
+
+    def load(self):
+        """Nothing to load"""
+        self.model = self
+
+    def is_loaded(self):
+        """Check if the engine is loaded"""
+        return self.model is not None
+
+    def transcribe(self, audio, language, task, profile="balanced"):
+        """Sleep for the simulated processing time and return a fixed transcript"""
+        duration = len(audio) / SAMPLE_RATE
+        time.sleep(duration * self.rtf)
+        return {
+            "text": " stub transcript",
+            "language": language or "en",
+            "segments": [{"start": 0.0, "end": duration, "text": " stub transcript"}]
+        }
+
+    def detect_language(self, audio):
+        """Always English"""
+        return "en"
+
+    def language_probabilities(self, audio):
+        """Always English"""
+        return {"en": 1.0}
+
+    def get_supported_languages(self):
+        """Get supported language codes"""
+        return ["en"]
+
+    def close(self):
+        """Nothing to release"""
+
+    def memory_mb(self):
+        """The stub holds no weights"""
+        return 0
+
+    def get_info(self):
+        """Get engine-specific details for model info"""
+        return {"stub_rtf": self.rtf}
+
+
+def create_engine(model_size: str, quantize: str = None, name: str = None):
+    """Build the engine selected by WHISPER_ENGINE (openai-whisper, faster-whisper or stub)"""
+    name = (name or os.getenv('WHISPER_ENGINE', 'openai-whisper')).lower()
+    if name == 'stub':
+        return StubWhisperEngine(model_size, quantize)
+    if name in ('faster-whisper', 'faster_whisper', 'ctranslate2'):
+        try:
+            return FasterWhisperEngine(model_size, quantize)
+        except ImportError:
+            logger.warning("faster-whisper not installed, falling back to openai-whisper")
+    elif name not in ('openai-whisper', 'openai', 'pytorch'):
+        logger.warning(f"Unknown Whisper engine '{name}', using openai-whisper")
+    return OpenAIWhisperEngine(model_size, quantize)
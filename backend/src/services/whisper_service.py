@@ -2,7 +2,24 @@
 Simple Whisper service for voice-to-text transcription
 """
 import os
+import time
 import logging
+import threading
+
+import numpy as np
+
+from services.audio_decoder import decode_audio
+from services.vad import create_vad, extract_speech, remap_segments
+from services.long_audio import ParallelChunkTranscriber
+from services.transcript_cache import TranscriptCache, hash_audio
+from services.quantization import get_quantize_mode
+from services.whisper_engines import create_engine, OpenAIWhisperEngine
+from services.model_registry import ModelRegistry, MODEL_MEMORY_MB, allowed_model_sizes
+from services.load_governor import RealTimeFactorTracker
+from services.inference_executor import InferenceExecutor
+from services.feature_cache import create_audio_cache, decode_cached
+from services.decoding_profiles import DECODING_PROFILES, get_default_profile
+from services.timings import StageTimer, activate, current
 
 logger = logging.getLogger(__name__)
 
@@ -12,63 +29,230 @@ class SimpleWhisperService:
     
     def __init__(self, model_size: str = None):
         self.model_size = model_size or os.getenv('WHISPER_MODEL_SIZE', 'small')
-        self.model = None
         self.device = "cpu"
+        # Optional INT8 dynamic quantization of the linear layers (WHISPER_QUANTIZE=int8)
+        self.quantize = get_quantize_mode()
+        # Model calls run on lanes with fixed core shares; with replicas enabled each
+        # lane gets its own copy of the default model so lanes never wait on each other
+        self.executor = InferenceExecutor()
+        # Inference runtime selected by WHISPER_ENGINE
+        self.engine = self._create_engine(self.model_size)
+        self.use_replicas = os.getenv('WHISPER_MODEL_REPLICAS', 'false').lower() == 'true'
+        self.replicas = [self.engine]
+        # Other model sizes are loaded on demand and kept within a RAM budget
+        self.models = ModelRegistry(self._create_engine, self.model_size, estimate_mb=self._estimate_memory_mb)
+        self.allowed_models = allowed_model_sizes(self.model_size)
+        # Decoding preset for requests that do not choose one (WHISPER_DECODING_PROFILE)
+        self.default_profile = get_default_profile()
+        # Measured processing speed per model, used by the load governor
+        self.rtf = RealTimeFactorTracker()
         self.is_loading = False
+        self.load_error = None
+        self.load_seconds = None
+        # Set once the model is loaded and a warm-up inference has run
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._load_thread = None
+        # Optional voice activity detection so silent spans never reach the model
+        self.vad = create_vad()
+        # Recordings longer than this are split at pauses and transcribed by a process pool
+        self.long_audio_seconds = float(os.getenv('WHISPER_LONG_AUDIO_SECONDS', '600'))
+        chunk_workers = int(os.getenv('WHISPER_CHUNK_WORKERS', '0'))
+        if chunk_workers > 0 and not isinstance(self.engine, OpenAIWhisperEngine):
+            logger.warning("Parallel long-audio chunking requires the openai-whisper engine, disabling it")
+            chunk_workers = 0
+        self._long_audio = ParallelChunkTranscriber(self.model_size, chunk_workers, quantize=self.quantize) if chunk_workers > 0 else None
+        # Repeat submissions of the same audio are answered without running the model
+        self.cache = TranscriptCache() if os.getenv('TRANSCRIPT_CACHE', 'true').lower() == 'true' else None
+        # Re-runs with other options skip ffmpeg; the engine also reuses its encoder outputs
+        self.audio_cache = create_audio_cache()
+        self.start_loading()
+    
+    def _create_engine(self, model_size):
+        """Build an engine whose background threads use one lane's share of the cores"""
+        engine = create_engine(model_size, self.quantize)
+        if hasattr(engine, 'num_threads'):
+            engine.num_threads = self.executor.threads_per_lane
+        return engine
+    
+    def _estimate_memory_mb(self, model_size):
+        """Expected resident size of a model before it is loaded"""
+        estimate = MODEL_MEMORY_MB.get(model_size, 0)
+        # INT8 weights take roughly a third of the fp32 footprint
+        return estimate * 0.35 if self.quantize == 'int8' else estimate
+    
+    def check_model(self, model_size):
+        """Raise ModelBudgetError if a requested model can never fit in WHISPER_MODEL_MEMORY_MB"""
+        if model_size and model_size != self.model_size:
+            self.models.check_fits(model_size)
+    
+    def start_loading(self):
+        """Load and warm up the model on a background thread so callers never block on it"""
+        with self._load_lock:
+            if self._load_thread is not None:
+                logger.info("Model is already loading, skipping...")
+                return
+            self.is_loading = True
+            self._load_thread = threading.Thread(target=self._load_and_warm_up, name="whisper-loader", daemon=True)
+            self._load_thread.start()
+    
+    def _load_and_warm_up(self):
+        """Background loader: load the model, then run one warm-up inference"""
+        started = time.time()
         self._load_model()
+        if not self.engine.is_loaded():
+            return
+        self._warm_up()
+        self.load_seconds = round(time.time() - started, 2)
+        self._ready.set()
+        logger.info(f"Whisper service ready after {self.load_seconds}s")
     
     def _load_model(self):
         """Load the Whisper model"""
-        if self.is_loading:
-            logger.info("Model is already loading, skipping...")
-            return
-            
         self.is_loading = True
         try:
-            logger.info(f"Attempting to load Whisper model '{self.model_size}' on CPU")
-            
-            import whisper
+            logger.info(f"Attempting to load Whisper model '{self.model_size}' on CPU with {self.engine.name}")
             
-            # Force CPU usage
-            os.environ['CUDA_VISIBLE_DEVICES'] = ''
-            
-            self.model = whisper.load_model(self.model_size, device="cpu")
+            self.engine.load()
+            self.models.register(self.model_size, self.engine)
             logger.info(f"Whisper model '{self.model_size}' loaded successfully")
             
         except ImportError as e:
             logger.error(f"Whisper not installed: {str(e)}")
-            self.model = None
+            self.engine.model = None
+            self.load_error = str(e)
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {str(e)}")
-            self.model = None
+            self.engine.model = None
+            self.load_error = str(e)
         finally:
             self.is_loading = False
+        
+        if self.use_replicas and self.engine.is_loaded():
+            self._load_replicas()
+    
+    def _load_replicas(self):
+        """Load one copy of the default model per extra lane, falling back to the shared model"""
+        try:
+            for _ in range(self.executor.lanes - 1):
+                replica = self._create_engine(self.model_size)
+                if hasattr(replica, 'encoder_cache'):
+                    replica.encoder_cache = self.engine.encoder_cache
+                replica.load()
+                self.replicas.append(replica)
+            logger.info(f"Loaded {len(self.replicas)} replica(s) of '{self.model_size}'")
+        except Exception as e:
+            logger.error(f"Failed to load model replicas, lanes will share one model: {str(e)}")
+            for replica in self.replicas[1:]:
+                replica.close()
+            self.replicas = [self.engine]
+    
+    def _warm_up(self):
+        """Run a short inference so the first real request does not pay one-time setup costs"""
+        if os.getenv('WHISPER_WARMUP', 'true').lower() != 'true':
+            return
+        try:
+            logger.info("Running warm-up inference...")
+            audio = (np.random.default_rng(0).standard_normal(16000) * 0.01).astype(np.float32)
+            for replica in self.replicas:
+                replica.transcribe(audio, "en", "transcribe", self.default_profile)
+        except Exception as e:
+            logger.warning(f"Warm-up inference failed: {str(e)}")
     
     def is_model_loaded(self):
         """Check if model is loaded"""
-        return self.model is not None and not self.is_loading
+        return self.engine.is_loaded() and not self.is_loading
+    
+    def is_ready(self):
+        """Check if the model is loaded and warmed up"""
+        return self._ready.is_set()
+    
+    def wait_until_ready(self, timeout: float = None):
+        """Block until the model is ready, returning False on timeout"""
+        return self._ready.wait(timeout)
+    
+    def get_status(self):
+        """Get the lifecycle state: loading, warming_up, ready, failed or not_loaded"""
+        if self.is_ready():
+            return "ready"
+        if self.is_model_loaded():
+            return "warming_up"
+        if self.is_loading:
+            return "loading"
+        return "failed" if self.load_error else "not_loaded"
     
-    def transcribe_audio(self, audio_path, language=None, task="transcribe"):
-        """Transcribe audio file"""
+    def transcribe_audio(self, audio, language=None, task="transcribe", audio_hash=None, use_cache=True,
+                         model_size=None, profile=None, timer=None):
+        """Transcribe an audio file path, encoded audio bytes or an array of 16 kHz float32 samples"""
         if not self.is_model_loaded():
             raise Exception("Whisper model is not loaded")
+        timer = timer if timer is not None else StageTimer()
+        
+        model_size = model_size or self.model_size
+        if model_size not in self.allowed_models:
+            raise ValueError(f"Unsupported model size: {model_size}")
+        profile = profile or self.default_profile
+        if profile not in DECODING_PROFILES:
+            raise ValueError(f"Unsupported decoding profile: {profile}")
+        
+        if isinstance(audio, str):
+            if not os.path.exists(audio):
+                raise Exception(f"Audio file not found: {audio}")
+            with open(audio, 'rb') as f:
+                audio = f.read()
         
-        if not os.path.exists(audio_path):
-            raise Exception(f"Audio file not found: {audio_path}")
+        cache_key = None
+        if use_cache and self.cache is not None:
+            with timer.stage("cache"):
+                cache_key = self._cache_key(audio_hash or hash_audio(audio), language, task, model_size, profile)
+                cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {cache_key[:12]}")
+                return cached
+        
+        if isinstance(audio, (bytes, bytearray)):
+            with timer.stage("decode"):
+                audio = decode_cached(self.audio_cache, audio, audio_hash)
         
         try:
-            logger.info(f"Transcribing audio file: {audio_path}")
+            duration = len(audio) / 16000
+            logger.info(f"Transcribing {duration:.1f}s of audio")
+            
+            engine = self.engine if model_size == self.model_size else self.models.get(model_size)
+            started = time.time()
             
-            options = {"task": task, "fp16": False}
-            if language:
-                options["language"] = language
+            timeline = None
+            if self.vad is not None:
+                with timer.stage("vad"):
+                    regions = self.vad.detect(audio)
+                speech_samples = sum(end - start for start, end in regions)
+                logger.info(f"VAD kept {speech_samples / 16000:.1f}s of speech in {len(regions)} region(s)")
+                if not regions:
+                    return {
+                        "text": "",
+                        "language": language or "unknown",
+                        "model_size": model_size,
+                        "profile": profile,
+                        "inference_ms": 0,
+                        "segments": []
+                    }
+                audio, timeline = extract_speech(audio, regions)
             
-            result = self.model.transcribe(audio_path, **options)
+            inference_started = time.time()
+            with activate(timer):
+                result = self._run_model(engine, audio, language, task, profile)
+            finished = time.time()
+            # Encoder passes report themselves; the rest is mel computation and the decoder loop
+            timer.add("decoder", finished - inference_started - timer.get("encoder"))
+            # Measured against the full upload so admission can price whole files
+            self.rtf.record(model_size, duration, finished - started)
             
             response = {
                 "text": result["text"].strip(),
                 "language": result.get("language", "unknown"),
-                "model_size": self.model_size,
+                "model_size": model_size,
+                "profile": profile,
+                "inference_ms": round((finished - inference_started) * 1000),
                 "segments": []
             }
             
@@ -81,31 +265,126 @@ class SimpleWhisperService:
                     }
                     for segment in result["segments"]
                 ]
+                if timeline is not None:
+                    response["segments"] = remap_segments(response["segments"], timeline)
             
             logger.info(f"Transcription completed. Language: {response['language']}")
+            if cache_key is not None:
+                self.cache.put(cache_key, response)
             return response
             
         except Exception as e:
             logger.error(f"Transcription failed: {str(e)}")
             raise Exception(f"Transcription failed: {str(e)}")
     
+    def _cache_key(self, audio_hash, language, task, model_size, profile):
+        """Cache key covering the audio and every option that changes the transcript"""
+        vad = type(self.vad).__name__ if self.vad is not None else "off"
+        return TranscriptCache.make_key(audio_hash, self.engine.name, model_size, self.quantize, language, task, vad,
+                                        profile)
+    
+    def get_cached_transcript(self, audio_hash, language=None, task="transcribe", model_size=None, profile=None):
+        """Look up a cached transcript by audio hash without decoding anything"""
+        if self.cache is None:
+            return None
+        # A miss here is followed by transcribe_audio, which records it
+        key = self._cache_key(audio_hash, language, task, model_size or self.model_size, profile or self.default_profile)
+        return self.cache.get(key, record_miss=False)
+    
+    def _run_model(self, engine, audio, language, task, profile):
+        """Run an inference engine on decoded samples"""
+        # The chunk workers run copies of the default model only
+        if engine is self.engine and self._long_audio is not None and len(audio) >= self.long_audio_seconds * 16000:
+            # Detect once up front so every chunk decodes in the same language
+            language = language or self._on_lane(engine, "detect_language", audio)
+            return self._long_audio.transcribe(audio, language, task, profile)
+        
+        if hasattr(engine, 'batches') and engine.batches(audio):
+            # The batcher thread runs the forward pass; a caller holding a lane while it
+            # waits for its batch would stop other clips from ever joining that batch
+            return engine.transcribe(audio, language, task, profile)
+        
+        return self._on_lane(engine, "transcribe", audio, language, task, profile)
+    
+    def _on_lane(self, engine, method, *args):
+        """Run an engine call on an inference lane, using that lane's replica of the default model"""
+        timer = current()
+        
+        def call(lane):
+            target = self.replicas[lane % len(self.replicas)] if engine is self.engine else engine
+            # Model hooks on the lane thread report into the caller's request timer
+            with activate(timer):
+                return getattr(target, method)(*args)
+        return self.executor.run(call)
+    
+    def detect_language(self, audio, top_k: int = 5, model_size=None):
+        """Identify the spoken language from the first 30 seconds of encoded bytes or samples"""
+        if not self.is_model_loaded():
+            raise Exception("Whisper model is not loaded")
+        
+        model_size = model_size or self.model_size
+        if model_size not in self.allowed_models:
+            raise ValueError(f"Unsupported model size: {model_size}")
+        
+        # Only the first window is ever looked at, so only that much is decoded
+        if isinstance(audio, (bytes, bytearray)):
+            decoded = self.audio_cache.get(hash_audio(audio)) if self.audio_cache.enabled else None
+            audio = decoded if decoded is not None else decode_audio(audio, max_seconds=30)
+        audio = audio[:30 * 16000]
+        
+        if self.vad is not None:
+            regions = self.vad.detect(audio)
+            if regions:
+                audio, _ = extract_speech(audio, regions)
+        
+        engine = self.engine if model_size == self.model_size else self.models.get(model_size)
+        probs = self._on_lane(engine, "language_probabilities", audio)
+        ranked = sorted(probs.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return {
+            "language": ranked[0][0],
+            "probabilities": [
+                {"language": language, "probability": round(float(probability), 4)}
+                for language, probability in ranked
+            ],
+            "model_size": model_size
+        }
+    
+    def get_rtf(self):
+        """Get measured real-time factors keyed by model size"""
+        return self.rtf.get_all()
+    
     def get_supported_languages(self):
         """Get supported languages"""
         if not self.is_model_loaded():
             return ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh', 'ar', 'hi']
         
         try:
-            import whisper
-            return list(whisper.tokenizer.LANGUAGES.keys())
+            return self.engine.get_supported_languages()
         except Exception:
             return ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'ja', 'ko', 'zh', 'ar', 'hi']
     
     def get_model_info(self):
         """Get model info"""
-        return {
+        info = {
             "model_size": self.model_size,
             "device": self.device,
+            "engine": self.engine.name,
+            "quantization": self.quantize or "off",
+            "decoding_profile": self.default_profile,
             "status": "loaded" if self.is_model_loaded() else ("loading" if self.is_loading else "not_loaded"),
+            "ready": self.is_ready(),
+            "load_seconds": self.load_seconds,
             "cuda_available": False,
             "mps_available": False
         }
+        info.update(self.engine.get_info())
+        info["executor"] = dict(self.executor.get_stats(), replicas=len(self.replicas))
+        info["models"] = dict(self.models.get_stats(), allowed=self.allowed_models, rtf=self.get_rtf())
+        info["vad"] = type(self.vad).__name__ if self.vad is not None else "off"
+        if self._long_audio is not None:
+            info["long_audio"] = dict(self._long_audio.get_stats(), threshold_seconds=self.long_audio_seconds)
+        if self.cache is not None:
+            info["transcript_cache"] = self.cache.get_stats()
+        if self.audio_cache.enabled:
+            info["audio_cache"] = self.audio_cache.get_stats()
+        return info
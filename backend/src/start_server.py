@@ -5,6 +5,7 @@ SSL-aware server startup script for Whisper backend
 import os
 import sys
 import ssl
+import secrets
 from pathlib import Path
 import logging
 
@@ -12,6 +13,7 @@ import logging
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
+from services.inference_server import start_inference_server_process, DEFAULT_SOCKET_PATH
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -83,10 +85,24 @@ def start_gunicorn_server():
     cert_path, key_path = check_ssl_certificates()
     enable_ssl = os.getenv('ENABLE_SSL', 'true').lower() == 'true'
     
+    workers = os.getenv('GUNICORN_WORKERS', '4')
+    use_inference_server = os.getenv('WHISPER_INFERENCE_SERVER', 'true').lower() == 'true'
+    
+    env = os.environ.copy()
+    inference_process = None
+    if use_inference_server:
+        # One process owns the model; workers reach it over a Unix socket
+        socket_path = os.getenv('WHISPER_INFERENCE_SOCKET', DEFAULT_SOCKET_PATH)
+        authkey = secrets.token_hex(16)
+        inference_process = start_inference_server_process(socket_path, authkey.encode())
+        env['WHISPER_INFERENCE_SOCKET'] = socket_path
+        env['WHISPER_INFERENCE_AUTHKEY'] = authkey
+        logger.info(f"🧠 Gunicorn workers will share the inference server at {socket_path}")
+    
     cmd = [
         'gunicorn',
         '--bind', '0.0.0.0:5000',
-        '--workers', '4',
+        '--workers', workers,
         '--worker-class', 'sync',
         '--timeout', '300',
         '--keep-alive', '10',
@@ -111,10 +127,14 @@ def start_gunicorn_server():
         logger.info("🌐 Starting Gunicorn with HTTP on port 5000")
     
     try:
-        subprocess.run(cmd, check=True)
+        subprocess.run(cmd, check=True, env=env)
     except subprocess.CalledProcessError as e:
         logger.error(f"Gunicorn failed to start: {e}")
         sys.exit(1)
+    finally:
+        if inference_process is not None:
+            inference_process.terminate()
+            inference_process.join(timeout=10)
 
 if __name__ == '__main__':
     use_gunicorn = os.getenv('USE_GUNICORN', 'false').lower() == 'true'
@@ -81,7 +81,10 @@ export class WhisperAPI {
     /**
      * Centralized request handler with better error handling
      */
-    async request(endpoint, options = {}) {
+    async request(endpoint, requestOptions = {}) {
+        // skipCache: always hit the network for GETs whose answer changes (job polls)
+        const { skipCache = false, ...options } = requestOptions;
+        
         if (!this._connectionTested) {
             const connected = await this.testConnection();
             if (!connected) {
@@ -94,7 +97,7 @@ export class WhisperAPI {
         const cacheKey = `${options.method || 'GET'}-${url}`;
         
         // Simple GET request caching for language lists
-        if (!options.method || options.method === 'GET') {
+        if (!skipCache && (!options.method || options.method === 'GET')) {
             if (this._cache.has(cacheKey)) {
                 return this._cache.get(cacheKey);
             }
@@ -136,7 +139,7 @@ export class WhisperAPI {
             const data = await response.json();
             
             // Cache successful GET requests
-            if (!options.method || options.method === 'GET') {
+            if (!skipCache && (!options.method || options.method === 'GET')) {
                 this._cache.set(cacheKey, data);
             }
             
@@ -181,7 +184,7 @@ export class WhisperAPI {
     }
 
     /**
-     * Transcribe audio file
+     * Transcribe audio file as a background job, long-polling until it finishes
      */
     async transcribeAudio(file, language = '', task = 'transcribe', targetLanguage = 'en') {
         console.log('🎤 Starting transcription:', {
@@ -207,10 +210,27 @@ export class WhisperAPI {
             formData.append('target_language', targetLanguage);
         }
 
-        return this.request('/transcribe', {
+        // Jobs free the server's request thread at once; the poll waits server-side instead
+        const submitted = await this.request('/jobs', {
             method: 'POST',
             body: formData
         });
+        
+        let job = submitted.job;
+        while (job.status !== 'completed' && job.status !== 'failed') {
+            const polled = await this.request(`/jobs/${job.job_id}?wait=30`, { skipCache: true });
+            job = polled.job;
+        }
+        
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Transcription failed');
+        }
+        
+        return {
+            success: true,
+            result: job.result,
+            filename: submitted.filename
+        };
     }
 
     /**
@@ -239,21 +259,28 @@ export class WhisperAPI {
     /**
      * Translate text using translation service
      */
-    async translateText(text, targetLanguage = 'en') {
+    async translateText(text, targetLanguage = 'en', sourceLanguage = '') {
         console.log('🌍 Starting text translation:', {
             textLength: text.length,
+            sourceLanguage: sourceLanguage || 'auto',
             targetLanguage: targetLanguage
         });
         
+        const body = {
+            text: text,
+            target_language: targetLanguage
+        };
+        // Offline engines cannot detect the source, so pass the language Whisper heard
+        if (sourceLanguage) {
+            body.source_language = sourceLanguage;
+        }
+        
         return this.request('/translate', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
             },
-            body: JSON.stringify({
-                text: text,
-                target_language: targetLanguage
-            })
+            body: JSON.stringify(body)
         });
     }
 }
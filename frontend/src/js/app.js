@@ -2,6 +2,7 @@ import LanguageSelect from './components/LanguageSelect.js';
 import { WhisperAPI } from './api.js';
 import AudioHandler from './audio.js';
 import TTSService from './services/TTSService.js';
+import StreamingService from './services/StreamingService.js';
 
 /**
  * Whisper Voice-to-Text Application
@@ -14,6 +15,7 @@ class WhisperApp {
         this.api = new WhisperAPI();
         this.audioHandler = new AudioHandler();
         this.ttsService = new TTSService();
+        this.streamingService = new StreamingService();
         
         // Application state
         this.state = {
@@ -21,7 +23,8 @@ class WhisperApp {
             isProcessing: false,
             currentTranscription: '',
             currentAudioId: null,
-            ttsAvailable: false
+            ttsAvailable: false,
+            isStreaming: false
         };
         
         // DOM elements cache
@@ -68,7 +71,7 @@ class WhisperApp {
             'modelInfo', 'taskInfo', 'copyBtn', 'downloadBtn', 'newBtn', 'statusText',
             'statusIndicator', 'ttsStatusText', 'ttsStatusIndicator',
             'errorModal', 'errorMessage', 'modalOk', 'ttsSection', 'ttsResults', 
-            'quickActions', 'speakTranscriptBtn'
+            'quickActions', 'speakTranscriptBtn', 'liveBtn'
         ];
 
         ids.forEach(id => {
@@ -164,6 +167,7 @@ class WhisperApp {
         this.elements.taskSelect?.addEventListener('change', () => this.handleTaskChange());
         this.elements.transcribeBtn?.addEventListener('click', () => this.startTranscription());
         this.elements.speakTranscriptBtn?.addEventListener('click', () => this.speakTranscript());
+        this.elements.liveBtn?.addEventListener('click', () => this.toggleLiveTranscription());
         console.log('Form controls setup.');
     }
 
@@ -367,7 +371,9 @@ class WhisperApp {
                 const transcribeResult = await this.api.transcribeAudio(this.state.currentFile, language, 'transcribe');
                 
                 this.updateProgress(50, 'Translating...');
-                const translateResult = await this.api.translateText(transcribeResult.result.text, targetLanguage);
+                const translateResult = await this.api.translateText(
+                    transcribeResult.result.text, targetLanguage, transcribeResult.result.language
+                );
                 
                 const result = {
                     ...transcribeResult.result,
@@ -399,6 +405,63 @@ class WhisperApp {
         }
     }
 
+    /**
+     * Live transcription from the microphone over the streaming endpoint
+     */
+    async toggleLiveTranscription() {
+        if (this.state.isStreaming) {
+            this.elements.liveBtn.disabled = true;
+            this.updateProgress(100, 'Finishing...');
+            this.streamingService.stop();
+            return;
+        }
+        if (this.state.isProcessing) return;
+
+        let finalText = '';
+        let language = this.elements.languageSelect?.value || '';
+        const render = (partial = '') => {
+            this.elements.resultText && (this.elements.resultText.textContent = [finalText, partial].filter(Boolean).join(' '));
+        };
+        const finish = () => {
+            this.state.isStreaming = false;
+            this.elements.liveBtn.disabled = false;
+            this.elements.liveBtn.textContent = '🎙️ Start live transcription';
+        };
+
+        this.streamingService.onPartial = (message) => render(message.text);
+        this.streamingService.onFinal = (segments, detected) => {
+            finalText = [finalText, ...segments.map(segment => segment.text)].filter(Boolean).join(' ');
+            language = detected || language;
+            render();
+        };
+        this.streamingService.onDone = () => {
+            finish();
+            this.showResults({ text: finalText, language: language || 'unknown', model_size: 'streaming', task: 'transcribe' });
+        };
+        this.streamingService.onError = (error) => {
+            this.streamingService.stop();
+            finish();
+            this.hideProgress();
+            this.showError(`Live transcription failed: ${error.message}`);
+        };
+
+        try {
+            this.state.isStreaming = true;
+            this.elements.liveBtn.textContent = '⏹️ Stop live transcription';
+            render();
+            this.elements.resultsSection && (this.elements.resultsSection.style.display = 'block');
+            this.showProgress();
+            this.updateProgress(0, 'Listening...');
+            await this.streamingService.start({ language, task: 'transcribe' });
+        } catch (error) {
+            console.error('Live transcription failed to start:', error);
+            this.streamingService.stop();
+            finish();
+            this.hideProgress();
+            this.showError(`Live transcription failed: ${error.message}`);
+        }
+    }
+
     /**
      * Progress management
      */
@@ -0,0 +1,135 @@
+/**
+ * Streaming transcription client
+ *
+ * Captures microphone audio, sends 16-bit PCM chunks to /api/v1/stream over a
+ * WebSocket while recording, and reports partial and finalized segments.
+ */
+class StreamingService {
+    constructor(baseUrl = null) {
+        const hostname = window.location.hostname;
+        if (baseUrl) {
+            this.baseUrl = baseUrl;
+        } else if (hostname === 'localhost' || hostname === '127.0.0.1') {
+            this.baseUrl = `ws://${hostname}:5000/api/v1/stream`;
+        } else {
+            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            this.baseUrl = `${protocol}//${window.location.host}/api/v1/stream`;
+        }
+
+        this.socket = null;
+        this.stream = null;
+        this.audioContext = null;
+        this.processor = null;
+        this.onPartial = null;
+        this.onFinal = null;
+        this.onDone = null;
+        this.onError = null;
+
+        console.log('StreamingService initialized with baseUrl:', this.baseUrl);
+    }
+
+    /**
+     * Start recording and streaming audio
+     */
+    async start({ language = '', task = 'transcribe' } = {}) {
+        this.stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+        this.audioContext = new AudioContext({ sampleRate: 16000 });
+
+        const params = new URLSearchParams({
+            format: 'pcm16',
+            sample_rate: String(this.audioContext.sampleRate),
+            task: task
+        });
+        if (language) {
+            params.append('language', language);
+        }
+
+        this.socket = new WebSocket(`${this.baseUrl}?${params.toString()}`);
+        this.socket.binaryType = 'arraybuffer';
+        this.socket.onmessage = (event) => this.handleMessage(event);
+        this.socket.onerror = (event) => {
+            console.error('Streaming socket error:', event);
+            if (this.onError) this.onError(new Error('Streaming connection failed'));
+        };
+
+        await new Promise((resolve, reject) => {
+            this.socket.onopen = resolve;
+            this.socket.onclose = () => reject(new Error('Streaming connection closed'));
+        });
+        this.socket.onclose = () => this.releaseAudio();
+
+        const source = this.audioContext.createMediaStreamSource(this.stream);
+        this.processor = this.audioContext.createScriptProcessor(4096, 1, 1);
+        this.processor.onaudioprocess = (event) => {
+            if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+                this.socket.send(this.toPCM16(event.inputBuffer.getChannelData(0)));
+            }
+        };
+        source.connect(this.processor);
+        this.processor.connect(this.audioContext.destination);
+
+        console.log('🎙️ Streaming transcription started');
+    }
+
+    /**
+     * Stop recording; the server finalizes the remaining audio and sends "done"
+     */
+    stop() {
+        this.releaseAudio();
+        if (this.socket && this.socket.readyState === WebSocket.OPEN) {
+            this.socket.send(JSON.stringify({ type: 'stop' }));
+        }
+    }
+
+    handleMessage(event) {
+        const message = JSON.parse(event.data);
+
+        switch (message.type) {
+            case 'partial':
+                if (this.onPartial) this.onPartial(message);
+                break;
+            case 'final':
+                if (this.onFinal) this.onFinal(message.segments, message.language);
+                break;
+            case 'done':
+                if (this.onDone) this.onDone();
+                this.socket.close();
+                break;
+            case 'error':
+                console.error('Streaming error:', message.error);
+                if (this.onError) this.onError(new Error(message.error));
+                break;
+            default:
+                console.warn('Unknown streaming message:', message);
+        }
+    }
+
+    releaseAudio() {
+        if (this.processor) {
+            this.processor.disconnect();
+            this.processor = null;
+        }
+        if (this.audioContext) {
+            this.audioContext.close();
+            this.audioContext = null;
+        }
+        if (this.stream) {
+            this.stream.getTracks().forEach(track => track.stop());
+            this.stream = null;
+        }
+    }
+
+    /**
+     * Convert float samples in [-1, 1] to little-endian 16-bit PCM
+     */
+    toPCM16(samples) {
+        const pcm = new Int16Array(samples.length);
+        for (let i = 0; i < samples.length; i++) {
+            const s = Math.max(-1, Math.min(1, samples[i]));
+            pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+        }
+        return pcm.buffer;
+    }
+}
+
+export default StreamingService;
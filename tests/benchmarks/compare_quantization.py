@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Compare fp32 and INT8-quantized Whisper accuracy, latency and memory on CPU
+
+Usage:
+    python tests/benchmarks/compare_quantization.py [audio files...] --model small --runs 3
+
+A reference transcript is read from a .txt file next to each audio file when one
+exists; otherwise the fp32 output is used as the reference, so the reported WER
+is the drift introduced by quantization.
+"""
+import os
+import io
+import sys
+import time
+import argparse
+
+# Make backend services importable
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'backend', 'src'))
+
+DEFAULT_AUDIO = os.path.join(os.path.dirname(__file__), '..', 'test_audio.aiff')
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def model_size_mb(model) -> float:
+    """Serialized weight size, which also counts packed INT8 weights"""
+    import torch
+
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def load(model_size: str, quantize: str):
+    """Load a model the same way the service does"""
+    import whisper
+    from services.quantization import quantize_model
+
+    start = time.time()
+    model = quantize_model(whisper.load_model(model_size, device="cpu"), quantize)
+    return model, time.time() - start
+
+
+def run(model, audio, runs: int, language: str):
+    """Transcribe repeatedly and return the last text and the mean latency"""
+    options = {"fp16": False}
+    if language:
+        options["language"] = language
+
+    model.transcribe(audio, **options)  # warm-up
+    latencies = []
+    text = ""
+    for _ in range(runs):
+        start = time.time()
+        text = model.transcribe(audio, **options)["text"].strip()
+        latencies.append(time.time() - start)
+    return text, sum(latencies) / len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='*', default=[DEFAULT_AUDIO], help='Audio files to transcribe')
+    parser.add_argument('--model', default=os.getenv('WHISPER_MODEL_SIZE', 'small'), help='Whisper model size')
+    parser.add_argument('--runs', type=int, default=3, help='Timed runs per file')
+    parser.add_argument('--language', default=None, help='Force a language instead of detecting it')
+    args = parser.parse_args()
+
+    from services.audio_decoder import decode_audio
+
+    clips = []
+    for path in args.audio:
+        with open(path, 'rb') as f:
+            audio = decode_audio(f.read())
+        reference_path = os.path.splitext(path)[0] + '.txt'
+        reference = None
+        if os.path.exists(reference_path):
+            with open(reference_path, 'r', encoding='utf-8') as f:
+                reference = f.read().strip()
+        clips.append((os.path.basename(path), audio, reference))
+
+    results = {}
+    for mode in (None, 'int8'):
+        label = mode or 'fp32'
+        print(f"Loading '{args.model}' ({label})...")
+        model, load_time = load(args.model, mode)
+        size = model_size_mb(model)
+        outputs = [run(model, audio, args.runs, args.language) for _, audio, _ in clips]
+        results[label] = (load_time, size, outputs)
+        del model
+
+    print()
+    print(f"{'file':<24} {'mode':<6} {'latency_s':>10} {'rtf':>6} {'wer':>6}")
+    for index, (name, audio, reference) in enumerate(clips):
+        duration = len(audio) / 16000
+        baseline = reference if reference is not None else results['fp32'][2][index][0]
+        for label, (_, _, outputs) in results.items():
+            text, latency = outputs[index]
+            wer = word_error_rate(baseline, text)
+            print(f"{name[:24]:<24} {label:<6} {latency:>10.2f} {latency / duration:>6.2f} {wer:>6.1%}")
+
+    print()
+    for label, (load_time, size, outputs) in results.items():
+        mean_latency = sum(latency for _, latency in outputs) / len(outputs)
+        print(f"{label:<6} load {load_time:.1f}s, weights {size:.0f} MB, mean latency {mean_latency:.2f}s")
+
+    fp32_latency = sum(latency for _, latency in results['fp32'][2])
+    int8_latency = sum(latency for _, latency in results['int8'][2])
+    print(f"\nINT8 speed-up: {fp32_latency / int8_latency:.2f}x, "
+          f"weight reduction: {1 - results['int8'][1] / results['fp32'][1]:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark SimpleWhisperService on synthetic audio across model sizes and concurrency
+
+Usage:
+    python tests/benchmarks/whisper_benchmark.py --models tiny base --seconds 5 30 --concurrency 1 4
+    python tests/benchmarks/whisper_benchmark.py --engine stub --http --concurrency 1 8 32
+
+Each model size runs in its own process, so load time and peak RSS are not skewed by
+models benchmarked earlier. Speech-like clips are harmonic tones shaped by a syllabic
+envelope; silent clips are low-level noise. --engine stub replaces the model with a
+weightless engine (WHISPER_STUB_RTF seconds per audio second) to measure only the
+serving overhead; --http sends every request through the Flask app and job queue.
+Transcript, decoded-audio and encoder caches are off unless --caches is given.
+"""
+import os
+import io
+import sys
+import json
+import time
+import wave
+import argparse
+import queue
+import resource
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Make backend services importable
+BACKEND_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend', 'src')
+sys.path.append(BACKEND_SRC)
+
+SAMPLE_RATE = 16000
+
+
+def speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """Voiced harmonics with a wandering pitch, chopped into ~4 syllables per second"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 120 + 30 * np.sin(2 * np.pi * 0.5 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi)), 0, None) ** 2
+    audio = 0.3 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return (audio / np.abs(audio).max() * 0.5).astype(np.float32)
+
+
+def silence(seconds: float, seed: int = 0) -> np.ndarray:
+    """Low-level background noise"""
+    rng = np.random.default_rng(seed)
+    return (0.001 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def to_wav(audio: np.ndarray) -> bytes:
+    """Encode samples as 16-bit PCM WAV, the way an upload would arrive"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(np.ceil(q / 100 * len(ordered))) - 1))]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_model(model_size: str, args, results):
+    """Load one model size and run every clip and concurrency level against it (child process)"""
+    os.environ['WHISPER_MODEL_SIZE'] = model_size
+    if args.engine:
+        os.environ['WHISPER_ENGINE'] = args.engine
+    if not args.caches:
+        os.environ['TRANSCRIPT_CACHE'] = 'false'
+        os.environ['WHISPER_AUDIO_CACHE_MB'] = '0'
+        os.environ['WHISPER_ENCODER_CACHE_MB'] = '0'
+
+    started = time.time()
+    if args.http:
+        import app as backend_app
+        client_app = backend_app.create_app()
+        service = backend_app.get_whisper_service()
+    else:
+        from services.whisper_service import SimpleWhisperService
+        service = SimpleWhisperService()
+    if not service.wait_until_ready(args.load_timeout):
+        raise RuntimeError(f"Model '{model_size}' not ready after {args.load_timeout}s")
+    load_seconds = time.time() - started
+
+    def transcribe(clip):
+        """Run one request and return its latency"""
+        request_started = time.time()
+        if args.http:
+            response = client_app.test_client().post('/api/v1/transcribe', data={
+                'audio': (io.BytesIO(clip), 'bench.wav'),
+                'language': args.language or ''
+            })
+            if response.status_code != 200:
+                raise RuntimeError(f"HTTP {response.status_code}: {response.get_json()}")
+        else:
+            service.transcribe_audio(clip, args.language)
+        return time.time() - request_started
+
+    rows = []
+    for kind, generate in (('speech', speech_like), ('silence', silence)):
+        if kind not in args.kinds:
+            continue
+        for seconds in args.seconds:
+            # WAV bytes so the timed path includes decoding, as for a real upload
+            clips = [to_wav(generate(seconds, seed)) for seed in range(args.requests)]
+            transcribe(clips[0])  # warm this clip length
+            for concurrency in args.concurrency:
+                wall_started = time.time()
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    latencies = list(pool.map(transcribe, clips))
+                wall = time.time() - wall_started
+                rows.append({
+                    "model": model_size,
+                    "kind": kind,
+                    "seconds": seconds,
+                    "concurrency": concurrency,
+                    "requests": len(latencies),
+                    "p50_s": round(percentile(latencies, 50), 3),
+                    "p99_s": round(percentile(latencies, 99), 3),
+                    "rtf": round(float(np.median(latencies)) / seconds, 3),
+                    "throughput": round(seconds * len(latencies) / wall, 2)
+                })
+
+    results.put({
+        "model": model_size,
+        "engine": service.get_model_info().get("engine"),
+        "load_s": round(load_seconds, 2),
+        "peak_rss_mb": round(peak_rss_mb()),
+        "rows": rows
+    })
+
+
+def wait_for_report(process, results):
+    """Wait for the child's report, or None if it exits without sending one"""
+    while True:
+        try:
+            return results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+    # The child may have sent its report just before exiting
+    try:
+        return results.get(timeout=1)
+    except queue.Empty:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models', nargs='+', default=[os.getenv('WHISPER_MODEL_SIZE', 'small')], help='Model sizes')
+    parser.add_argument('--seconds', nargs='+', type=float, default=[5, 30], help='Clip lengths in seconds')
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4], help='Concurrent requests')
+    parser.add_argument('--requests', type=int, default=8, help='Requests per clip length and concurrency level')
+    parser.add_argument('--kinds', nargs='+', choices=['speech', 'silence'], default=['speech', 'silence'],
+                        help='Synthetic clip kinds')
+    parser.add_argument('--language', default='en', help='Language passed to each request (empty to detect)')
+    parser.add_argument('--engine', default=None, help='WHISPER_ENGINE override, e.g. stub')
+    parser.add_argument('--http', action='store_true', help='Go through the Flask app and job queue')
+    parser.add_argument('--caches', action='store_true', help='Leave the transcript and feature caches on')
+    parser.add_argument('--load-timeout', type=float, default=1800, help='Seconds to wait for each model')
+    parser.add_argument('--json', default=None, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    # The app resolves its imports relative to backend/src
+    os.chdir(BACKEND_SRC)
+    context = multiprocessing.get_context('spawn')
+    reports = []
+    for model_size in args.models:
+        print(f"Benchmarking '{model_size}'...")
+        results = context.Queue()
+        process = context.Process(target=bench_model, args=(model_size, args, results))
+        process.start()
+        # Read before joining: a report larger than the pipe buffer blocks the child in put()
+        report = wait_for_report(process, results)
+        process.join()
+        if report is None:
+            print(f"  '{model_size}' failed (exit code {process.exitcode})")
+            continue
+        reports.append(report)
+
+    print()
+    print(f"{'model':<10} {'engine':<15} {'load_s':>7} {'peak_rss_mb':>12}")
+    for report in reports:
+        print(f"{report['model']:<10} {report['engine']:<15} {report['load_s']:>7.2f} {report['peak_rss_mb']:>12}")
+
+    print()
+    print(f"{'model':<10} {'kind':<8} {'sec':>5} {'conc':>5} {'p50_s':>8} {'p99_s':>8} {'rtf':>6} {'audio_s/s':>10}")
+    for report in reports:
+        for row in report['rows']:
+            print(f"{row['model']:<10} {row['kind']:<8} {row['seconds']:>5.0f} {row['concurrency']:>5} "
+                  f"{row['p50_s']:>8.3f} {row['p99_s']:>8.3f} {row['rtf']:>6.3f} {row['throughput']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup: make the backend and translation-service modules importable
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Both trees have an app.py; the backend's wins, translation-service modules are imported by their own names
+sys.path.insert(0, os.path.join(ROOT, 'backend', 'src'))
+sys.path.append(os.path.join(ROOT, 'translation-service'))
@@ -0,0 +1,61 @@
+"""
+Tests for the admission ledger
+"""
+import pytest
+
+from services.admission import AdmissionController, BacklogFullError
+
+
+def test_cost_uses_measured_then_default_rtf():
+    assert AdmissionController.estimate_cost("small", 100, {"small": 0.5}) == 50
+    assert AdmissionController.estimate_cost("small", 100, {}) == pytest.approx(30)
+    assert AdmissionController.estimate_cost("unknown", 100, {}) == 100
+
+
+def test_disabled_ledger_admits_everything():
+    controller = AdmissionController(max_backlog_seconds=0)
+    for _ in range(10):
+        controller.admit("medium", 600, {})
+
+    assert controller.get_stats()["rejected"] == 0
+    assert controller.get_stats()["max_backlog_seconds"] is None
+
+
+def test_rejects_past_the_backlog_limit_and_admits_after_release():
+    controller = AdmissionController(workers=2, max_backlog_seconds=100)
+    first = controller.admit("small", 60, {"small": 1.0})
+    controller.admit("small", 30, {"small": 1.0})
+
+    with pytest.raises(BacklogFullError) as excinfo:
+        controller.admit("small", 20, {"small": 1.0})
+    # 90s queued + 20s over a 100s limit, drained by two workers
+    assert excinfo.value.backlog_seconds == 90
+    assert excinfo.value.retry_after == 5
+
+    controller.release(first)
+    controller.admit("small", 20, {"small": 1.0})
+    assert controller.get_stats() == {
+        "max_backlog_seconds": 100,
+        "backlog_seconds": 50,
+        "admitted": 3,
+        "rejected": 1
+    }
+
+
+def test_idle_server_takes_an_oversized_request():
+    controller = AdmissionController(max_backlog_seconds=10)
+
+    assert controller.admit("small", 600, {"small": 1.0}) == 600
+    with pytest.raises(BacklogFullError):
+        controller.admit("small", 1, {"small": 1.0})
+
+
+def test_wait_estimate_divides_backlog_by_workers():
+    controller = AdmissionController(workers=4)
+    assert controller.estimate_wait_seconds() == 1
+
+    controller.admit("small", 100, {"small": 1.0})
+    assert controller.estimate_wait_seconds() == 25
+
+    controller.release(1000)
+    assert controller.get_stats()["backlog_seconds"] == 0
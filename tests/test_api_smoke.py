@@ -0,0 +1,155 @@
+"""
+End-to-end smoke tests of the backend routes through the Flask test client, using the stub engine
+"""
+import io
+import threading
+import wave
+
+import numpy as np
+import pytest
+
+SAMPLE_RATE = 16000
+
+
+def make_wav(seconds=2.0, frequency=220.0):
+    """Encode a tone as a 16 kHz mono 16-bit WAV"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (np.sin(2 * np.pi * frequency * t) * 8000).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def upload(data, filename='test.wav', **form):
+    """Multipart form with an audio file"""
+    return dict(form, audio=(io.BytesIO(data), filename))
+
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('WHISPER_ENGINE', 'stub')
+        mp.setenv('WHISPER_STUB_RTF', '0')
+        mp.delenv('WHISPER_INFERENCE_SOCKET', raising=False)
+        mp.setenv('TRANSCRIPT_CACHE_DIR', str(tmp_path_factory.mktemp('transcripts')))
+        mp.setenv('UPLOAD_FOLDER', str(tmp_path_factory.mktemp('uploads')))
+        # Micro-batching sizes the job pool to a whole batch; the stub engine itself never batches
+        mp.setenv('WHISPER_BATCH_WINDOW_MS', '50')
+
+        import app as backend_app
+        for name in ('_whisper_service', '_job_queue', '_load_governor', '_admission_controller', '_stream_slots'):
+            mp.setattr(backend_app, name, None)
+
+        flask_app = backend_app.create_app()
+        assert backend_app.get_whisper_service().wait_until_ready(30)
+        yield flask_app.test_client()
+
+
+def test_transcribe_returns_result(client):
+    response = client.post('/api/v1/transcribe', data=upload(make_wav()))
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['success']
+    assert body['result']['text']
+    assert body['result']['segments']
+
+
+def test_transcribe_without_audio_is_rejected(client):
+    response = client.post('/api/v1/transcribe', data={})
+
+    assert response.status_code == 400
+    assert not response.get_json()['success']
+
+
+def test_job_can_be_polled_to_completion(client):
+    response = client.post('/api/v1/jobs', data=upload(make_wav(frequency=330.0)))
+
+    assert response.status_code in (200, 202)
+    status_url = response.get_json()['status_url']
+
+    job = client.get(f'{status_url}?wait=10').get_json()['job']
+    assert job['status'] == 'completed'
+    assert job['result']['text']
+
+
+def test_unknown_job_is_404(client):
+    assert client.get('/api/v1/jobs/does-not-exist').status_code == 404
+
+
+def test_detect_audio_language(client):
+    response = client.post('/api/v1/detect-audio-language', data=upload(make_wav(), top_k='3'))
+
+    assert response.status_code == 200
+    result = response.get_json()['result']
+    assert result['language']
+    assert 1 <= len(result['probabilities']) <= 3
+
+
+def test_detect_audio_language_validates_input(client):
+    assert client.post('/api/v1/detect-audio-language', data={}).status_code == 400
+    response = client.post('/api/v1/detect-audio-language', data=upload(make_wav(), top_k='many'))
+    assert response.status_code == 400
+    response = client.post('/api/v1/detect-audio-language', data=upload(make_wav(), model_size='gigantic'))
+    assert response.status_code == 400
+
+
+def test_transcribe_reports_decoding_profile(client):
+    response = client.post('/api/v1/transcribe', data=upload(make_wav(frequency=440.0), profile='fast'))
+
+    assert response.status_code == 200
+    assert response.get_json()['result']['profile'] == 'fast'
+
+
+def test_unknown_profile_is_rejected(client):
+    for path in ('/api/v1/transcribe', '/api/v1/jobs'):
+        response = client.post(path, data=upload(make_wav(), profile='turbo'))
+        assert response.status_code == 400
+        assert 'balanced' in response.get_json()['profiles']
+
+
+def test_server_timing_on_success_and_error(client):
+    response = client.post('/api/v1/transcribe', data=upload(make_wav(frequency=550.0), timings='true'))
+    assert response.status_code == 200
+    header = response.headers['Server-Timing']
+    assert 'upload;dur=' in header and 'total;dur=' in header
+    assert 'total' in response.get_json()['timings']
+
+    response = client.post('/api/v1/transcribe', data={})
+    assert response.status_code == 400
+    assert 'total;dur=' in response.headers['Server-Timing']
+
+
+def test_admission_drains_per_inference_lane(client):
+    import app as backend_app
+
+    lanes = backend_app.get_whisper_service().executor.lanes
+    assert backend_app.get_job_queue().num_workers > lanes
+    assert backend_app.get_admission_controller().workers == lanes
+
+
+def test_readiness_is_503_while_the_model_loads(client, monkeypatch):
+    import app as backend_app
+
+    service = backend_app.get_whisper_service()
+    monkeypatch.setattr(service, '_ready', threading.Event())
+    monkeypatch.setattr(service, 'is_loading', True)
+
+    response = client.get('/health/ready')
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert response.get_json()['whisper_model'] == 'loading'
+    # Liveness stays up so the orchestrator does not restart a loading replica
+    assert client.get('/health/live').status_code == 200
+
+
+def test_readiness_is_200_once_ready(client):
+    response = client.get('/health/ready')
+
+    assert response.status_code == 200
+    assert 'Retry-After' not in response.headers
+    assert response.get_json()['status'] == 'ready'
@@ -0,0 +1,82 @@
+"""
+Tests for native WAV decoding and upload duration estimates
+"""
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from services.audio_decoder import decode_audio, estimate_duration, AudioDecodeError, SAMPLE_RATE
+
+
+def make_wav(raw, width, channels=1, rate=SAMPLE_RATE):
+    """Wrap raw little-endian PCM frames in a WAV header"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(raw)
+    return buffer.getvalue()
+
+
+def pcm24(values):
+    ints = np.asarray(values, dtype=np.int32) & 0xFFFFFF
+    return np.stack([ints & 0xFF, (ints >> 8) & 0xFF, (ints >> 16) & 0xFF], axis=1).astype(np.uint8).tobytes()
+
+
+@pytest.mark.parametrize("raw, width, expected", [
+    (np.array([0, 128, 255], dtype=np.uint8).tobytes(), 1, [-1.0, 0.0, 127 / 128]),
+    (np.array([-32768, 0, 16384], dtype='<i2').tobytes(), 2, [-1.0, 0.0, 0.5]),
+    (pcm24([-8388608, -1, 4194304]), 3, [-1.0, -1 / 8388608, 0.5]),
+    (np.array([-2147483648, 0, 1073741824], dtype='<i4').tobytes(), 4, [-1.0, 0.0, 0.5]),
+])
+def test_integer_pcm_widths_scale_to_unit_range(raw, width, expected):
+    samples = decode_audio(make_wav(raw, width))
+
+    assert samples.dtype == np.float32
+    assert np.allclose(samples, expected)
+
+
+def test_stereo_is_downmixed_to_mono():
+    frames = np.array([[16384, 0], [-16384, -16384]], dtype='<i2')
+
+    samples = decode_audio(make_wav(frames.tobytes(), 2, channels=2))
+
+    assert np.allclose(samples, [0.25, -0.5])
+
+
+def test_max_seconds_limits_decoded_frames():
+    raw = np.zeros(3 * SAMPLE_RATE, dtype='<i2').tobytes()
+
+    assert len(decode_audio(make_wav(raw, 2), max_seconds=1.5)) == int(1.5 * SAMPLE_RATE)
+
+
+def test_other_rates_are_resampled_to_16k():
+    pytest.importorskip('scipy')
+    raw = np.full(8000, 8192, dtype='<i2').tobytes()
+
+    samples = decode_audio(make_wav(raw, 2, rate=8000))
+
+    assert len(samples) == SAMPLE_RATE
+    assert np.allclose(samples[100:-100], 0.25, atol=0.01)
+
+
+def test_empty_upload_is_rejected():
+    with pytest.raises(AudioDecodeError):
+        decode_audio(b'')
+
+
+def test_estimate_duration_reads_wav_header():
+    raw = np.zeros(2 * 8000 * 2, dtype='<i2').tobytes()
+
+    assert estimate_duration(make_wav(raw, 2, channels=2, rate=8000)) == 2.0
+
+
+def test_estimate_duration_of_compressed_upload_uses_bitrate(monkeypatch):
+    monkeypatch.setenv('AUDIO_ESTIMATE_KBPS', '32')
+
+    # 8 KB at 32 kbps is two seconds; a truncated WAV header falls back the same way
+    assert estimate_duration(b'\xff' * 8000) == 2.0
+    assert estimate_duration(b'RIFF\x00\x00\x00\x00WAVE' + b'\x00' * 7988) == 2.0
@@ -0,0 +1,105 @@
+"""
+Tests for the size-bounded array cache and cached audio decoding
+"""
+import numpy as np
+import pytest
+
+from services import feature_cache
+from services.feature_cache import ArrayCache, decode_cached
+
+KB = 1 / 1024  # budgets are in MB
+
+
+def block(kb, value=0.0):
+    """A float32 array of the given size in KB"""
+    return np.full(kb * 256, value, dtype=np.float32)
+
+
+@pytest.fixture
+def decodes(monkeypatch):
+    """Record each real decode and return a distinct array per call"""
+    calls = []
+
+    def decode_audio(data):
+        calls.append(data)
+        return block(1, len(calls))
+
+    monkeypatch.setattr(feature_cache, 'decode_audio', decode_audio)
+    return calls
+
+
+def test_evicts_least_recently_used_past_the_budget():
+    cache = ArrayCache(3 * KB)
+    for key in ("a", "b", "c"):
+        cache.put(key, block(1))
+
+    cache.get("a")
+    cache.put("d", block(1))
+
+    assert cache.get("b") is None
+    assert list(cache._entries) == ["c", "a", "d"]
+
+    # A larger entry evicts as many of the oldest as it needs
+    cache.put("e", block(2))
+    assert list(cache._entries) == ["d", "e"]
+    assert cache._bytes == 3 * 1024
+
+
+def test_byte_accounting_on_replace_and_evict():
+    cache = ArrayCache(4 * KB)
+    cache.put("a", block(1))
+    cache.put("b", block(2))
+    cache.put("a", block(2))
+
+    assert cache._bytes == 4 * 1024
+    assert list(cache._entries) == ["b", "a"]
+
+    cache.put("c", block(1))
+    assert list(cache._entries) == ["a", "c"]
+    assert cache._bytes == sum(value.nbytes for value in cache._entries.values()) == 3 * 1024
+
+
+def test_oversized_value_is_not_cached():
+    cache = ArrayCache(2 * KB)
+    cache.put("a", block(1))
+    cache.put("huge", block(3))
+
+    assert cache.get("huge") is None
+    assert cache.get("a") is not None
+    assert cache._bytes == 1024
+
+
+def test_stats_count_hits_and_misses():
+    cache = ArrayCache(1)
+    cache.put("a", block(1))
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 1, 0.5)
+
+
+def test_decode_cached_reuses_samples_of_the_same_upload(decodes):
+    cache = ArrayCache(1)
+
+    first = decode_cached(cache, b"upload")
+    again = decode_cached(cache, b"upload")
+    other = decode_cached(cache, b"other")
+    decode_cached(cache, b"third", audio_hash="known")
+    decode_cached(cache, b"fourth", audio_hash="known")
+
+    assert again is first
+    assert not np.array_equal(other, first)
+    assert decodes == [b"upload", b"other", b"third"]
+
+
+def test_disabled_cache_always_decodes(decodes, monkeypatch):
+    monkeypatch.setenv('WHISPER_AUDIO_CACHE_MB', '0')
+    cache = feature_cache.create_audio_cache()
+
+    assert not cache.enabled
+    decode_cached(cache, b"upload")
+    decode_cached(cache, b"upload")
+
+    assert decodes == [b"upload", b"upload"]
+    assert cache.get_stats()["entries"] == 0
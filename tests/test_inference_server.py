@@ -0,0 +1,217 @@
+"""
+Tests for the shared inference server, run as a real process with the stub engine
+"""
+import io
+import time
+import wave
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from multiprocessing.shared_memory import SharedMemory
+from types import SimpleNamespace
+
+from services import inference_server
+from services.inference_server import (
+    start_inference_server_process, RemoteWhisperService, RemoteAdmissionController, RemoteJobRegistry
+)
+from services.admission import BacklogFullError
+from services.feature_cache import ArrayCache
+from services.job_queue import TranscriptionJobQueue, JOB_COMPLETED
+from services.transcript_cache import hash_audio
+
+SAMPLE_RATE = 16000
+AUTHKEY = b'test-authkey'
+
+
+def make_wav(seconds=2.0, frequency=220.0):
+    """Encode a tone as a 16 kHz mono 16-bit WAV"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = (np.sin(2 * np.pi * frequency * t) * 8000).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope='module')
+def address(tmp_path_factory):
+    """Start an inference server and wait until its model is loaded"""
+    socket_dir = tmp_path_factory.mktemp('inference')
+    address = str(socket_dir / 'whisper.sock')
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('WHISPER_ENGINE', 'stub')
+        mp.setenv('WHISPER_STUB_RTF', '0')
+        mp.setenv('TRANSCRIPT_CACHE_DIR', str(socket_dir / 'transcripts'))
+        mp.setenv('ADMISSION_MAX_BACKLOG_SECONDS', '100')
+        # Micro-batching sizes the job pool to a whole batch; the stub engine itself never batches
+        mp.setenv('WHISPER_BATCH_WINDOW_MS', '50')
+        mp.setenv('WHISPER_BATCH_MAX_SIZE', '8')
+        process = start_inference_server_process(address, AUTHKEY)
+
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                if RemoteWhisperService(address, AUTHKEY).is_model_loaded():
+                    break
+            except OSError:
+                pass
+            assert time.time() < deadline, "inference server did not become ready"
+            time.sleep(0.1)
+        yield address
+    finally:
+        process.terminate()
+        process.join(5)
+
+
+@pytest.fixture
+def remote(address):
+    return RemoteWhisperService(address, AUTHKEY)
+
+
+@pytest.fixture
+def client_decodes(monkeypatch):
+    """Count how often the client has to decode an upload itself"""
+    calls = []
+    decode = inference_server.decode_audio
+
+    def counting_decode(data, **kwargs):
+        calls.append(kwargs)
+        return decode(data, **kwargs)
+
+    monkeypatch.setattr(inference_server, 'decode_audio', counting_decode)
+    return calls
+
+
+def _poll_from_other_worker(address, job_id, results):
+    """Runs in a separate process, like a Gunicorn worker that did not accept the job"""
+    job_queue = TranscriptionJobQueue(num_workers=1, registry=RemoteJobRegistry(RemoteWhisperService(address, AUTHKEY)))
+    results.put(job_queue.poll(job_id, wait=10))
+
+
+def test_job_can_be_polled_from_another_process(address, remote):
+    job_queue = TranscriptionJobQueue(num_workers=1, registry=RemoteJobRegistry(remote))
+    data = make_wav(frequency=300.0)
+    job = job_queue.submit(lambda: remote.transcribe_audio(data))
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    poller = context.Process(target=_poll_from_other_worker, args=(address, job.id, results))
+    poller.start()
+    try:
+        record = results.get(timeout=30)
+    finally:
+        poller.join(10)
+
+    assert record["job_id"] == job.id
+    assert record["status"] == JOB_COMPLETED
+    assert record["result"]["text"]
+    assert RemoteJobRegistry(remote).get("unknown-job") is None
+
+
+def test_shared_ledger_drains_per_inference_lane(remote):
+    admission = RemoteAdmissionController(remote)
+    # An unmeasured model is priced at its default real-time factor (medium: 0.9)
+    cost = admission.admit("medium", 80)
+    try:
+        assert cost == pytest.approx(72)
+        # One lane, even though micro-batching gives the job queue eight workers
+        assert admission.estimate_wait_seconds() == 72
+    finally:
+        admission.release(cost)
+
+
+def test_status_and_model_checks(remote):
+    assert remote.is_model_loaded()
+    assert remote.get_status() in ("loaded", "ready")
+    remote.check_model("base")
+    assert remote.get_model_info()["inference_server"] == remote.address
+
+
+def test_transcribe_decodes_once_then_uses_server_audio_cache(remote, client_decodes):
+    data = make_wav(frequency=400.0)
+
+    first = remote.transcribe_audio(data)
+    assert first["text"]
+    # The server did not have the samples, so the client decoded and sent them once
+    assert len(client_decodes) == 1
+
+    again = remote.transcribe_audio(data, use_cache=False)
+    assert again["text"] == first["text"]
+    assert len(client_decodes) == 1
+
+
+def test_cached_transcript_lookup(remote):
+    data = make_wav(frequency=450.0)
+    result = remote.transcribe_audio(data)
+
+    assert remote.get_cached_transcript(hash_audio(data)) == result
+    assert remote.get_cached_transcript(hash_audio(data), task="translate") is None
+    assert remote.get_cached_transcript(hash_audio(b"never uploaded")) is None
+
+
+def test_detect_language_reuses_or_decodes_first_window(remote, client_decodes):
+    uploaded = make_wav(frequency=500.0)
+    remote.transcribe_audio(uploaded)
+    del client_decodes[:]
+
+    assert remote.detect_language(uploaded, top_k=1)["language"] == "en"
+    assert client_decodes == []
+
+    result = remote.detect_language(make_wav(frequency=520.0))
+    assert result["probabilities"][0]["language"] == "en"
+    assert client_decodes == [{"max_seconds": 30}]
+
+    samples = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    assert remote.detect_language(samples)["language"] == "en"
+
+
+def test_shared_ledger_admits_rejects_and_releases(remote):
+    admission = RemoteAdmissionController(remote)
+    first = admission.admit("medium", 80)
+    try:
+        with pytest.raises(BacklogFullError) as excinfo:
+            admission.admit("medium", 80)
+        assert excinfo.value.backlog_seconds == pytest.approx(72)
+        assert excinfo.value.retry_after == 44
+        stats = admission.get_stats()
+        assert stats["shared"] and stats["rejected"] >= 1
+    finally:
+        admission.release(first)
+    admission.release(admission.admit("medium", 80))
+
+
+def test_server_leaves_client_segment_to_the_client(monkeypatch):
+    unregistered = []
+    unregister = inference_server.resource_tracker.unregister
+
+    def spy(name, rtype):
+        unregistered.append((name, rtype))
+        unregister(name, rtype)
+
+    monkeypatch.setattr(inference_server.resource_tracker, 'unregister', spy)
+    service = SimpleNamespace(audio_cache=ArrayCache(1))
+    audio = np.arange(16, dtype=np.float32)
+
+    shm = SharedMemory(create=True, size=audio.nbytes)
+    try:
+        np.ndarray(audio.shape, dtype=np.float32, buffer=shm.buf)[:] = audio
+        message = {"shm": shm.name, "samples": len(audio), "audio_hash": "h", "cache_audio": True}
+        total = inference_server._run_shared(service, message, lambda samples: float(samples.sum()))
+
+        assert total == float(audio.sum())
+        assert unregistered == [(shm._name, "shared_memory")]
+        # The segment still exists for its owner, and the cached copy does not alias it
+        SharedMemory(name=shm.name).close()
+        assert np.array_equal(service.audio_cache.get("h"), audio)
+
+        with pytest.raises(inference_server._AudioNotCached):
+            inference_server._run_shared(service, {"audio_hash": "other"}, len)
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,94 @@
+"""
+Tests for the bounded transcription job queue
+"""
+import threading
+
+import pytest
+
+from services.job_queue import (
+    TranscriptionJobQueue, JobRegistry, QueueFullError, JOB_COMPLETED, JOB_FAILED
+)
+
+
+def test_job_runs_and_reports_result():
+    job_queue = TranscriptionJobQueue(num_workers=1, max_queue_size=2)
+    job = job_queue.submit(lambda x, y=0: x + y, 2, y=3)
+
+    assert job.wait(5)
+    assert job.status == JOB_COMPLETED
+    assert job.to_dict()["result"] == 5
+    assert job_queue.get(job.id) is job
+
+
+def test_failed_job_keeps_error():
+    def fail():
+        raise ValueError("bad audio")
+
+    job_queue = TranscriptionJobQueue(num_workers=1, max_queue_size=2)
+    job = job_queue.submit(fail)
+
+    assert job.wait(5)
+    assert job.status == JOB_FAILED
+    assert job.to_dict()["error"] == "bad audio"
+
+
+def test_full_queue_rejects_with_retry_after():
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    job_queue = TranscriptionJobQueue(num_workers=1, max_queue_size=1)
+    try:
+        job_queue.submit(block)
+        assert started.wait(5)
+        # The worker is busy, so one job fits in the queue and the next is refused
+        job_queue.submit(block)
+        with pytest.raises(QueueFullError) as excinfo:
+            job_queue.submit(block)
+        assert excinfo.value.retry_after >= 1
+        assert job_queue.get_stats()["queued"] == 1
+    finally:
+        release.set()
+
+
+def test_wait_times_out_while_job_runs():
+    release = threading.Event()
+    job_queue = TranscriptionJobQueue(num_workers=1, max_queue_size=1)
+    job = job_queue.submit(release.wait, 5)
+    try:
+        assert not job.wait(0.05)
+        assert not job.is_finished()
+    finally:
+        release.set()
+    assert job.wait(5)
+
+
+def test_completed_job_is_pollable_and_expires():
+    job_queue = TranscriptionJobQueue(num_workers=1, max_queue_size=1, result_ttl=0.01)
+    job = job_queue.add_completed({"text": "cached"})
+
+    assert job.is_finished()
+    assert job_queue.get(job.id).to_dict()["result"] == {"text": "cached"}
+
+    job.finished_at -= 1
+    job_queue._purge_expired()
+    assert job_queue.get(job.id) is None
+
+
+def test_registry_long_poll_sees_jobs_from_another_queue():
+    registry = JobRegistry()
+    release = threading.Event()
+    submitter = TranscriptionJobQueue(num_workers=1, max_queue_size=1, registry=registry)
+    poller = TranscriptionJobQueue(num_workers=1, max_queue_size=1, registry=registry)
+
+    job = submitter.submit(lambda: release.wait(5) and "done")
+    assert poller.poll(job.id)["status"] in ("queued", "running")
+
+    threading.Timer(0.05, release.set).start()
+    record = poller.poll(job.id, wait=5)
+    assert record["status"] == JOB_COMPLETED
+    assert record["result"] == "done"
+    assert poller.poll("unknown") is None
@@ -0,0 +1,60 @@
+"""
+Tests for load-adaptive model selection
+"""
+import pytest
+
+from services.load_governor import LoadGovernor, OverloadedError, RealTimeFactorTracker
+
+ALLOWED = ["tiny", "base", "small", "medium"]
+
+
+class FixedWait:
+    """Wait estimator with a set backlog"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def estimate_wait_seconds(self):
+        return self.seconds
+
+
+def test_disabled_without_slo():
+    governor = LoadGovernor(FixedWait(1000), slo_seconds=0)
+
+    assert governor.choose_model("medium", 60, ALLOWED, {}) == "medium"
+
+
+def test_keeps_requested_model_when_slo_is_met():
+    governor = LoadGovernor(FixedWait(0), slo_seconds=30)
+
+    assert governor.choose_model("small", 60, ALLOWED, {"small": 0.3}) == "small"
+    assert governor.get_stats()["degraded"] == 0
+
+
+def test_degrades_to_largest_model_that_meets_slo():
+    governor = LoadGovernor(FixedWait(10), slo_seconds=30)
+    rtf = {"medium": 1.0, "small": 0.5, "base": 0.2, "tiny": 0.1}
+
+    # 10s wait + 60s audio: medium 70s, small 40s, base 22s
+    assert governor.choose_model("medium", 60, ALLOWED, rtf) == "base"
+    assert governor.get_stats()["degraded"] == 1
+
+
+def test_rejects_when_no_model_meets_slo():
+    governor = LoadGovernor(FixedWait(100), slo_seconds=30)
+
+    with pytest.raises(OverloadedError) as excinfo:
+        governor.choose_model("small", 60, ALLOWED, {"tiny": 0.1})
+    # The smallest model still projects 100s + 6s
+    assert excinfo.value.projected_seconds == 106
+    assert excinfo.value.retry_after == 76
+    assert governor.get_stats()["rejected"] == 1
+
+
+def test_rtf_tracker_averages_measurements():
+    tracker = RealTimeFactorTracker(alpha=0.5)
+    tracker.record("small", 10, 2)
+    tracker.record("small", 10, 4)
+    tracker.record("small", 0, 5)
+
+    assert tracker.get_all() == {"small": 0.3}
@@ -0,0 +1,58 @@
+"""
+Tests for long-audio chunk planning and stitching
+"""
+import numpy as np
+
+from services.long_audio import plan_chunks, stitch_segments, SAMPLE_RATE
+
+
+def speech_with_pauses(seconds, pause_every):
+    """A tone interrupted by a one-second pause every pause_every seconds"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    for pause in np.arange(pause_every, seconds, pause_every):
+        audio[int(pause * SAMPLE_RATE):int((pause + 1) * SAMPLE_RATE)] = 0
+    return audio
+
+
+def test_short_audio_is_one_chunk():
+    audio = np.zeros(5 * SAMPLE_RATE, dtype=np.float32)
+
+    assert plan_chunks(audio, 10) == [(0, len(audio), 0)]
+
+
+def test_chunks_cut_in_pauses_and_cover_audio():
+    audio = speech_with_pauses(60, 4)
+    chunks = plan_chunks(audio, 20)
+
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(audio)
+    for (_, end, _), (start, _, keep_from) in zip(chunks, chunks[1:]):
+        # Silence-aligned cuts leave no overlap, and the next chunk owns everything after the cut
+        assert start == end == keep_from
+        assert not audio[end - 100:end + 100].any()
+
+
+def test_forced_cuts_overlap_without_pauses():
+    audio = np.full(60 * SAMPLE_RATE, 0.3, dtype=np.float32)
+    chunks = plan_chunks(audio, 20, overlap_seconds=1.0)
+
+    for (_, end, _), (start, _, keep_from) in zip(chunks, chunks[1:]):
+        assert end - start == 2 * SAMPLE_RATE
+        assert keep_from == start + SAMPLE_RATE
+
+
+def test_stitch_offsets_segments_and_drops_overlap_duplicates():
+    chunks = [(0, 22 * SAMPLE_RATE, 0), (18 * SAMPLE_RATE, 40 * SAMPLE_RATE, 20 * SAMPLE_RATE)]
+    results = [
+        {"segments": [{"start": 0.0, "end": 5.0, "text": "first"},
+                      {"start": 19.0, "end": 21.5, "text": "edge"}]},
+        {"segments": [{"start": 1.0, "end": 3.5, "text": "edge"},
+                      {"start": 5.0, "end": 8.0, "text": "second"}]},
+    ]
+
+    segments = stitch_segments(chunks, results)
+
+    assert [s["text"] for s in segments] == ["first", "edge", "second"]
+    assert segments[1] == {"start": 19.0, "end": 21.5, "text": "edge"}
+    assert segments[2] == {"start": 23.0, "end": 26.0, "text": "second"}
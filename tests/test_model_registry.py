@@ -0,0 +1,87 @@
+"""
+Tests for the model registry's memory budget and LRU eviction
+"""
+import pytest
+
+from services.model_registry import ModelRegistry, ModelBudgetError
+
+SIZES_MB = {"tiny": 100, "base": 200, "small": 400, "medium": 500, "large": 900}
+
+
+class FakeEngine:
+    """Stands in for a Whisper engine with a known resident size"""
+
+    def __init__(self, model_size, memory_mb=None):
+        self.model_size = model_size
+        self._memory_mb = memory_mb if memory_mb is not None else SIZES_MB[model_size]
+        self.loaded = False
+        self.closed = False
+
+    def load(self):
+        self.loaded = True
+
+    def memory_mb(self):
+        return self._memory_mb
+
+    def close(self):
+        self.closed = True
+
+
+def make_registry(budget_mb, factory=FakeEngine):
+    registry = ModelRegistry(factory, "tiny", budget_mb=budget_mb, estimate_mb=SIZES_MB.get)
+    registry.register("tiny", FakeEngine("tiny"))
+    return registry
+
+
+def test_loads_once_and_reuses():
+    registry = make_registry(1000)
+
+    engine = registry.get("base")
+    assert engine.loaded
+    assert registry.get("base") is engine
+    assert registry.get_stats()["loads"] == 1
+
+
+def test_evicts_least_recently_used_but_keeps_default():
+    registry = make_registry(800)
+    base = registry.get("base")
+    small = registry.get("small")
+    registry.get("base")
+
+    registry.get("medium")
+
+    stats = registry.get_stats()
+    assert stats["loaded"] == ["tiny", "base", "medium"]
+    assert stats["memory_mb"] == 800
+    assert stats["evictions"] == 1
+    assert small.closed and not base.closed
+
+
+def test_refuses_model_that_can_never_fit():
+    registry = make_registry(800)
+    base = registry.get("base")
+
+    with pytest.raises(ModelBudgetError):
+        registry.check_fits("large")
+    with pytest.raises(ModelBudgetError):
+        registry.get("large")
+
+    # Nothing was evicted to make room for a load that could not succeed
+    assert registry.get_stats()["loaded"] == ["tiny", "base"]
+    assert not base.closed
+    registry.check_fits("medium")
+
+
+def test_unloads_model_larger_than_its_estimate():
+    engines = []
+
+    def factory(model_size):
+        engines.append(FakeEngine(model_size, memory_mb=800))
+        return engines[-1]
+
+    registry = make_registry(800, factory)
+
+    with pytest.raises(ModelBudgetError):
+        registry.get("small")
+    assert engines[0].closed
+    assert registry.get_stats()["loaded"] == ["tiny"]
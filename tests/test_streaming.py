@@ -0,0 +1,125 @@
+"""
+Tests for the streaming transcriber's commit, partial and trim logic
+"""
+import numpy as np
+import pytest
+
+from services.streaming import StreamingTranscriber, StreamingDecoder, StreamSlots, StreamLimitError, SAMPLE_RATE
+
+
+class FakeWhisperService:
+    """Returns one segment per segment_seconds of the audio it is given, or nothing for silence"""
+
+    def __init__(self, segment_seconds=2.0):
+        self.segment_seconds = segment_seconds
+        self.window_seconds = []
+
+    def transcribe_audio(self, audio, language=None, task="transcribe", use_cache=True):
+        seconds = len(audio) / SAMPLE_RATE
+        self.window_seconds.append(seconds)
+        if not np.any(audio):
+            return {"language": "en", "segments": []}
+        starts = np.arange(0, seconds, self.segment_seconds)
+        return {
+            "language": "en",
+            "segments": [
+                {"start": float(start), "end": float(min(start + self.segment_seconds, seconds)), "text": "words"}
+                for start in starts
+            ]
+        }
+
+
+def speech(seconds):
+    return np.full(int(seconds * SAMPLE_RATE), 0.1, dtype=np.float32)
+
+
+def final_segments(events):
+    return [segment for event in events if event["type"] == "final" for segment in event["segments"]]
+
+
+def assert_contiguous(segments, until):
+    """Segments tile the stream from 0 to until with no gaps or overlaps"""
+    assert segments[0]["start"] == 0
+    for previous, segment in zip(segments, segments[1:]):
+        assert segment["start"] == previous["end"]
+    assert segments[-1]["end"] == until
+
+
+def test_commits_stable_segments_and_keeps_tail_partial():
+    transcriber = StreamingTranscriber(FakeWhisperService(), step_seconds=1.0, commit_seconds=2.0)
+
+    events = transcriber.add_audio(speech(4))
+
+    assert final_segments(events) == [{"start": 0.0, "end": 2.0, "text": "words"}]
+    partial = [event for event in events if event["type"] == "partial"]
+    assert partial == [{"type": "partial", "text": "words", "start": 2.0, "end": 4.0}]
+    # The tentative tail stays buffered so the next window can revise it
+    assert transcriber._offset == 2.0
+    assert len(transcriber._buffer) == 2 * SAMPLE_RATE
+
+
+def test_waits_for_a_full_step():
+    service = FakeWhisperService()
+    transcriber = StreamingTranscriber(service, step_seconds=1.0)
+
+    assert transcriber.add_audio(speech(0.5)) == []
+    assert service.window_seconds == []
+
+
+def test_finish_commits_everything_left():
+    transcriber = StreamingTranscriber(FakeWhisperService(), step_seconds=1.0, commit_seconds=2.0)
+    events = transcriber.add_audio(speech(5))
+    events += transcriber.finish()
+
+    assert_contiguous(final_segments(events), 5.0)
+    assert transcriber.finish() == []
+
+
+def test_buffer_longer_than_a_window_loses_no_audio():
+    # One long segment stays tentative, so the second chunk pushes the buffer past 30 seconds
+    service = FakeWhisperService(segment_seconds=30.0)
+    transcriber = StreamingTranscriber(service, step_seconds=1.0, commit_seconds=2.0)
+
+    events = transcriber.add_audio(speech(20))
+    events += transcriber.add_audio(speech(15))
+    events += transcriber.finish()
+
+    assert service.window_seconds == [20.0, 30.0, 5.0]
+    assert_contiguous(final_segments(events), 35.0)
+    assert transcriber._offset == 35.0
+
+
+def test_finish_with_more_than_a_window_buffered():
+    service = FakeWhisperService()
+    transcriber = StreamingTranscriber(service, step_seconds=100.0)
+    transcriber.add_audio(speech(45))
+
+    events = transcriber.finish()
+
+    assert service.window_seconds == [30.0, 15.0]
+    assert_contiguous(final_segments(events), 45.0)
+
+
+def test_silent_full_window_is_dropped():
+    transcriber = StreamingTranscriber(FakeWhisperService(), step_seconds=1.0)
+
+    assert transcriber.add_audio(np.zeros(30 * SAMPLE_RATE, dtype=np.float32)) == []
+    assert len(transcriber._buffer) == 0
+    assert transcriber._offset == 30.0
+
+
+def test_pcm16_decoder_converts_and_resamples():
+    pcm = (np.full(8000, 16384, dtype=np.int16)).tobytes()
+
+    assert np.allclose(StreamingDecoder("pcm16").feed(pcm), 0.5)
+    assert len(StreamingDecoder("pcm16", sample_rate=8000).feed(pcm)) == SAMPLE_RATE
+
+
+def test_stream_slots_cap_concurrency():
+    slots = StreamSlots(max_streams=1)
+    slots.acquire()
+    with pytest.raises(StreamLimitError):
+        slots.acquire()
+    slots.release()
+    slots.acquire()
+    assert slots.get_stats() == {"max_streams": 1, "active": 1, "rejected": 1}
@@ -0,0 +1,65 @@
+"""
+Tests for the two-tier transcript cache
+"""
+import os
+
+from services.transcript_cache import TranscriptCache, hash_audio
+
+
+def make_cache(tmp_path, memory_entries=2, disk_max_bytes=1024 * 1024):
+    return TranscriptCache(memory_entries=memory_entries, disk_dir=str(tmp_path), disk_max_bytes=disk_max_bytes)
+
+
+def test_keys_separate_decoding_options():
+    audio_hash = hash_audio(b"audio")
+
+    keys = {
+        TranscriptCache.make_key(audio_hash, None, "transcribe", "small", "balanced"),
+        TranscriptCache.make_key(audio_hash, "en", "transcribe", "small", "balanced"),
+        TranscriptCache.make_key(audio_hash, None, "translate", "small", "balanced"),
+        TranscriptCache.make_key(audio_hash, None, "transcribe", "base", "balanced"),
+        TranscriptCache.make_key(audio_hash, None, "transcribe", "small", "fast"),
+        TranscriptCache.make_key(hash_audio(b"other"), None, "transcribe", "small", "balanced"),
+    }
+    assert len(keys) == 6
+
+
+def test_hits_are_copies(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", {"text": "hello"})
+
+    cache.get("k")["text"] = "changed"
+    assert cache.get("k") == {"text": "hello"}
+    assert cache.get_stats()["memory_hits"] == 2
+
+
+def test_memory_evicts_lru_and_disk_refills(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=2)
+    cache.put("a", {"text": "a"})
+    cache.put("b", {"text": "b"})
+    cache.get("a")
+    cache.put("c", {"text": "c"})
+
+    assert list(cache._memory) == ["a", "c"]
+    # The evicted entry is still on disk and is promoted back into memory
+    assert cache.get("b") == {"text": "b"}
+    assert cache.get_stats()["disk_hits"] == 1
+    assert "b" in cache._memory
+
+
+def test_miss_is_counted(tmp_path):
+    cache = make_cache(tmp_path)
+
+    assert cache.get("missing") is None
+    assert cache.get("missing", record_miss=False) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_disk_stays_under_budget(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=0, disk_max_bytes=2000)
+    for index in range(20):
+        cache.put(f"key{index}", {"text": "x" * 200})
+
+    files = [name for name in os.listdir(tmp_path) if name.endswith(".json")]
+    assert sum(os.path.getsize(os.path.join(tmp_path, name)) for name in files) <= 2000
+    assert cache.get("key19") == {"text": "x" * 200}
@@ -0,0 +1,83 @@
+"""
+Tests for batch translation deduplication and fan-out
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import translation_service
+from translation_service import TranslationService, InvalidInputError
+
+
+class FakeTranslator:
+    """Records each upstream call and echoes the text with the target language"""
+
+    name = "fake"
+    supports_detection = True
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def translate(self, text, dest, src=None):
+        with self._lock:
+            self.calls.append((text, dest))
+        if text == "boom":
+            raise RuntimeError("upstream down")
+        return SimpleNamespace(text=f"{dest}:{text}", src=src or "en")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv('TRANSLATION_CACHE', 'false')
+    monkeypatch.setenv('TRANSLATION_BATCH_MAX_ITEMS', '10')
+    monkeypatch.setattr(translation_service, 'create_engine', FakeTranslator)
+    return TranslationService()
+
+
+def test_identical_texts_are_translated_once(service):
+    result = service.translate_batch(["Hello", " Hello ", "Bye"], ["es", "fr", "es"])
+
+    assert result["target_languages"] == ["es", "fr"]
+    assert result["requested_translations"] == 6
+    assert result["unique_translations"] == 4
+    assert sorted(service.translator.calls) == [("Bye", "es"), ("Bye", "fr"), ("Hello", "es"), ("Hello", "fr")]
+
+
+def test_results_fan_out_in_request_order(service):
+    results = service.translate_batch(["Hello", " Hello "], ["es"])["results"]
+
+    assert [r["text"] for r in results] == ["Hello", " Hello "]
+    # Duplicates share a translation but each reports its own original text
+    assert results[1]["translations"]["es"]["translated_text"] == "es:Hello"
+    assert results[1]["translations"]["es"]["original_text"] == " Hello "
+
+
+def test_item_errors_do_not_fail_the_batch(service):
+    results = service.translate_batch(["Hello", "", "boom"], ["es"])["results"]
+
+    assert "translated_text" in results[0]["translations"]["es"]
+    assert "error" in results[1]["translations"]["es"]
+    assert "upstream down" in results[2]["translations"]["es"]["error"]
+
+
+def test_rejects_invalid_and_oversized_batches(service):
+    with pytest.raises(InvalidInputError):
+        service.translate_batch([], ["es"])
+    with pytest.raises(InvalidInputError):
+        service.translate_batch(["Hello"], [])
+    with pytest.raises(InvalidInputError):
+        service.translate_batch(["a", "b", "c", "d"], ["es", "fr", "de"])
+
+
+def test_engine_without_detection_requires_source(service):
+    service.translator.supports_detection = False
+
+    with pytest.raises(InvalidInputError):
+        service.translate_text("Hola", "en")
+    with pytest.raises(InvalidInputError):
+        service.translate_batch(["Hola"], ["en"])
+    assert service.translator.calls == []
+
+    assert service.translate_text("Hola", "en", "es")["translated_text"] == "en:Hola"
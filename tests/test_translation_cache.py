@@ -0,0 +1,60 @@
+"""
+Tests for the two-tier translation cache
+"""
+import time
+
+from translation_cache import TranslationCache
+
+
+def make_cache(tmp_path, memory_entries=2, ttl_seconds=3600):
+    return TranslationCache(memory_entries=memory_entries, db_path=str(tmp_path / "cache.sqlite3"),
+                            ttl_seconds=ttl_seconds)
+
+
+def test_key_normalizes_text_but_separates_languages_and_engines():
+    key = TranslationCache.make_key("Hello  world", None, "es")
+
+    assert TranslationCache.make_key(" Hello world\n", None, "es") == key
+    assert TranslationCache.make_key("Hello world", "en", "es") != key
+    assert TranslationCache.make_key("Hello world", None, "fr") != key
+    assert TranslationCache.make_key("Hello world", None, "es", "marian") != key
+    assert TranslationCache.make_key("hello world", None, "es") != key
+
+
+def test_memory_evicts_lru_and_sqlite_refills(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("a", {"translated_text": "a"})
+    cache.put("b", {"translated_text": "b"})
+    cache.get("a")
+    cache.put("c", {"translated_text": "c"})
+
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b") == {"translated_text": "b"}
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1
+    assert stats["disk_hits"] == 1
+    assert stats["disk_entries"] == 3
+
+
+def test_entries_survive_a_restart(tmp_path):
+    make_cache(tmp_path).put("k", {"translated_text": "hola"})
+
+    assert make_cache(tmp_path).get("k") == {"translated_text": "hola"}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = make_cache(tmp_path, ttl_seconds=0.05)
+    cache.put("k", {"translated_text": "hola"})
+    time.sleep(0.1)
+
+    assert cache.get("k") is None
+    assert "k" not in cache._memory
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_hits_are_copies(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k", {"translated_text": "hola"})
+
+    cache.get("k")["translated_text"] = "changed"
+    assert cache.get("k") == {"translated_text": "hola"}
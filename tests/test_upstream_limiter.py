@@ -0,0 +1,87 @@
+"""
+Tests for the AIMD upstream limiter
+"""
+import asyncio
+
+import pytest
+
+from upstream_client import AdaptiveLimiter
+
+
+def make_limiter(**overrides):
+    options = dict(rate=10, min_rate=1, max_rate=100, max_concurrency=8, latency_target=2.0, backoff=0.5)
+    options.update(overrides)
+    return AdaptiveLimiter(**options)
+
+
+def test_success_increases_limits_additively():
+    limiter = make_limiter()
+    limiter.in_flight = 1
+    limiter.release(0.1)
+
+    assert limiter.rate == pytest.approx(10.1)
+    assert limiter.concurrency == pytest.approx(4.25)
+    assert limiter.get_stats()["decreases"] == 0
+
+
+@pytest.mark.parametrize("outcome", [
+    {"throttled": True},
+    {"failed": True},
+    {"latency": 5.0},
+])
+def test_congestion_cuts_limits_multiplicatively(outcome):
+    limiter = make_limiter()
+    limiter.in_flight = 1
+    latency = outcome.pop("latency", 0.1)
+    limiter.release(latency, **outcome)
+
+    assert limiter.rate == 5
+    assert limiter.concurrency == 2
+    assert limiter.get_stats()["decreases"] == 1
+
+
+def test_congestion_cuts_once_per_round_trip():
+    limiter = make_limiter()
+    limiter.in_flight = 3
+    limiter.release(0.1, throttled=True)
+    limiter.release(0.1, throttled=True)
+    limiter.release(0.1, failed=True)
+
+    stats = limiter.get_stats()
+    assert stats["rate"] == 5
+    assert stats["decreases"] == 1
+    assert stats["throttled"] == 2
+    assert stats["failures"] == 1
+
+
+def test_limits_stay_within_bounds():
+    limiter = make_limiter(rate=1.5, max_rate=2, max_concurrency=4)
+    limiter.in_flight = 2
+    limiter._last_decrease = -1e9
+    limiter.release(0.1, throttled=True)
+    assert limiter.rate == 1
+    assert limiter.concurrency == 2
+
+    for _ in range(50):
+        limiter.in_flight = 1
+        limiter.release(0.1)
+    assert limiter.rate == 2
+    assert limiter.concurrency == 4
+
+
+def test_acquire_waits_for_a_free_slot():
+    async def scenario():
+        limiter = make_limiter(max_concurrency=1)
+        limiter.tokens = 2
+        await limiter.acquire()
+
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        assert limiter.get_stats()["waiting"] == 1
+
+        limiter.release(0.1)
+        await asyncio.wait_for(second, 1)
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+"""
+Tests for the energy VAD and timestamp remapping
+"""
+import numpy as np
+
+from services.vad import EnergyVAD, extract_speech, remap_segments, SAMPLE_RATE
+
+
+def tone(seconds, amplitude=0.3, frequency=220.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_detects_speech_between_silences():
+    audio = np.concatenate([silence(1), tone(1), silence(1)])
+    regions = EnergyVAD(padding_ms=0).detect(audio)
+
+    assert len(regions) == 1
+    start, end = regions[0]
+    assert abs(start - SAMPLE_RATE) < 0.05 * SAMPLE_RATE
+    assert abs(end - 2 * SAMPLE_RATE) < 0.05 * SAMPLE_RATE
+
+
+def test_steady_noise_has_no_speech():
+    noise = np.random.default_rng(0).normal(0, 0.1, 3 * SAMPLE_RATE).astype(np.float32)
+
+    assert EnergyVAD().detect(noise) == []
+    assert EnergyVAD().detect(silence(3)) == []
+
+
+def test_remap_segments_restores_original_timeline():
+    # Speech at 0-1s and 3-4s; the gap is cut out before transcription
+    audio = np.concatenate([tone(1), silence(2), tone(1)])
+    speech, timeline = extract_speech(audio, [(0, SAMPLE_RATE), (3 * SAMPLE_RATE, 4 * SAMPLE_RATE)])
+    assert len(speech) == 2 * SAMPLE_RATE
+
+    segments = remap_segments([
+        {"start": 0.0, "end": 1.0, "text": "one"},
+        {"start": 1.0, "end": 1.5, "text": "two"},
+    ], timeline)
+
+    assert segments[0] == {"start": 0.0, "end": 1.0, "text": "one"}
+    # A segment starting on the join belongs to the second region
+    assert segments[1] == {"start": 3.0, "end": 3.5, "text": "two"}
@@ -5,7 +5,7 @@ import os
 import logging
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from translation_service import TranslationService
+from translation_service import TranslationService, InvalidInputError, UnsupportedOperationError
 
 # Configure logging
 logging.basicConfig(
@@ -49,6 +49,8 @@ def create_app():
             'service': 'translation-service',
             'version': '1.0.0',
             'translator_status': service_status,
+            'translation_cache': translation_service.get_cache_stats(),
+            'engine': translation_service.get_engine_stats(),
             'pid': os.getpid()
         })
     
@@ -62,6 +64,7 @@ def create_app():
             'endpoints': {
                 'health': '/health',
                 'translate': '/translate',
+                'translate_batch': '/translate/batch',
                 'languages': '/languages',
                 'detect': '/detect'
             }
@@ -111,10 +114,46 @@ def create_app():
                     'error': 'Translation service not available'
                 }), 503
                 
+        except InvalidInputError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         except Exception as e:
             logger.error(f"Translation error: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
     
+    @app.route('/translate/batch', methods=['POST', 'OPTIONS'])
+    def translate_batch():
+        """Translate many texts into many languages in one call"""
+        try:
+            if request.method == 'OPTIONS':
+                return '', 200
+            
+            data = request.get_json()
+            if not data:
+                return jsonify({'error': 'No JSON data provided'}), 400
+            
+            if not translation_service.is_translator_loaded():
+                return jsonify({
+                    'success': False,
+                    'error': 'Translation service not available'
+                }), 503
+            
+            result = translation_service.translate_batch(
+                texts=data.get('texts'),
+                target_languages=data.get('target_languages'),
+                source_language=data.get('source_language')
+            )
+            
+            return jsonify({
+                'success': True,
+                'result': result
+            })
+            
+        except InvalidInputError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            logger.error(f"Batch translation error: {str(e)}")
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
     @app.route('/languages', methods=['GET', 'OPTIONS'])
     def get_supported_languages():
         """Get supported languages endpoint"""
@@ -158,6 +197,10 @@ def create_app():
                 'result': result
             })
             
+        except InvalidInputError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except UnsupportedOperationError as e:
+            return jsonify({'success': False, 'error': str(e)}), 501
         except Exception as e:
             logger.error(f"Language detection error: {str(e)}")
             return jsonify({'success': False, 'error': str(e)}), 500
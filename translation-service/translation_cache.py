@@ -0,0 +1,144 @@
+"""
+Two-tier translation cache: an in-process LRU in front of a persistent SQLite store with TTL
+"""
+import os
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Expired rows are swept after this many writes
+PURGE_EVERY_WRITES = 500
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache lookups: NFC, trimmed, single-spaced"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TranslationCache:
+    """Caches translation results keyed by normalized text and language pair"""
+
+    def __init__(self, memory_entries: int = None, db_path: str = None, ttl_seconds: float = None):
+        self.memory_entries = memory_entries if memory_entries is not None else int(os.getenv('TRANSLATION_CACHE_ENTRIES', '4096'))
+        self.db_path = db_path if db_path is not None else os.getenv(
+            'TRANSLATION_CACHE_DB',
+            os.path.join(tempfile.gettempdir(), 'translation-cache.sqlite3')
+        )
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(os.getenv('TRANSLATION_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation disk cache disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(text: str, source_language: Optional[str], target_language: str, engine: str = "google_translate") -> str:
+        """Key on engine, normalized text and already-normalized language codes (None means auto-detect)"""
+        # Google keys keep their original form so existing entries stay valid
+        parts = [source_language or "auto", target_language, normalize_text(text)]
+        raw = "|".join(parts if engine == "google_translate" else [engine] + parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a result, promoting SQLite hits into memory"""
+        with self._lock:
+            if key in self._memory:
+                value, expires_at = self._memory[key]
+                if expires_at > time.time():
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, expires_at FROM translations WHERE key = ? AND expires_at > ?",
+                        (key, time.time())
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Translation cache read failed: {e}")
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict[str, Any]):
+        """Store a result in both tiers"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, copy.deepcopy(value), expires_at)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), expires_at)
+                )
+                self._writes += 1
+                if self._writes % PURGE_EVERY_WRITES == 0:
+                    self._db.execute("DELETE FROM translations WHERE expires_at <= ?", (time.time(),))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache write failed: {e}")
+
+    def _remember(self, key: str, value: Dict[str, Any], expires_at: float):
+        """Insert into the LRU tier (caller holds the lock)"""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit ratios and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_entries = None
+            if self._db is not None:
+                try:
+                    disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "memory_hit_ratio": round(self.memory_hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "ttl_seconds": self.ttl_seconds
+            }
@@ -0,0 +1,201 @@
+"""
+Translation engines: the Google Translate upstream or local MarianMT models on CPU
+"""
+import os
+import time
+import logging
+import threading
+from types import SimpleNamespace
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional
+
+from upstream_client import GoogleTranslateClient
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingTranslation:
+    """A text waiting to join a batch for its language pair"""
+
+    def __init__(self, text, pair, model):
+        self.text = text
+        self.pair = pair
+        self.model = model
+        self.future = Future()
+
+
+class MarianEngine:
+    """Offline translation with per-language-pair OPUS-MT (MarianMT) models, batched across callers"""
+
+    name = "marian"
+    # OPUS-MT models are single-pair; there is no local language identification
+    supports_detection = False
+
+    def __init__(self):
+        import torch  # pylint: disable=import-outside-toplevel
+        from transformers import MarianMTModel, MarianTokenizer  # pylint: disable=import-outside-toplevel
+
+        self._torch = torch
+        self._model_class = MarianMTModel
+        self._tokenizer_class = MarianTokenizer
+        self.model_template = os.getenv('MARIAN_MODEL_TEMPLATE', 'Helsinki-NLP/opus-mt-{src}-{tgt}')
+        self.memory_budget_mb = float(os.getenv('MARIAN_MEMORY_MB', '2048'))
+        self.num_beams = int(os.getenv('MARIAN_NUM_BEAMS', '1'))
+        self.window = float(os.getenv('MARIAN_BATCH_WINDOW_MS', '10')) / 1000.0
+        self.max_batch_size = max(1, int(os.getenv('MARIAN_MAX_BATCH', '16')))
+        self.languages = [code.strip() for code in os.getenv(
+            'MARIAN_LANGUAGES', 'en,es,fr,de,it,ru,zh-cn,ar,nl,sv,fi,da,cs,uk,hu,ro,bg,vi,hi'
+        ).split(',') if code.strip()]
+
+        # Resident models per language pair, least recently used first
+        self._models = OrderedDict()
+        self._memory_mb = {}
+        self._models_lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self.batches = 0
+        self.items = 0
+        threading.Thread(target=self._run, name="marian-batcher", daemon=True).start()
+
+        logger.info(f"MarianMT engine ready (budget {self.memory_budget_mb:.0f} MB, batch window {self.window * 1000:.0f}ms)")
+
+    @staticmethod
+    def _opus_code(language_code: str) -> str:
+        """OPUS-MT model names use bare ISO codes (zh-cn -> zh)"""
+        return language_code.split('-')[0]
+
+    def _get_model(self, pair):
+        """Return (tokenizer, model) for a language pair, loading it and evicting others if needed"""
+        with self._models_lock:
+            if pair in self._models:
+                self._models.move_to_end(pair)
+                return self._models[pair]
+            load_lock = self._load_locks.setdefault(pair, threading.Lock())
+
+        # Concurrent requests for the same pair wait for a single load
+        with load_lock:
+            with self._models_lock:
+                if pair in self._models:
+                    self._models.move_to_end(pair)
+                    return self._models[pair]
+
+            name = self.model_template.format(src=pair[0], tgt=pair[1])
+            logger.info(f"Loading translation model '{name}'")
+            started = time.time()
+            tokenizer = self._tokenizer_class.from_pretrained(name)
+            model = self._model_class.from_pretrained(name).eval()
+            size_mb = sum(p.numel() * p.element_size() for p in model.parameters()) / (1024 * 1024)
+            self.loads += 1
+            logger.info(f"Loaded '{name}' ({size_mb:.0f} MB) in {time.time() - started:.1f}s")
+
+            with self._models_lock:
+                self._models[pair] = (tokenizer, model)
+                self._memory_mb[pair] = size_mb
+                for resident in list(self._models):
+                    if sum(self._memory_mb.values()) <= self.memory_budget_mb:
+                        break
+                    if resident == pair:
+                        continue
+                    # Batches already holding the model keep their reference until they finish
+                    self._models.pop(resident)
+                    freed = self._memory_mb.pop(resident)
+                    self.evictions += 1
+                    logger.info(f"Evicted translation model {resident[0]}-{resident[1]} ({freed:.0f} MB)")
+                return self._models[pair]
+
+    def translate(self, text: str, dest: str, src: Optional[str] = None):
+        """Translate one text, sharing a generate() call with concurrent texts for the same pair"""
+        if not src:
+            # Guessing would run the wrong model over the text and cache the result
+            raise ValueError("MarianMT needs a source language")
+        pair = (self._opus_code(src), self._opus_code(dest))
+        if pair[0] == pair[1]:
+            return SimpleNamespace(text=text, src=src, dest=dest, confidence=None)
+
+        # Loading happens on the caller's thread so one slow load does not stall other pairs
+        item = _PendingTranslation(text, pair, self._get_model(pair))
+        with self._condition:
+            self._pending.append(item)
+            self._condition.notify()
+        return SimpleNamespace(text=item.future.result(), src=src, dest=dest, confidence=None)
+
+    def supported_languages(self):
+        """Language codes with opus-mt-en-{code} and opus-mt-{code}-en models (MARIAN_LANGUAGES)
+
+        Pairs between two of these languages only work where OPUS-MT publishes a direct model.
+        """
+        return list(self.languages)
+
+    def _run(self):
+        """Batcher loop: wait for work, hold the window open, then translate each pair's texts together"""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                self._pending = self._pending[self.max_batch_size:]
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(item.pair, []).append(item)
+            for items in groups.values():
+                self._translate_group(items)
+
+    def _translate_group(self, items):
+        """One padded generate() call for texts of the same language pair"""
+        try:
+            tokenizer, model = items[0].model
+            inputs = tokenizer([item.text for item in items], return_tensors="pt", padding=True, truncation=True)
+            with self._torch.inference_mode():
+                outputs = model.generate(**inputs, num_beams=self.num_beams)
+            texts = tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+            self.batches += 1
+            self.items += len(items)
+            for item, text in zip(items, texts):
+                item.future.set_result(text)
+        except Exception as e:
+            logger.error(f"Batched translation failed: {str(e)}")
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+    def get_stats(self):
+        """Get resident models and batching counters"""
+        with self._models_lock:
+            return {
+                "engine": self.name,
+                "loaded_pairs": [f"{src}-{tgt}" for src, tgt in self._models],
+                "memory_mb": round(sum(self._memory_mb.values())),
+                "budget_mb": self.memory_budget_mb,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "batches": self.batches,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None
+            }
+
+
+def create_engine(name: str = None):
+    """Build the engine selected by TRANSLATION_ENGINE (google or marian)"""
+    name = (name or os.getenv('TRANSLATION_ENGINE', 'google')).lower()
+    if name in ('marian', 'marianmt', 'opus-mt', 'local'):
+        try:
+            return MarianEngine()
+        except ImportError:
+            logger.warning("transformers/torch not installed, falling back to Google Translate")
+    elif name not in ('google', 'google_translate'):
+        logger.warning(f"Unknown translation engine '{name}', using Google Translate")
+    return GoogleTranslateClient()
@@ -3,22 +3,11 @@ Translation service using Google Translate - Standalone version
 """
 import logging
 from typing import Dict, Any, List, Optional
-import time
 import os
-import ssl
+from concurrent.futures import ThreadPoolExecutor
 
-# GLOBAL SSL CONFIGURATION - Must be done before any other imports
-os.environ['PYTHONHTTPSVERIFY'] = '0'
-os.environ['REQUESTS_CA_BUNDLE'] = ''
-os.environ['CURL_CA_BUNDLE'] = ''
-os.environ['SSL_VERIFY'] = 'false'
-
-# Disable SSL verification globally for Python
-ssl._create_default_https_context = ssl._create_unverified_context
-
-# Disable urllib3 warnings
-import urllib3
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from translation_cache import TranslationCache, normalize_text
+from translation_engines import create_engine
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +28,10 @@ class InvalidInputError(TranslationError):
     """Exception raised for invalid input parameters"""
     pass
 
+class UnsupportedOperationError(TranslationError):
+    """Exception raised when the active engine cannot perform an operation"""
+    pass
+
 class TranslationService:
     """Service for handling text translation using Google Translate"""
     
@@ -47,6 +40,14 @@ class TranslationService:
         self.translator = None
         self._load_translator()
         
+        # Repeated phrases are answered from memory or SQLite instead of Google
+        self.cache = TranslationCache() if os.getenv('TRANSLATION_CACHE', 'true').lower() == 'true' else None
+        
+        # Shared by all batch requests, so this bounds concurrent upstream calls from batches
+        self.batch_concurrency = int(os.getenv('TRANSLATION_BATCH_CONCURRENCY', '8'))
+        self.batch_max_items = int(os.getenv('TRANSLATION_BATCH_MAX_ITEMS', '500'))
+        self._batch_pool = ThreadPoolExecutor(max_workers=self.batch_concurrency, thread_name_prefix="translate-batch")
+        
         # Extended language codes mapping
         self.language_names = {
             'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
@@ -68,120 +69,10 @@ class TranslationService:
         }
     
     def _load_translator(self):
-        """Load the Google Translate service"""
+        """Create the translation engine selected by TRANSLATION_ENGINE"""
         try:
-            # Additional SSL environment variables
-            os.environ['PYTHONHTTPSVERIFY'] = '0'
-            os.environ['REQUESTS_CA_BUNDLE'] = ''
-            os.environ['CURL_CA_BUNDLE'] = ''
-            os.environ['SSL_VERIFY'] = 'false'
-            os.environ['PYTHONDONTWRITEBYTECODE'] = '1'
-            
-            # Monkey patch requests completely
-            import requests
-            from requests.adapters import HTTPAdapter
-            
-            class NoSSLAdapter(HTTPAdapter):
-                def init_poolmanager(self, *args, **kwargs):
-                    kwargs['ssl_context'] = ssl._create_unverified_context()
-                    kwargs['assert_hostname'] = False
-                    kwargs['check_hostname'] = False
-                    return super().init_poolmanager(*args, **kwargs)
-            
-            # Override all requests methods
-            original_request = requests.request
-            original_get = requests.get
-            original_post = requests.post
-            original_put = requests.put
-            original_delete = requests.delete
-            
-            def no_ssl_request(*args, **kwargs):
-                kwargs['verify'] = False
-                kwargs.setdefault('timeout', 30)
-                return original_request(*args, **kwargs)
-            
-            def no_ssl_get(*args, **kwargs):
-                kwargs['verify'] = False
-                kwargs.setdefault('timeout', 30)
-                return original_get(*args, **kwargs)
-                
-            def no_ssl_post(*args, **kwargs):
-                kwargs['verify'] = False
-                kwargs.setdefault('timeout', 30)
-                return original_post(*args, **kwargs)
-                
-            def no_ssl_put(*args, **kwargs):
-                kwargs['verify'] = False
-                kwargs.setdefault('timeout', 30)
-                return original_put(*args, **kwargs)
-                
-            def no_ssl_delete(*args, **kwargs):
-                kwargs['verify'] = False
-                kwargs.setdefault('timeout', 30)
-                return original_delete(*args, **kwargs)
-            
-            # Replace all request methods
-            requests.request = no_ssl_request
-            requests.get = no_ssl_get
-            requests.post = no_ssl_post
-            requests.put = no_ssl_put
-            requests.delete = no_ssl_delete
-            
-            # Create a session with no SSL
-            session = requests.Session()
-            session.verify = False  # nosec - intentional SSL bypass for translation service
-            session.mount('https://', NoSSLAdapter())
-            session.mount('http://', NoSSLAdapter())
-            
-            # Replace the session in the requests module
-            requests.sessions.Session = lambda: session
-            
-            # Try to patch httpx if it's available (googletrans dependency)
-            try:
-                import httpx
-                
-                # Patch httpx methods to disable SSL verification
-                original_httpx_request = httpx.request
-                original_httpx_get = httpx.get
-                original_httpx_post = httpx.post
-                
-                def no_ssl_httpx_request(*args, **kwargs):
-                    kwargs['verify'] = False
-                    kwargs.setdefault('timeout', 30)
-                    return original_httpx_request(*args, **kwargs)
-                
-                def no_ssl_httpx_get(*args, **kwargs):
-                    kwargs['verify'] = False
-                    kwargs.setdefault('timeout', 30)
-                    return original_httpx_get(*args, **kwargs)
-                    
-                def no_ssl_httpx_post(*args, **kwargs):
-                    kwargs['verify'] = False
-                    kwargs.setdefault('timeout', 30)
-                    return original_httpx_post(*args, **kwargs)
-                
-                httpx.request = no_ssl_httpx_request
-                httpx.get = no_ssl_httpx_get
-                httpx.post = no_ssl_httpx_post
-                
-                # Patch httpx client class
-                original_httpx_client = httpx.Client
-                def patched_httpx_client(*args, **kwargs):
-                    kwargs['verify'] = False
-                    kwargs.setdefault('timeout', 30)
-                    return original_httpx_client(*args, **kwargs)
-                httpx.Client = patched_httpx_client
-                
-                logger.info("Patched httpx for SSL bypass")
-            except ImportError:
-                logger.info("httpx not available, skipping httpx patches")
-            
-            from googletrans import Translator  # pylint: disable=import-outside-toplevel
-            
-            # Create translator - it should now use our no-SSL session
-            self.translator = Translator()
-            
-            logger.info("Google Translate service loaded successfully with comprehensive SSL bypass")
+            self.translator = create_engine()
+            logger.info(f"Translation engine '{self.translator.name}' loaded successfully")
         except ImportError as e:
             logger.error(f"Required libraries not installed: {str(e)}")
             self.translator = None
@@ -193,7 +84,7 @@ class TranslationService:
         """Check if translator is loaded and ready"""
         return self.translator is not None
     
-    def _validate_translation_input(self, text: str, target_language: str):
+    def _validate_translation_input(self, text: str, target_language: str, source_language: Optional[str] = None):
         """Validate input parameters for translation"""
         if not self.is_translator_loaded():
             raise ServiceNotLoadedError(SERVICE_NOT_LOADED_MSG)
@@ -203,59 +94,19 @@ class TranslationService:
         
         if not target_language:
             raise InvalidInputError("Target language not specified")
+        
+        self._validate_source_language(source_language)
     
-    def _perform_translation_with_retry(self, text: str, target_language: str, source_language: Optional[str] = None):
-        """Perform translation with retry logic"""
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                if source_language:
-                    return self.translator.translate(text, dest=target_language, src=source_language)
-                return self.translator.translate(text, dest=target_language)
-            except Exception as e:
-                if self._is_rate_limit_error(e) and attempt < max_retries - 1:
-                    wait_time = 2 ** attempt
-                    logger.warning(f"Rate limit hit, retrying in {wait_time} seconds...")
-                    time.sleep(wait_time)
-                    continue
-                raise e
+    def _validate_source_language(self, source_language: Optional[str]):
+        """Engines without language detection cannot translate from an unknown source"""
+        if not source_language and not self.translator.supports_detection:
+            raise InvalidInputError(f"Source language required: the '{self.translator.name}' engine cannot detect it")
     
-    def _is_rate_limit_error(self, error: Exception) -> bool:
-        """Check if error is due to rate limiting"""
-        return "too many requests" in str(error).lower()
-    
-    def _mock_translate(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
-        """Mock translation for when Google Translate is unavailable due to SSL issues"""
-        
-        # Simple mock translations for demo purposes
-        mock_translations = {
-            ('Hello world', 'es'): 'Hola mundo',
-            ('Hello world', 'fr'): 'Bonjour le monde',
-            ('Hello world', 'de'): 'Hallo Welt',
-            ('Hello world', 'it'): 'Ciao mondo',
-            ('Hello world', 'pt'): 'Olá mundo',
-            ('Hello', 'es'): 'Hola',
-            ('Thank you', 'es'): 'Gracias',
-            ('Good morning', 'es'): 'Buenos días',
-            ('How are you?', 'es'): '¿Cómo estás?',
-        }
-        
-        # Default fallback
-        translated = mock_translations.get((text, target_language), f"[MOCK] {text} -> {target_language}")
-        
-        response = {
-            "original_text": text,
-            "translated_text": translated,
-            "source_language": source_language or "en",
-            "target_language": target_language,
-            "source_language_name": self.language_names.get(source_language or "en", source_language or "en"),
-            "target_language_name": self.language_names.get(target_language, target_language),
-            "confidence": 0.9,  # Mock confidence
-            "service": "mock_translator_ssl_fallback"
-        }
-        
-        logger.warning(f"Using mock translation due to SSL issues: {text} -> {translated}")
-        return response
+    def _perform_translation(self, text: str, target_language: str, source_language: Optional[str] = None):
+        """Perform translation; upstream throttling is retried by the engine's shared limiter"""
+        if source_language:
+            return self.translator.translate(text, dest=target_language, src=source_language)
+        return self.translator.translate(text, dest=target_language)
     
     def _normalize_language_code(self, language_code: str) -> str:
         """Normalize language codes to standard format"""
@@ -271,15 +122,24 @@ class TranslationService:
     def translate_text(self, text: str, target_language: str, source_language: Optional[str] = None) -> Dict[str, Any]:
         """Translate text to target language"""
         try:
-            self._validate_translation_input(text, target_language)
+            self._validate_translation_input(text, target_language, source_language)
             
             # Normalize language codes
             target_language_normalized = self._normalize_language_code(target_language)
             source_language_normalized = self._normalize_language_code(source_language) if source_language else None
             
+            cache_key = None
+            if self.cache is not None:
+                cache_key = TranslationCache.make_key(text, source_language_normalized, target_language_normalized, self.translator.name)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Translation cache hit for '{target_language_normalized}'")
+                    cached.update({"original_text": text, "cached": True})
+                    return cached
+            
             logger.info(f"Translating text to '{target_language_normalized}' from '{source_language_normalized or 'auto-detect'}'")
             
-            result = self._perform_translation_with_retry(text, target_language_normalized, source_language_normalized)
+            result = self._perform_translation(text, target_language_normalized, source_language_normalized)
             
             response = {
                 "original_text": text,
@@ -289,9 +149,12 @@ class TranslationService:
                 "source_language_name": self.language_names.get(result.src, result.src),
                 "target_language_name": self.language_names.get(target_language_normalized, target_language_normalized),
                 "confidence": getattr(result, 'confidence', None),
-                "service": "google_translate"
+                "service": self.translator.name,
+                "cached": False
             }
             
+            if cache_key is not None:
+                self.cache.put(cache_key, response)
             logger.info(f"Translation completed successfully. {result.src} -> {target_language_normalized}")
             return response
             
@@ -300,26 +163,66 @@ class TranslationService:
         except Exception as e:
             error_str = str(e)
             logger.error(f"Translation failed: {error_str}")
-            
-            # If it's an SSL error, use mock translation as fallback
-            if "SSL" in error_str and "CERTIFICATE_VERIFY_FAILED" in error_str:
-                logger.warning("SSL certificate error detected, falling back to mock translation")
-                return self._mock_translate(text, target_language_normalized, source_language_normalized)
-            
-            # For other errors, raise the original exception
             raise TranslationError(f"{TRANSLATION_FAILED_MSG}: {error_str}") from e
     
+    def translate_batch(self, texts: List[str], target_languages: List[str], source_language: Optional[str] = None) -> Dict[str, Any]:
+        """Translate many texts into many languages, translating each distinct text/language pair once"""
+        if not self.is_translator_loaded():
+            raise ServiceNotLoadedError(SERVICE_NOT_LOADED_MSG)
+        if not isinstance(texts, list) or not texts:
+            raise InvalidInputError(f"{NO_TEXT_PROVIDED_MSG} for translation")
+        if not isinstance(target_languages, list) or not target_languages:
+            raise InvalidInputError("Target languages not specified")
+        self._validate_source_language(source_language)
+        if len(texts) * len(target_languages) > self.batch_max_items:
+            raise InvalidInputError(f"Batch too large: {len(texts)} texts x {len(target_languages)} languages "
+                                    f"exceeds {self.batch_max_items} translations")
+        
+        targets = list(dict.fromkeys(self._normalize_language_code(target) for target in target_languages if target))
+        keys = [normalize_text(text) if isinstance(text, str) and text.strip() else None for text in texts]
+        
+        # Identical inputs (after normalization) share one translation
+        futures = {}
+        for text, key in zip(texts, keys):
+            for target in targets:
+                if key is not None and (key, target) not in futures:
+                    futures[(key, target)] = self._batch_pool.submit(self.translate_text, text, target, source_language)
+        
+        logger.info(f"Batch of {len(texts)} text(s) x {len(targets)} language(s): {len(futures)} unique translation(s)")
+        
+        results = []
+        for text, key in zip(texts, keys):
+            translations = {}
+            for target in targets:
+                if key is None:
+                    translations[target] = {"error": f"{NO_TEXT_PROVIDED_MSG} for translation"}
+                    continue
+                try:
+                    translations[target] = dict(futures[(key, target)].result(), original_text=text)
+                except TranslationError as e:
+                    translations[target] = {"error": str(e)}
+            results.append({"text": text, "translations": translations})
+        
+        return {
+            "results": results,
+            "target_languages": targets,
+            "requested_translations": len(texts) * len(targets),
+            "unique_translations": len(futures)
+        }
+    
+    def get_engine_stats(self) -> Optional[Dict[str, Any]]:
+        """Get the engine's pool or model counters, or None when no engine is loaded"""
+        return self.translator.get_stats() if self.is_translator_loaded() else None
+    
+    def get_cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Get translation cache hit ratios, or None when the cache is off"""
+        return self.cache.get_stats() if self.cache is not None else None
+    
     def get_supported_languages(self) -> List[str]:
         """Get list of supported language codes for translation"""
         if not self.is_translator_loaded():
             return list(self.language_names.keys())
-        
-        try:
-            from googletrans import LANGUAGES  # pylint: disable=import-outside-toplevel
-            return list(LANGUAGES.keys())
-        except Exception as e:
-            logger.error(f"Failed to get supported languages: {str(e)}")
-            return list(self.language_names.keys())
+        return self.translator.supported_languages()
     
     def get_language_name(self, language_code: str) -> str:
         """Get human-readable language name from code"""
@@ -334,6 +237,9 @@ class TranslationService:
             if not text or not text.strip():
                 raise InvalidInputError(f"{NO_TEXT_PROVIDED_MSG} for language detection")
             
+            if not self.translator.supports_detection:
+                raise UnsupportedOperationError(f"Language detection is not available with the {self.translator.name} engine")
+            
             logger.info("Detecting language of provided text")
             
             detected = self.translator.detect(text)
@@ -347,7 +253,7 @@ class TranslationService:
             logger.info(f"Language detected: {detected.lang} (confidence: {detected.confidence})")
             return response
             
-        except (ServiceNotLoadedError, InvalidInputError):
+        except (ServiceNotLoadedError, InvalidInputError, UnsupportedOperationError):
             raise
         except Exception as e:
             logger.error(f"Language detection failed: {str(e)}")
@@ -0,0 +1,288 @@
+"""
+Long-lived async HTTP client for the Google Translate upstream, shared by all request threads
+"""
+import os
+import ssl
+import time
+import asyncio
+import logging
+import threading
+import importlib.util
+from types import SimpleNamespace
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Language codes accepted by the Google Translate endpoint
+SUPPORTED_LANGUAGES = (
+    'af sq am ar hy az eu be bn bs bg ca ceb ny zh-cn zh-tw co hr cs da nl en eo et tl fi fr fy gl ka de el gu '
+    'ht ha haw iw he hi hmn hu is ig id ga it ja jw kn kk km ko ku ky lo la lv lt lb mk mg ms ml mt mi mr mn '
+    'my ne no or ps fa pl pt pa ro ru sm gd sr st sn sd si sk sl so es su sw sv tg ta te th tr uk ur ug uz vi '
+    'cy xh yi yo zu'
+).split()
+
+
+class UpstreamError(Exception):
+    """Exception raised when the translation upstream fails or rejects a request"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AdaptiveLimiter:
+    """Token bucket plus concurrency limit, both tuned by additive-increase/multiplicative-decrease
+
+    Callers wait in arrival order. Each success adds about one request per second to the rate and
+    one slot per round trip to the concurrency limit; a 429, a transport error or a response slower
+    than the latency target cuts both by the backoff factor, at most once per cooldown. Must be used
+    from one event loop.
+    """
+
+    def __init__(self, rate: float = None, min_rate: float = None, max_rate: float = None,
+                 max_concurrency: int = None, latency_target: float = None, backoff: float = None):
+        self.max_rate = max_rate or float(os.getenv('TRANSLATION_UPSTREAM_MAX_RATE', '200'))
+        self.min_rate = min_rate or float(os.getenv('TRANSLATION_UPSTREAM_MIN_RATE', '1'))
+        self.rate = min(self.max_rate, rate or float(os.getenv('TRANSLATION_UPSTREAM_RATE', '20')))
+        self.max_concurrency = max_concurrency or int(os.getenv('TRANSLATION_UPSTREAM_MAX_IN_FLIGHT', '32'))
+        self.concurrency = float(min(self.max_concurrency, 4))
+        self.latency_target = latency_target or float(os.getenv('TRANSLATION_UPSTREAM_LATENCY_TARGET', '2.0'))
+        self.backoff = backoff or float(os.getenv('TRANSLATION_UPSTREAM_BACKOFF', '0.5'))
+
+        self.tokens = 1.0
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.failures = 0
+        self.decreases = 0
+        self._refilled = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency = None
+        # asyncio.Lock wakes waiters in FIFO order, so only the head of the queue competes for capacity
+        self._queue = asyncio.Lock()
+        self._released = asyncio.Event()
+
+    def _refill(self, now: float):
+        """Add tokens for the time elapsed; the bucket holds at most one concurrency window of requests"""
+        self.tokens = min(max(1.0, self.concurrency), self.tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    async def acquire(self):
+        """Wait for a token and a free slot, in arrival order"""
+        self.waiting += 1
+        try:
+            async with self._queue:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now < self._paused_until:
+                        await asyncio.sleep(self._paused_until - now)
+                    elif self.in_flight >= int(self.concurrency):
+                        self._released.clear()
+                        await self._released.wait()
+                    elif self.tokens < 1:
+                        await asyncio.sleep((1 - self.tokens) / self.rate)
+                    else:
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        return
+        finally:
+            self.waiting -= 1
+
+    def release(self, latency: float, throttled: bool = False, retry_after: float = None, failed: bool = False):
+        """Return a slot and adapt the limits to how the upstream answered (failed: no answer at all)"""
+        self.in_flight -= 1
+        now = time.monotonic()
+        self._latency = latency if self._latency is None else 0.8 * self._latency + 0.2 * latency
+
+        if throttled or failed or latency > self.latency_target:
+            self.throttled += throttled
+            self.failures += failed
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            # Requests already in flight report the same congestion; cut once per round trip
+            if now - self._last_decrease >= max(self._latency, 1.0):
+                self._last_decrease = now
+                self.decreases += 1
+                self.rate = max(self.min_rate, self.rate * self.backoff)
+                self.concurrency = max(1.0, self.concurrency * self.backoff)
+                self.tokens = min(self.tokens, 0.0)
+                reason = 'throttled' if throttled else 'failing' if failed else 'slow'
+                logger.warning(f"Upstream {reason}: rate {self.rate:.1f}/s, "
+                               f"concurrency {int(self.concurrency)}")
+        else:
+            self.rate = min(self.max_rate, self.rate + 1.0 / self.rate)
+            self.concurrency = min(float(self.max_concurrency), self.concurrency + 1.0 / self.concurrency)
+        self._released.set()
+
+    def get_stats(self):
+        """Get the current limits and queue depth"""
+        return {
+            "rate": round(self.rate, 2),
+            "concurrency": int(self.concurrency),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "latency_ms": round(self._latency * 1000, 1) if self._latency is not None else None,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "decreases": self.decreases
+        }
+
+
+def _ssl_context():
+    """Verification setting for upstream TLS: the system store plus the configured CA bundle, or off"""
+    if os.getenv('TRANSLATION_VERIFY_SSL', 'true').lower() == 'false':
+        return False
+    import certifi  # pylint: disable=import-outside-toplevel
+
+    # Start from public roots; the default store would follow SSL_CERT_FILE and trust only the proxy CA
+    context = ssl.create_default_context(cafile=certifi.where())
+    ca_bundle = os.getenv('TRANSLATION_CA_BUNDLE') or os.getenv('SSL_CERT_FILE')
+    if ca_bundle and os.path.exists(ca_bundle):
+        # Added to the system roots, so a proxy CA does not break direct connections
+        context.load_verify_locations(cafile=ca_bundle)
+    return context
+
+
+def _is_tls_failure(error):
+    """Whether an httpx error was caused by certificate verification"""
+    while error is not None:
+        if isinstance(error, ssl.SSLError):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class GoogleTranslateClient:
+    """Pooled keep-alive client on a background event loop, exposed through blocking translate/detect calls"""
+
+    name = "google_translate"
+    supports_detection = True
+
+    def __init__(self, base_url: str = None, max_connections: int = None, max_in_flight: int = None, timeout: float = None):
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        self.base_url = (base_url or os.getenv('TRANSLATION_UPSTREAM_URL', 'https://translate.googleapis.com')).rstrip('/')
+        self.max_connections = max_connections or int(os.getenv('TRANSLATION_UPSTREAM_CONNECTIONS', '10'))
+        self.max_in_flight = max_in_flight or int(os.getenv('TRANSLATION_UPSTREAM_MAX_IN_FLIGHT', '32'))
+        self.queue_timeout = float(os.getenv('TRANSLATION_UPSTREAM_QUEUE_TIMEOUT', '30'))
+        self.retries = int(os.getenv('TRANSLATION_UPSTREAM_RETRIES', '3'))
+        timeout = timeout or float(os.getenv('TRANSLATION_UPSTREAM_TIMEOUT', '10'))
+        # HTTP/2 multiplexes requests over one connection when the h2 package is installed
+        self.http2 = importlib.util.find_spec('h2') is not None
+
+        self.requests = 0
+        self.errors = 0
+
+        # One event loop thread owns the client; Flask threads submit coroutines to it
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="translation-upstream", daemon=True)
+        self._thread.start()
+
+        async def setup():
+            # The upstream is a single host, so the pool limit is the per-host connection cap
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                verify=_ssl_context(),
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+            self.limiter = AdaptiveLimiter(max_concurrency=self.max_in_flight)
+
+        self._run(setup())
+        logger.info(f"Translation upstream client ready ({self.base_url}, {self.max_connections} connection(s), "
+                    f"up to {self.max_in_flight} in flight, http2={self.http2})")
+
+    def _run(self, coro):
+        """Run a coroutine on the client's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _request(self, text: str, target: str, source: str):
+        """POST one text to the translate endpoint through the limiter, retrying 429s, and return the decoded JSON"""
+        for attempt in range(self.retries):
+            response = await self._send(text, target, source)
+            if response.status_code != 429:
+                break
+            self.errors += 1
+            if attempt < self.retries - 1:
+                logger.warning(f"Upstream throttled, requeueing (attempt {attempt + 1}/{self.retries})")
+        else:
+            raise UpstreamError("Too many requests", 429)
+
+        if response.status_code != 200:
+            self.errors += 1
+            raise UpstreamError(f"Upstream returned HTTP {response.status_code}", response.status_code)
+        return response.json()
+
+    async def _send(self, text: str, target: str, source: str):
+        """Wait for the limiter, send one request and report its outcome back to the limiter"""
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        try:
+            await asyncio.wait_for(self.limiter.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError as e:
+            self.errors += 1
+            raise UpstreamError("Too many requests", 429) from e
+
+        self.requests += 1
+        started = time.monotonic()
+        try:
+            response = await self._client.post(
+                f"{self.base_url}/translate_a/single",
+                params={"client": "gtx", "sl": source, "tl": target, "dt": "t"},
+                data={"q": text}
+            )
+        except httpx.HTTPError as e:
+            # Timeouts and resets are congestion signals too, never a successful sample
+            self.limiter.release(time.monotonic() - started, failed=True)
+            self.errors += 1
+            if _is_tls_failure(e):
+                logger.error(f"TLS verification with {self.base_url} failed, check TRANSLATION_CA_BUNDLE: {e}")
+                raise UpstreamError(f"Upstream TLS verification failed: {e}") from e
+            raise UpstreamError(f"Upstream request failed: {e}") from e
+
+        retry_after = response.headers.get("Retry-After", "")
+        self.limiter.release(
+            time.monotonic() - started,
+            throttled=response.status_code == 429,
+            retry_after=float(retry_after) if retry_after.isdigit() else None
+        )
+        return response
+
+    async def translate_async(self, text: str, dest: str, src: Optional[str] = None):
+        """Translate text; the result has .text, .src and .confidence like googletrans results"""
+        data = await self._request(text, dest, src or "auto")
+        translated = "".join(part[0] for part in (data[0] or []) if part and part[0])
+        confidence = data[6] if len(data) > 6 and isinstance(data[6], float) else None
+        return SimpleNamespace(text=translated, src=data[2] or src, dest=dest, confidence=confidence)
+
+    async def detect_async(self, text: str):
+        """Detect the language of text; the result has .lang and .confidence"""
+        result = await self.translate_async(text, "en")
+        return SimpleNamespace(lang=result.src, confidence=result.confidence)
+
+    def translate(self, text: str, dest: str, src: Optional[str] = None):
+        """Blocking translate for request threads"""
+        return self._run(self.translate_async(text, dest, src))
+
+    def detect(self, text: str):
+        """Blocking language detection for request threads"""
+        return self._run(self.detect_async(text))
+
+    def supported_languages(self):
+        """Language codes accepted by the upstream"""
+        return list(SUPPORTED_LANGUAGES)
+
+    def get_stats(self):
+        """Get pool configuration and request counters"""
+        return {
+            "engine": self.name,
+            "upstream": self.base_url,
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "requests": self.requests,
+            "errors": self.errors,
+            "limiter": self.limiter.get_stats()
+        }